@@ -4,14 +4,22 @@ import magic  # helps detect file type by looking at file contents and not just
 import mimetypes  # backup methods to guess file type using the file extension
 from tabulate import tabulate # helps result look like  a clean table
 import csv
+import hashlib
 from collections import Counter
 
+import metrics
+from manifest import FileRecord, Manifest, MANIFEST_NAME, file_sha256  # content hash, used for sharding and merging
+
 ''' This code takes  a ZIP file or a single file as input. Extracts files (if ZIP). Detects what type of file each one is.
 Shows results in a nice table format (only Filename + File Type) and saves that table into a .txt file. '''
 
 
 
 def detect_file_type(file_path): # detecting file types using python-magic, fallback to mimetypes
+    with metrics.timer("detect_type"):
+        return _detect_file_type(file_path)
+
+def _detect_file_type(file_path):
     try:
         mime = magic.from_file(file_path, mime = True) # first file is detected by magic moudule which is very accurate
     except Exception:
@@ -20,14 +28,40 @@ def detect_file_type(file_path): # detecting file types using python-magic, fall
         mime,_ = mimetypes.guess_type(file_path)
     return mime or "Unknown"
 
-# function to process single file
+UPLOAD_CHUNK = 4 * 1024 * 1024
+
+def iter_chunks(fileobj, chunk_size=UPLOAD_CHUNK):
+    # an open binary file from the start in fixed-size chunks; in-memory buffers (BytesIO, Streamlit
+    # uploads) are sliced as zero-copy views instead of being read out
+    if hasattr(fileobj, "getbuffer"):
+        with fileobj.getbuffer() as view:
+            for start in range(0, len(view), chunk_size):
+                yield view[start:start + chunk_size]
+        return
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        yield chunk
+
+def stream_sha256(fileobj, chunk_size=UPLOAD_CHUNK):
+    h = hashlib.sha256()
+    for chunk in iter_chunks(fileobj, chunk_size):
+        h.update(chunk)
+    return h.hexdigest()
+
+def save_stream(fileobj, path, chunk_size=UPLOAD_CHUNK):
+    # writes an upload to disk chunk by chunk, never holding a second copy of it in memory
+    with open(path, "wb") as f:
+        for chunk in iter_chunks(fileobj, chunk_size):
+            f.write(chunk)
+    return path
 
-def process_file(file_path): # return only filename and file type
+# function to process single file
+def process_file(file_path): # return filename, full path, file type and content hash
     try:
         return [os.path.basename(file_path), os.path.abspath(file_path),
-                detect_file_type(file_path)]  # gets just the filename from full path
+                detect_file_type(file_path), file_sha256(file_path)]  # gets just the filename from full path
     except Exception as e:
-        return [os.path.basename(file_path), f"Error: {str(e)}", "Unknown"]
+        return [os.path.basename(file_path), f"Error: {str(e)}", "Unknown", ""]
 
 # function to handle input
 # def process_input(input_path,output_dir, results = None):
@@ -60,17 +94,34 @@ def process_file(file_path): # return only filename and file type
 #     else:
 #         results.append(process_file(input_path))
 #     return results # returns a list of all file metadata
+# Office Open XML documents are ZIP containers too, but they are files to analyze, not archives
+OFFICE_EXTENSIONS = (".docx", ".xlsx", ".pptx", ".docm", ".xlsm", ".pptm")
+
+def _input_name(path):
+    # path, or the name of an open binary file (e.g. an upload buffer)
+    if hasattr(path, "read"):
+        return getattr(path, "name", None) or "upload.zip"
+    return path
+
+def is_archive(path):
+    return not _input_name(path).lower().endswith(OFFICE_EXTENSIONS) and zipfile.is_zipfile(path)
+
 def process_input(input_path, output_dir, results=None):
-    """Recursively process files, directories, and ZIP archives."""
+    """
+    Recursively process files, directories, and ZIP archives.
+    input_path may also be an open ZIP file object (an upload buffer): its members are extracted
+    straight from it, the archive itself is never written to disk.
+    """
     if results is None:
         results = []
 
-    if zipfile.is_zipfile(input_path):
-        extract_dir = os.path.join(output_dir, "extracted_files", os.path.splitext(os.path.basename(input_path))[0])
+    if is_archive(input_path):
+        extract_dir = os.path.join(output_dir, "extracted_files",
+                                   os.path.splitext(os.path.basename(_input_name(input_path)))[0])
         os.makedirs(extract_dir, exist_ok=True)
 
         with zipfile.ZipFile(input_path, 'r') as z:
-            z.extractall(extract_dir)
+            z.extractall(extract_dir)  # member by member in chunks, never the whole archive in memory
 
         # After extraction, walk through everything extracted
         for root, _, files in os.walk(extract_dir):
@@ -82,6 +133,9 @@ def process_input(input_path, output_dir, results=None):
             for file in files:
                 process_input(os.path.join(root, file), output_dir, results)
 
+    elif hasattr(input_path, "read"):
+        raise ValueError("Only ZIP archives can be read from an open file, save other inputs to disk first")
+
     elif os.path.isfile(input_path):
         results.append(process_file(input_path))
 
@@ -91,16 +145,30 @@ def process_input(input_path, output_dir, results=None):
 
 
 
+def _to_record(idx, row):
+    filename, full_path, mime, sha256 = row
+    if full_path.startswith("Error: "):  # process_file could not read it, the path is the manifest key so keep it unique
+        return FileRecord(f"<unreadable #{idx}>/{filename}", filename, mime=mime, status="error",
+                          details=full_path[len("Error: "):])
+    return FileRecord(full_path, filename, sha256, os.path.getsize(full_path), mime)
+
+
 def run_phase1(input_path, output_dir="phase1_output"):
     """
     Run Phase 1: Analyze files/ZIP and extract metadata.
-    Saves table to CSV and TXT, returns metadata info.
+    Saves table to CSV and TXT and the records to manifest.sqlite (see manifest.py), returns metadata info.
     """
     os.makedirs(output_dir, exist_ok=True)
 
     files_metadata = process_input(input_path, output_dir)
+    metrics.count("phase1_files", len(files_metadata))
+
+    records = [_to_record(idx, row) for idx, row in enumerate(files_metadata)]
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with Manifest(manifest_path, new=True) as manifest:
+        manifest.put(records)
 
-    headers = ["Filename", "Full Path", "File Type"]
+    headers = ["Filename", "Full Path", "File Type", "SHA256"]
     table = tabulate(files_metadata, headers=headers, tablefmt="grid")
 
     # Save TXT
@@ -123,12 +191,14 @@ def run_phase1(input_path, output_dir="phase1_output"):
     for ftype, count in counts.items():
         print(f"{ftype}: {count}")
 
-    print(f"\n✅ Metadata saved to:\n  {txt_path}\n  {csv_path}")
+    print(f"\n✅ Metadata saved to:\n  {txt_path}\n  {csv_path}\n  {manifest_path}")
 
     return {
         "results": files_metadata,
+        "records": records,
         "csv_path": csv_path,
-        "txt_path": txt_path
+        "txt_path": txt_path,
+        "manifest_path": manifest_path
     }
 
 
@@ -140,12 +210,19 @@ if __name__ == "__main__":
     parser.add_argument("--input", "-i", required=True, help="Path to file or ZIP archive")
     parser.add_argument("--output", "-o", default="phase1_output",
                         help="Output folder for metadata and extracted files")
+    parser.add_argument("--metrics", default=None,
+                        help="Write per-stage timings/counters here (.prom = Prometheus text format, else JSON)")
+    parser.add_argument("--profile", default=None, help="Write a cProfile dump of this phase into this folder")
     args = parser.parse_args()
 
-    result = run_phase1(args.input, args.output)
+    metrics.enable(bool(args.metrics))
+    with metrics.profiled("phase1", args.profile):
+        result = run_phase1(args.input, args.output)
+    if args.metrics:
+        metrics.write(args.metrics)
 
     # Print table on terminal
-    headers = ["Filename", "Full Path", "File Type"]
+    headers = ["Filename", "Full Path", "File Type", "SHA256"]
     print("\n" + tabulate(result["results"], headers=headers, tablefmt="grid"))
 
     print(f"\n[DONE] Phase 1 complete → CSV: {result['csv_path']}")
\ No newline at end of file
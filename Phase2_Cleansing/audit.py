@@ -10,6 +10,8 @@ import datetime
 from tabulate import tabulate
 import pandas as pd
 
+import metrics
+
 class AuditLogger:
     def __init__(self, csv_path="audit_log.csv"):
         self.csv_path = csv_path
@@ -33,8 +35,14 @@ class AuditLogger:
             "notes": notes
         }
         self.rows.append(row)
+        metrics.count("audit_rows")
+
+    def save(self, csv_only=False):
+        # csv_only skips the TXT table and the Excel copy, which take most of the time on large logs
+        with metrics.timer("audit"):
+            self._save(csv_only)
 
-    def save(self):
+    def _save(self, csv_only=False):
         base_dir = os.path.dirname(self.csv_path) or "."
         txt_path = os.path.join(base_dir, "audit_log.txt")
         xlsx_path = os.path.join(base_dir, "audit_log.xlsx")
@@ -44,6 +52,9 @@ class AuditLogger:
             writer = csv.DictWriter(f, fieldnames=self.headers)
             writer.writeheader()
             writer.writerows(self.rows)
+        if csv_only:
+            print(f"[DONE] Audit log saved → {self.csv_path}")
+            return
 
         # Save to TXT
         table = tabulate(self.rows, headers="keys", tablefmt="grid")
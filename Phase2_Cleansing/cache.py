@@ -0,0 +1,151 @@
+'''Persistent cleansing cache for Phase 2.
+
+A cleansed file only depends on the input bytes, the action (mask/remove), the spaCy flag,
+the detector patterns, the regex engine and scan budget, and whether OCR went through the
+text-region prefilter. This module stores the cleansed output + its audit rows under a
+key built from those settings, so re-runs over unchanged evidence can reuse the previous
+result instead of running OCR/redaction again.
+
+Layout of the cache folder:
+    index.json              - key -> size, last use time, extension
+    objects/ab/<key>.blob   - cleansed output file
+    objects/ab/<key>.json   - audit rows produced for it
+    objects/ab/<key>.txt.gz - post-masking text sidecar (see utils.sidecar_path)
+'''
+
+import os
+import json
+import time
+import shutil
+import hashlib
+
+from . import detectors, text_regions
+from .detectors import PATTERN_SET_VERSION, NLP
+from .utils import file_sha256
+
+CACHE_FORMAT = 2  # bump when a handler changes what it writes, so old entries are ignored
+
+
+class CleanseCache:
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self.index = {}
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except Exception as e:
+                print(f"[WARN] Cleansing cache index unreadable, starting empty: {e}")
+                self.index = {}
+
+    def make_key(self, input_file, action, use_spacy):
+        model = NLP.meta.get("version", "") if use_spacy and NLP is not None else ""  # a new spaCy model finds different entities
+        # the engine and the scan budget decide what gets redacted (re2's ASCII-only classes, UNSCANNED
+        # tails), the prefilter which image text gets OCR'd at all
+        scan = f"{detectors.ENGINE}|{detectors.SCAN_BUDGET_SECONDS}|{text_regions.cache_config()}"
+        settings = f"{CACHE_FORMAT}|{PATTERN_SET_VERSION}|{action}|{int(bool(use_spacy))}|{model}|{scan}"
+        return hashlib.sha256(f"{file_sha256(input_file)}|{settings}".encode()).hexdigest()
+
+    def _paths(self, key):
+        folder = os.path.join(self.cache_dir, "objects", key[:2])
+        return (os.path.join(folder, key + ".blob"), os.path.join(folder, key + ".json"),
+                os.path.join(folder, key + ".txt.gz"))
+
+    @staticmethod
+    def detach(output_file):
+        # outputs restored from the cache are hard links to the blob, a handler writing into
+        # the same inode would silently corrupt the cache - so unlink it before re-cleansing
+        if os.path.exists(output_file) and os.stat(output_file).st_nlink > 1:
+            os.remove(output_file)
+
+    @staticmethod
+    def _place(src, dst):
+        # hard link when possible (no extra disk space), otherwise fall back to a plain copy
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    def get(self, key, input_file, output_file, text_file=None):
+        """Restore a cached result into output_file (and its text sidecar into text_file).
+        Returns the audit rows, or None on a miss."""
+        blob_path, rows_path, text_path = self._paths(key)
+        if key not in self.index or not os.path.exists(blob_path) or not os.path.exists(rows_path):
+            self.misses += 1
+            return None
+        try:
+            with open(rows_path, encoding="utf-8") as f:
+                rows = json.load(f)
+            self._place(blob_path, output_file)
+            if text_file and os.path.exists(text_path):
+                os.makedirs(os.path.dirname(text_file), exist_ok=True)
+                self._place(text_path, text_file)
+        except Exception as e:
+            print(f"[WARN] Cache entry {key[:12]} unusable, re-cleansing: {e}")
+            self.misses += 1
+            return None
+
+        for row in rows:  # rows were recorded for another path, point them at this run's files
+            row["input_file"] = input_file
+            row["output_file"] = output_file
+        self.index[key]["last_used"] = time.time()
+        self.hits += 1
+        return rows
+
+    def put(self, key, output_file, rows, text_file=None):
+        """Store a freshly cleansed output, its audit rows and its text sidecar."""
+        if not os.path.exists(output_file):
+            return
+        blob_path, rows_path, text_path = self._paths(key)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        try:
+            shutil.copy2(output_file, blob_path)  # copy, so later edits to the output never reach the cache
+            with open(rows_path, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+            if text_file and os.path.exists(text_file):
+                shutil.copy2(text_file, text_path)
+        except Exception as e:
+            print(f"[WARN] Could not store {output_file} in cache: {e}")
+            return
+        self.index[key] = {
+            "size": sum(os.path.getsize(path) for path in (blob_path, rows_path, text_path) if os.path.exists(path)),
+            "last_used": time.time(),
+            "ext": os.path.splitext(output_file)[-1],
+        }
+
+    def evict(self):
+        # least recently used entries go first until the cache fits in max_bytes
+        total = sum(entry["size"] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= self.index.pop(key)["size"]
+        return total
+
+    def save(self):
+        total = self.evict()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)  # atomic swap, a crash never leaves a half-written index
+        return total
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.index),
+            "bytes": sum(entry["size"] for entry in self.index.values()),
+        }
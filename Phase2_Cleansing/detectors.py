@@ -1,5 +1,11 @@
 import re   # regular expression
+import sys
+import time
 import logging
+import hashlib
+from bisect import bisect_right
+
+import metrics
 
 try:
     import spacy  # natural language processing library toolkit
@@ -9,44 +15,225 @@ except Exception:
     NLP = None
     HAS_SPACY = False
 
-# high -recall regex patterns
+try:
+    import re2  # google-re2: linear-time matching, optional engine (see set_engine)
+    HAS_RE2 = True
+except Exception:
+    HAS_RE2 = False
+
+
+def _compile(pattern, flags=0):
+    # possessive quantifiers (*+, ++) need Python 3.11; older versions get the plain ones,
+    # which match the same text but are NOT backtracking-safe - there only the scan budget
+    # (SCAN_BUDGET_SECONDS) and the re2 engine protect against pathological input
+    if sys.version_info < (3, 11):
+        pattern = pattern.replace("*+", "*").replace("++", "+")
+    return re.compile(pattern, flags)
 
+# high -recall regex patterns
+# written so they can't backtrack much: a possessive quantifier never gives back characters that
+# could not have led to a match anyway (letters before [\s-], separators before a digit),
+# CREDIT_CARD's lazy {12,15}? stops at the first boundary after 13 digits like the old lazy
+# separators did, and District's \s+[A-Za-z\s]+ became \s[A-Za-z\s]+ (same language, no
+# quadratic split of a space run)
 RE_PATTERNS = {  # match the findings from this pattern
-    "Email": re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"),
-    "FULL_NAME": re.compile(r"\b([A-Z][a-z]+[\s\-]){1,2}[A-Z][a-z]+\b"),
-    "NAME_WITH_TITLE": re.compile(r"\b(Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.)\s([A-Z][a-z]+[\s\-]){1,2}[A-Z][a-z]+\b"),
+    "Email": _compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"),
+    "FULL_NAME": _compile(r"\b(?:[A-Z][a-z]++[\s\-]){1,2}[A-Z][a-z]++\b"),
+    "NAME_WITH_TITLE": _compile(r"\b(?:Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.)\s(?:[A-Z][a-z]++[\s\-]){1,2}[A-Z][a-z]++\b"),
+
+    "Phone": _compile(r"\b(\+?\d{1,3}[-.\s]?)?(\(?\d{2,4}\)?[-.\s]?)?\d{6,12}\b"),
+    "IP": _compile(r"\b(?:(?:25[0-5]|2[0-4]\d|[01]?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d?\d)\b"),
+    "CREDIT_CARD": _compile(r"\b\d(?:[ -]*+\d){12,15}?\b"),
+    "SSN_US": _compile(r"\b\d{3}-\d{2}-\d{4}\b"),
+    "URL": _compile(r"https?://[^\s]+"),
+    "AADHAR_CARD" : _compile(r"\b\d{4}\s?\d{4}\s?\d{4}\b"),
+    "PAN_CARD": _compile(r"\b[A-Z]{5}[0-9]{4}[A-Z]\b"),
+    "INDIAN_DISTRICT": _compile(r"\b(?:District|Dist|Zilla)\s[A-Za-z\s]+\b", re.IGNORECASE),
+    "INDIAN_PINCODE": _compile(r"\b\d{6}\b")
 
-    "Phone": re.compile(r"\b(\+?\d{1,3}[-.\s]?)?(\(?\d{2,4}\)?[-.\s]?)?\d{6,12}\b"),
-    "IP": re.compile(r"\b(?:(?:25[0-5]|2[0-4]\d|[01]?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d?\d)\b"),
-    "CREDIT_CARD": re.compile(r"\b(?:\d[ -]*?){13,16}\b"),
-    "SSN_US": re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
-    "URL": re.compile(r"https?://[^\s]+"),
-    "AADHAR_CARD" : re.compile(r"\b\d{4}\s?\d{4}\s?\d{4}\b"),
-    "PAN_CARD": re.compile(r"\b[A-Z]{5}[0-9]{4}[A-Z]\b"),
-    "INDIAN_DISTRICT": re.compile(r"\b(?:District|Dist|Zilla)\s+[A-Za-z\s]+\b", re.IGNORECASE),
-    "INDIAN_PINCODE": re.compile(r"\b\d{6}\b")
 
+}
 
+# where every attempt of the pattern that starts before stops reading: the first character a match
+# cannot consume, or for the names a separator not followed by a capital (keep in sync with
+# RE_PATTERNS). A scan step never reads past the end of such a break, see _scan
+RUN_BREAKS = {
+    "Email": _compile(r"[^a-zA-Z0-9_.+@-]"),
+    "FULL_NAME": _compile(r"[^A-Za-z\s-]|[\s-][^A-Z]"),
+    "NAME_WITH_TITLE": _compile(r"[^A-Za-z.\s-]|[\s-][^A-Z]"),
+    "Phone": _compile(r"[^\d+().\s-]"),
+    "IP": _compile(r"[^\d.]"),
+    "CREDIT_CARD": _compile(r"[^\d -]"),
+    "SSN_US": _compile(r"[^\d-]"),
+    "URL": _compile(r"\s"),
+    "AADHAR_CARD": _compile(r"[^\d\s]"),
+    "PAN_CARD": _compile(r"[^A-Z0-9]"),
+    "INDIAN_DISTRICT": _compile(r"[^A-Za-z\s]", re.IGNORECASE),
+    "INDIAN_PINCODE": _compile(r"\D"),
 }
 
+# a literal every match of the pattern contains - texts without it are not scanned for it
+REQUIRED_LITERALS = {"Email": "@", "URL": "http", "NAME_WITH_TITLE": "."}
+
+# Email anchored to the start of a run of local-part characters: with the plain pattern every
+# character of a long token (base64, hashes, hyphenated words...) starts a scan to the end of it.
+# finditer can resume inside a run right after a previous match, _iter_matches covers that case.
+_EMAIL_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.+-")
+_EMAIL_AT_RUN_START = re.compile(r"(?<![a-zA-Z0-9_.+-])" + RE_PATTERNS["Email"].pattern)
+
+ENGINE = "re"
+SCAN_WINDOW = 4096          # texts longer than this are scanned window by window (stdlib engine)
+SCAN_BUDGET_SECONDS = 5.0   # per text; past it the rest of the text is redacted unscanned (None = no limit)
+_re2_patterns = {}
+
+
+class ScanBudgetExceeded(Exception):
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.offset = offset  # everything before it was scanned by every pattern
+
+
+def set_engine(engine="re", budget_seconds=5.0):
+    """
+    engine: "re" (stdlib, patterns above + windowed scanning) or "re2" (google-re2, linear time
+    by construction - note its \\b, \\d and \\s only know ASCII). budget_seconds: per-text scan budget.
+    Pool workers call this from their initializer.
+    """
+    global ENGINE, SCAN_BUDGET_SECONDS
+    if engine == "re2" and not HAS_RE2:
+        print("[WARN] google-re2 is not installed, using the standard re engine")
+        engine = "re"
+    ENGINE = engine
+    SCAN_BUDGET_SECONDS = budget_seconds
+    if engine == "re2" and not _re2_patterns:
+        for name, pattern in RE_PATTERNS.items():
+            source = pattern.pattern.replace("*+", "*").replace("++", "+")  # RE2 has no possessive quantifiers (nor needs them)
+            _re2_patterns[name] = re2.compile(("(?i)" if pattern.flags & re.IGNORECASE else "") + source)
+
+
+def _iter_matches(name, text, pos, endpos):
+    # the same matches as RE_PATTERNS[name].finditer(text, pos, endpos), Emails searched from run starts only
+    if name != "Email":
+        yield from RE_PATTERNS[name].finditer(text, pos, endpos)
+        return
+    while True:
+        # pos may be inside a run (the end of a match, a window boundary): finditer tries it, the
+        # rest of the run can only match where pos does
+        while pos < endpos and text[pos] in _EMAIL_CHARS:
+            m = RE_PATTERNS["Email"].match(text, pos, endpos)
+            if m is None:
+                break
+            yield m
+            pos = m.end()
+        m = _EMAIL_AT_RUN_START.search(text, pos, endpos)
+        if m is None:
+            return
+        yield m
+        pos = m.end()
+
+
+def _run_end(name, text, start, deadline):
+    # end of the first run break at or after start, searched a window at a time within the budget
+    while start < len(text):
+        m = RUN_BREAKS[name].search(text, start, start + SCAN_WINDOW + 1)
+        if m:
+            return m.end()
+        start += SCAN_WINDOW
+        if deadline is not None and time.perf_counter() > deadline:
+            raise ScanBudgetExceeded(start)
+    return len(text)
+
+
+def _windowed_matches(name, text, deadline):
+    # RE_PATTERNS[name].finditer(text), searched a stretch at a time: from the end of the last
+    # stretch to the first run break after the window it is in - every attempt that starts in the
+    # stretch sees the same text as on the whole string
+    pos = 0
+    while pos < len(text):
+        endpos = _run_end(name, text, (pos // SCAN_WINDOW + 1) * SCAN_WINDOW, deadline)
+        yield from _iter_matches(name, text, pos, endpos)
+        pos = endpos
+
+
+def _scan(text, deadline=None):
+    """(pattern name, match) for every pattern, the same matches as RE_PATTERNS[name].finditer(text).
+    Long texts go window by window through all patterns, so a budget overrun (ScanBudgetExceeded)
+    leaves a clean split: before its offset everything was scanned, after it nothing.
+    A pattern searches up to the first run break (RUN_BREAKS) after the window, so matches running
+    on past it (long local parts, URLs, digit/space runs) are found whole, a pattern's next match
+    is held back until the window it starts in, and no single regex call reads more than a window
+    plus the unbroken run it ends in."""
+    names = [name for name in RE_PATTERNS if REQUIRED_LITERALS.get(name, "") in text]
+    if ENGINE == "re2":
+        for name in names:
+            for m in _re2_patterns[name].finditer(text):
+                yield name, m
+        return
+    if len(text) <= SCAN_WINDOW:
+        for name in names:
+            for m in RE_PATTERNS[name].finditer(text):
+                yield name, m
+        return
+    matches = {name: _windowed_matches(name, text, deadline) for name in names}
+    pending = dict.fromkeys(names)  # next match of each pattern, not yet yielded
+    for window in range(0, len(text), SCAN_WINDOW):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise ScanBudgetExceeded(window)
+        window_end = window + SCAN_WINDOW
+        for name in names:
+            try:
+                m = pending[name] if window else next(matches[name], None)
+                while m is not None and m.start() < window_end:
+                    yield name, m
+                    m = next(matches[name], None)
+            except ScanBudgetExceeded:
+                raise ScanBudgetExceeded(window)  # the other patterns are only done up to this window
+            pending[name] = m
+
+
+def _regex_detections(text):
+    detections = []
+    deadline = time.perf_counter() + SCAN_BUDGET_SECONDS if SCAN_BUDGET_SECONDS and len(text) > SCAN_WINDOW else None
+    try:
+        for name, m in _scan(text, deadline):
+            detections.append({"type": name, "match": m.group(0), "start": m.start(), "end": m.end(),
+                               "source": "regex"})
+    except ScanBudgetExceeded as e:
+        # degrade instead of hanging: the unscanned rest is treated as sensitive (fail closed)
+        detections = [d for d in detections if d["start"] < e.offset]
+        start = max([e.offset] + [d["end"] for d in detections])
+        logging.warning("PII scan of a %d character text went over its %gs budget, "
+                        "%d unscanned characters redacted", len(text), SCAN_BUDGET_SECONDS, len(text) - start)
+        metrics.count("scan_budget_exceeded")
+        if start < len(text):
+            detections.append({"type": "UNSCANNED", "match": f"[{len(text) - start} characters not scanned]",
+                               "start": start, "end": len(text), "source": "scan_budget"})
+    return detections
+
+# fingerprint of the pattern set - changes whenever a pattern is added, removed or edited,
+# so anything cached from an older rule set (see cache.py) is not reused
+PATTERN_SET_VERSION = hashlib.sha256(
+    "|".join(f"{name}:{p.pattern}:{p.flags}" for name, p in sorted(RE_PATTERNS.items())).encode()
+).hexdigest()[:16]
+
+def warm_up(use_spacy: bool = False):
+    # touches the models once so the first real file doesn't pay for lazy initialisation (used by pool workers)
+    if use_spacy and HAS_SPACY and NLP is not None:
+        NLP("warm up")
+
+
 def detect_pii_in_text(text: str, use_spacy: bool = False):   # if want to use spacy than make it true
 
-    detections = [] # creates an empty list to store all findings like emails, phNumb, names
-    for name, pattern in RE_PATTERNS.items():
-        for m in pattern.finditer(text):  # returns an iterator over all matches in the text
-            detections.append({  # for each m, dictionary is appended
-                "type":name,  # what type of PII
-                "match":m.group(0),  # the actual text matched
-                "start": m.start(), # character positions in the text
-                "end": m.end(),
-                "source": "regex"  # it says taht match came from regex detection
-            })
+    # creates a list of all findings like emails, phNumb, names: type, match, start/end positions, source
+    with metrics.timer("detect_regex"):
+        detections = _regex_detections(text)
 
 
     if use_spacy and HAS_SPACY and NLP is not None:  # only runs if spacy is installed and use_spacy is True and NLP is loaded properly
 
         try:
-            doc = NLP(text)  # passes text into spacy's pipeline -->> returns a doc object with linguistic analysis
+            with metrics.timer("detect_spacy"):
+                doc = NLP(text)  # passes text into spacy's pipeline -->> returns a doc object with linguistic analysis
             for ent in doc.ents:  # loops over detedted named entities in the text
                 if ent.label_ in ("PERSON", "ORG", "GPE", "LOC"):  # filters entities for people, org, place and location
                     detections.append({ # appends another detection dictionary
@@ -60,5 +247,78 @@ def detect_pii_in_text(text: str, use_spacy: bool = False):   # if want to use s
             logging.warning("Spacy detection failed: %s", e)  # if spacy fails, logs a warning
 
     detections.sort(key=lambda d: d["start"]) # sorts all detections by their starting position in text
+    metrics.count("detections", len(detections))
     return detections
 
+
+# joins the texts of a batch: the newlines stop every pattern that could run on (URL, Email, the
+# \s classes of the name/phone patterns) and NUL is neither a letter nor a digit, so no match can
+# start, end or cross in between two texts; \b at the edges of a text behaves as on its own
+BATCH_SEPARATOR = "\n\x00\n"
+BATCH_MAX_CHARS = 1024 * 1024  # one joined string at most, keeps the copy small and the scan within budget
+
+
+def detect_pii_batch(texts, use_spacy: bool = False):
+    """
+    Same result as [detect_pii_in_text(t, use_spacy) for t in texts], for many small texts
+    (cells, paragraphs, shapes, OCR words): each pattern runs once over the joined texts and the
+    match offsets are mapped back, instead of 12 regex calls per text.
+    """
+    results = [[] for _ in texts]
+    with metrics.timer("detect_regex"):
+        start = 0
+        while start < len(texts):
+            # next chunk of texts up to BATCH_MAX_CHARS (always at least one text)
+            end, size = start, 0
+            while end < len(texts) and (end == start or size + len(texts[end]) <= BATCH_MAX_CHARS):
+                size += len(texts[end]) + len(BATCH_SEPARATOR)
+                end += 1
+            _detect_regex_joined(texts, start, end, results)
+            start = end
+
+    if use_spacy and HAS_SPACY and NLP is not None:
+        try:
+            with metrics.timer("detect_spacy"):
+                docs = list(NLP.pipe(texts))  # one pipeline pass over the whole batch
+            for detections, doc in zip(results, docs):
+                for ent in doc.ents:
+                    if ent.label_ in ("PERSON", "ORG", "GPE", "LOC"):
+                        detections.append({"type": ent.label_, "match": ent.text, "start": ent.start_char,
+                                           "end": ent.end_char, "source": "spacy"})
+        except Exception as e:
+            logging.warning("Spacy detection failed: %s", e)
+
+    total = 0
+    for detections in results:
+        if len(detections) > 1:
+            detections.sort(key=lambda d: d["start"])
+        total += len(detections)
+    metrics.count("detections", total)
+    return results
+
+
+def _detect_regex_joined(texts, start, end, results):
+    joined = BATCH_SEPARATOR.join(texts[start:end])
+    offsets = []  # where each text starts in joined
+    pos = 0
+    for i in range(start, end):
+        offsets.append(pos)
+        pos += len(texts[i]) + len(BATCH_SEPARATOR)
+
+    crossed = set()
+    deadline = time.perf_counter() + SCAN_BUDGET_SECONDS if SCAN_BUDGET_SECONDS else None
+    try:
+        for name, m in _scan(joined, deadline):
+            k = bisect_right(offsets, m.start()) - 1
+            base = offsets[k]
+            if m.end() > base + len(texts[start + k]):
+                crossed.add(start + k)  # can't happen with BATCH_SEPARATOR, but never report a wrong span
+                continue
+            results[start + k].append({"type": name, "match": m.group(0), "start": m.start() - base,
+                                       "end": m.end() - base, "source": "regex"})
+    except ScanBudgetExceeded as e:
+        # the texts from the overrun on are scanned one by one, each with its own budget
+        crossed.update(range(start + max(0, bisect_right(offsets, e.offset) - 1), end))
+
+    for i in crossed:  # texts that contain the separator themselves: scan them on their own
+        results[i] = _regex_detections(texts[i])
@@ -7,30 +7,43 @@ and saves a sanitized version of the file.
 
 import docx
 
-from ..detectors import detect_pii_in_text
+from ..detectors import detect_pii_batch
 from ..maskers import mask_text
+import metrics
+import logging
+
+logger = logging.getLogger(__name__)  # collected per job, see utils.job_messages
 #from ..audit  import AuditLogger
 # audit = AuditLogger("audit_log.csv")
 
 #from ..audit import write_audit_row
 
-def clean_doc_file(input_path, output_path, action, use_spacy, audit):
+def clean_doc_file(input_path, output_path, action, use_spacy, audit, text_out=None, scan_only=False):
     try:
-        doc = docx.Document(input_path)  # loads the word document from path to doc
+        with metrics.timer("read"):
+            doc = docx.Document(input_path)  # loads the word document from path to doc
     except FileNotFoundError:
-        print(f"[FAIL] Word file not found: {input_path}")
+        logger.error(f"[FAIL] Word file not found: {input_path}")
         return False
     except Exception as e:
-        print(f"[FAIL] Could not open DOCX file {input_path}: {e}")
+        logger.error(f"[FAIL] Could not open DOCX file {input_path}: {e}")
         return False
 
     try:
-        for p_idx, para in enumerate(doc.paragraphs): # goes through  each para in the doc
-            if not para.text or not para.text.strip(): # skip the para, if it has no text or empty
-                continue
-            detections = detect_pii_in_text(para.text, use_spacy=use_spacy)  # scan para for PII
+        # collect the non-empty paragraphs, scan them in one batch, then mask
+        paragraphs = [(p_idx, para, para.text) for p_idx, para in enumerate(doc.paragraphs)
+                      if para.text and para.text.strip()]  # skip the para, if it has no text or empty
+        batch = detect_pii_batch([text for _, _, text in paragraphs], use_spacy=use_spacy)
+        if scan_only:  # triage: log the detections, the document is not touched
+            for (p_idx, para, text), detections in zip(paragraphs, batch):
+                for d in detections:
+                    audit.write_row(input_path, "", d.get("source"), d.get("type"), d.get("match"), "scan",
+                                    notes=f"paragraph:{p_idx+1}")
+            return True
+        for (p_idx, para, text), detections in zip(paragraphs, batch): # goes through  each para in the doc
+            cleaned_text = text
             if detections: # if found, mask it and store the cleaned version in cleaned_text
-                cleaned_text = mask_text(para.text, detections, action=action)
+                cleaned_text = mask_text(text, detections, action=action)
                 for run in para.runs: # a paragraph may consist of multiple runs (chunks of text with different formatting: bold, italic, etc.
                     run.text = ""   # Clear all existing runs
                 para.add_run(cleaned_text)  # Add back a single run containing the cleaned text
@@ -38,9 +51,12 @@ def clean_doc_file(input_path, output_path, action, use_spacy, audit):
                     audit.write_row(input_path, output_path,
                                     d.get("source"), d.get("type"), d.get("match"),
                                     action, notes = f"paragraph:{p_idx+1}")
+            if text_out is not None:
+                text_out.append(cleaned_text)
 
-        doc.save(output_path)
+        with metrics.timer("save"):
+            doc.save(output_path)
         return True
     except Exception as e:
-        print(f"[FAIL] Error processing DOCX file {input_path}: {e}")
+        logger.error(f"[FAIL] Error processing DOCX file {input_path}: {e}")
         return False
\ No newline at end of file
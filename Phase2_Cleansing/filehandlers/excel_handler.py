@@ -2,12 +2,16 @@
 and logs what was found (including sheet name and cell location).'''
 
 
-from ..detectors import detect_pii_in_text
+from ..detectors import detect_pii_batch
 from ..maskers import mask_text
+import metrics
+import logging
 from Phase2_Cleansing.audit import AuditLogger
 #audit = AuditLogger("audit_log.csv")
 #from ..audit import write_audit_row
 
+logger = logging.getLogger(__name__)  # collected per job, see utils.job_messages
+
 try:
     import openpyxl  # library to play with excel (.xlsx) files
     HAS_OPENPYXL = True
@@ -15,38 +19,56 @@ except Exception as e:
     print(f"[WARN] openpyxl library missing: {e}")
     HAS_OPENPYXL = False
 
-def clean_xlsx_file(input_path, output_path, action, use_spacy, audit):
+def clean_xlsx_file(input_path, output_path, action, use_spacy, audit, text_out=None, scan_only=False):
     # output_path is new excel file where cleaned content will be saved.
 
     if not HAS_OPENPYXL:
-        print(f"[FAIL] openpyxl library not installed, cannot process {input_path}")
+        logger.error(f"[FAIL] openpyxl library not installed, cannot process {input_path}")
         return False  # functions stops immediately if openpyxl is missing
     try:
-        wb = openpyxl.load_workbook(input_path)  # loads the workbook from the excel file
+        with metrics.timer("read"):
+            # loads the workbook from the excel file; a scan never writes back, so it can stream the sheets read-only
+            wb = openpyxl.load_workbook(input_path, read_only=scan_only)
     except FileNotFoundError:
-        print(f"[FAIL] Excel file not found: {input_path}")
+        logger.error(f"[FAIL] Excel file not found: {input_path}")
         return False
     except Exception as e:
-        print(f"[FAIL] Could not open Excel file {input_path}: {e}")
+        logger.error(f"[FAIL] Could not open Excel file {input_path}: {e}")
         return False
 
     try:
         for sheet in wb.worksheets:
-            for row in sheet.iter_rows(values_only=False): # values_only=False ensures that we get the cell objects to update not just the cell values
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str):  # only processes if call.value is a string, others aren't PIIs
-                        detections = detect_pii_in_text(cell.value, use_spacy=use_spacy)  # start detction
-                        if detections:  # if found, then pass it through mask_text
-                            cleaned_value = mask_text(cell.value, detections, action=action)
-                            cell.value = cleaned_value  # update the excel with cleaned value
-
-                            for d in detections:  # now log the changes into audit log entry
-                                audit.write_row(input_path, output_path, d.get("source"),
-                                                d.get("type"), d.get("match"), action, notes=f"sheet:{sheet.title};cell:{cell.coordinate}")
+            # collect the string cells of the sheet (others aren't PIIs), detect in one batch, then mask
+            cells = [cell for row in sheet.iter_rows(values_only=False)  # values_only=False ensures that we get the cell objects to update not just the cell values
+                     for cell in row if cell.value and isinstance(cell.value, str)]
+            batch = detect_pii_batch([cell.value for cell in cells], use_spacy=use_spacy)  # start detction
+            if scan_only:  # triage: log the detections, no cell is changed
+                for cell, detections in zip(cells, batch):
+                    for d in detections:
+                        audit.write_row(input_path, "", d.get("source"), d.get("type"), d.get("match"), "scan",
+                                        notes=f"sheet:{sheet.title};cell:{cell.coordinate}")
+                continue
+            for cell, detections in zip(cells, batch):
+                if detections:  # if found, then pass it through mask_text
+                    cleaned_value = mask_text(cell.value, detections, action=action)
+                    cell.value = cleaned_value  # update the excel with cleaned value
+
+                    for d in detections:  # now log the changes into audit log entry
+                        audit.write_row(input_path, output_path, d.get("source"),
+                                        d.get("type"), d.get("match"), action, notes=f"sheet:{sheet.title};cell:{cell.coordinate}")
   # notes shows the cell coordinates
-        wb.save(output_path)
+            if text_out is not None:  # one line per row (values after masking), same shape Phase 3 extracts
+                for row in sheet.iter_rows(values_only=True):
+                    row_values = [str(value) for value in row if value is not None]
+                    if row_values:
+                        text_out.append(" ".join(row_values))
+        if scan_only:
+            wb.close()  # read-only workbooks keep the file open
+            return True
+        with metrics.timer("save"):
+            wb.save(output_path)
         return True
     except Exception as e:
-        print(f"[FAIL] Error processing Excel file {input_path}: {e}")
+        logger.error(f"[FAIL] Error processing Excel file {input_path}: {e}")
         return False
 
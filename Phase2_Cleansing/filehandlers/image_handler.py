@@ -3,7 +3,12 @@ checks each word for PII, and then masks (black box) or removes (white box)
 the sensitive text directly from the image. It also writes an audit log entry
 for every detection and finally saves the sanitized image.'''
 
-from ..detectors import detect_pii_in_text
+from ..detectors import detect_pii_batch
+from .. import ocr_cache, text_regions
+import metrics
+import logging
+
+logger = logging.getLogger(__name__)  # collected per job, see utils.job_messages
 #from ..audit import write_audit_row
 #from Phase2_Cleansing.audit import AuditLogger
 #audit = AuditLogger("audit_log.csv")
@@ -20,20 +25,34 @@ except Exception as e:
     print(f"[WARN] Required libraries for image handling are missing: {e}")
     HAS_LIBS = False
 
-def clean_image_file(input_path, output_path, action, use_spacy, audit):
+def warm_up_ocr():
+    # checks the Tesseract binary once per process instead of discovering a missing install on every image
+    if not HAS_LIBS:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+def clean_image_file(input_path, output_path, action, use_spacy, audit, text_out=None, scan_only=False):
     if not HAS_LIBS:
-        print(f"[FAIL] Missing OCR/image libraries for {input_path}")
+        logger.error(f"[FAIL] Missing OCR/image libraries for {input_path}")
         return False
     try:
-        img_cv = cv2.imread(input_path)  # loads the image in OpenCV format (NumPy array) → used for editing.
-        if img_cv is None:
-            print(f"[FAIL] Could not read image file: {input_path}")
+        img_cv = None
+        if not scan_only:  # a scan draws nothing, OCR only needs the Pillow copy
+            with metrics.timer("read"):
+                img_cv = cv2.imread(input_path)  # loads the image in OpenCV format (NumPy array) → used for editing.
+        if img_cv is None and not scan_only:
+            logger.error(f"[FAIL] Could not read image file: {input_path}")
             return False
 
         try:
-            pil_img = Image.open(input_path).convert("RGB")  # loads the same image in Pillow format (RGB) → used for OCR.
+            with metrics.timer("read"):
+                pil_img = Image.open(input_path).convert("RGB")  # loads the same image in Pillow format (RGB) → used for OCR.
         except Exception as e:
-            print(f"[FAIL] PIL cannot open {input_path}: {e}")
+            logger.error(f"[FAIL] PIL cannot open {input_path}: {e}")
             return False
 
         # OCR (extract text with bounding boxes)
@@ -42,21 +61,35 @@ def clean_image_file(input_path, output_path, action, use_spacy, audit):
                #text → the recognized text
                #left, top, width, height → bounding box coordinates
                #level → hierarchy of OCR (page, block, paragraph, line, word).
-        data = pytesseract.image_to_data(pil_img, output_type=pytesseract.Output.DICT)
+        # a repeated image (same bytes, same Tesseract) comes from the OCR cache, see ocr_cache.py;
+        # images without text-like regions skip Tesseract, see text_regions.py
+        with metrics.timer("ocr"):
+            data = ocr_cache.cached(input_path, "data", lambda: text_regions.image_to_data(pil_img),
+                                    config=text_regions.cache_config())
         n_boxes = len(data['level'])
-        for i in range(n_boxes): # Loops through every detected word (n_boxes).
-            txt = data['text'][i].strip() # txt is the actual word recognized.
-            if not txt: # Skip empty words (OCR sometimes returns blanks).
-                continue
-            detections = detect_pii_in_text(txt, use_spacy=use_spacy)
+        # Skip empty words (OCR sometimes returns blanks), the rest is scanned in one batch
+        words = [(i, data['text'][i].strip()) for i in range(n_boxes) if data['text'][i].strip()]
+        batch = detect_pii_batch([txt for _, txt in words], use_spacy=use_spacy)
+        if scan_only:  # triage: log the detections, the image is not redrawn or saved
+            for (i, txt), detections in zip(words, batch):
+                for d in detections:
+                    audit.write_row(input_path, "", d.get("source"), d.get("type"), d.get("match"), "scan",
+                                    notes=f"box:{i}")
+            return True
+        lines = {}  # (block, paragraph, line) -> words after masking, rebuilt into text for the sidecar
+        for (i, txt), detections in zip(words, batch): # Loops through every detected word, txt is the word recognized.
+            line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            masked_word = ("[REDACTED]" if action == "mask" else "") if detections else txt
+            lines.setdefault(line_key, []).append(masked_word)
 
             # Mask or remove detected text
             if detections:
                 x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                if action == "mask":  # If action = "mask" → draw a black rectangle over it
-                    cv2.rectangle(img_cv, (x, y), (x + w, y + h), (0, 0, 0), thickness=-1)
-                elif action == "remove": # If action = "remove" → draw a white rectangle over it.
-                    cv2.rectangle(img_cv, (x, y), (x + w, y + h), (255, 255, 255), thickness=-1)  # thickness=-1 → fills the rectangle completely
+                with metrics.timer("mask"):
+                    if action == "mask":  # If action = "mask" → draw a black rectangle over it
+                        cv2.rectangle(img_cv, (x, y), (x + w, y + h), (0, 0, 0), thickness=-1)
+                    elif action == "remove": # If action = "remove" → draw a white rectangle over it.
+                        cv2.rectangle(img_cv, (x, y), (x + w, y + h), (255, 255, 255), thickness=-1)  # thickness=-1 → fills the rectangle completely
 
                 # logs the action
                 for d in detections:
@@ -65,12 +98,15 @@ def clean_image_file(input_path, output_path, action, use_spacy, audit):
                                     action, notes=f"box:{i}")
 
 # save the cleaned image
-        cv2.imwrite(output_path, img_cv)  # Writes the modified OpenCV image (img_cv) to output_path.
+        with metrics.timer("save"):
+            cv2.imwrite(output_path, img_cv)  # Writes the modified OpenCV image (img_cv) to output_path.
+        if text_out is not None:  # the OCR text, so Phase 3 doesn't have to run Tesseract a second time
+            text_out.append("\n".join(" ".join(w for w in words if w) for words in lines.values()))
         return True
     except pytesseract.TesseractNotFoundError:
-        print(f"[FAIL] Tesseract OCR not installed or not in PATH for {input_path}")
+        logger.error(f"[FAIL] Tesseract OCR not installed or not in PATH for {input_path}")
         return False
     except Exception as e:
-        print(f"[FAIL] Error processing {input_path}: {e}")
+        logger.error(f"[FAIL] Error processing {input_path}: {e}")
         return False
 
@@ -2,27 +2,47 @@ import pptx
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 
 
-from ..detectors import detect_pii_in_text
+from ..detectors import detect_pii_batch
 from ..maskers import mask_text
+import metrics
+import logging
+
+logger = logging.getLogger(__name__)  # collected per job, see utils.job_messages
 #from ..audit import write_audit_row
 #from Phase2_Cleansing.audit import AuditLogger
 #audit = AuditLogger("audit_log.csv")
 
-def clean_pptx_file(input_path, output_path, action, use_spacy,audit, remove_immages = True):
+def clean_pptx_file(input_path, output_path, action, use_spacy,audit, remove_immages = True, text_out=None,
+                    scan_only=False):
     try:
-        prs = pptx.Presentation(input_path) # loads the file into prs object
+        with metrics.timer("read"):
+            prs = pptx.Presentation(input_path) # loads the file into prs object
     except FileNotFoundError:
-        print(f"[FAIL] PowerPoint file not found: {input_path}")
+        logger.error(f"[FAIL] PowerPoint file not found: {input_path}")
         return False
     except Exception as e:
-        print(f"[FAIL] Could not open PPTX file {input_path}: {e}")
+        logger.error(f"[FAIL] Could not open PPTX file {input_path}: {e}")
         return False
 
     try:
+        # scan the text of every shape of the deck in one batch up front
+        texts = [shape.text for slide in prs.slides for shape in slide.shapes
+                 if hasattr(shape, "text") and shape.text]
+        if scan_only:  # triage: log the detections per slide, no text or picture is touched
+            batch = iter(detect_pii_batch(texts, use_spacy=use_spacy))
+            for slide_idx, slide in enumerate(prs.slides):
+                for shape in slide.shapes:
+                    if hasattr(shape, "text") and shape.text:
+                        for d in next(batch):
+                            audit.write_row(input_path, "", d.get("source"), d.get("type"), d.get("match"), "scan",
+                                            notes=f"slide:{slide_idx+1}")
+            return True
+        batch = iter(detect_pii_batch(texts, use_spacy=use_spacy))
         for slide_idx, slide in enumerate(prs.slides): # goes through every silde
-            for shape in slide.shapes: # goes through every shape in the slide
+            for shape in list(slide.shapes): # goes through every shape in the slide (a copy, pictures get removed)
                 if hasattr(shape, "text") and shape.text: # if the shape has text and it's not empty then scan it for PII
-                    detections = detect_pii_in_text(shape.text, use_spacy=use_spacy)
+                    detections = next(batch)
+                    cleaned_text = shape.text
                     if detections: # if found PII, then mask_text to remove it and store it in cleaned_result
                         cleaned_text = mask_text(shape.text, detections, action=action)
 
@@ -38,6 +58,8 @@ def clean_pptx_file(input_path, output_path, action, use_spacy,audit, remove_imm
                             audit.write_row(input_path, output_path, d.get("source"),
                                             d.get("type"), d.get("match"), action, notes=f"slide:{slide_idx+1}")
                   # logs which slide number the detection was found
+                    if text_out is not None:
+                        text_out.append(cleaned_text)
 
                 # optionally removes image (useful in case image contains sensitive data)
                 if remove_immages and shape.shape_type ==13:   # if shape_type ==13, then remove the image from the slide
@@ -49,9 +71,10 @@ def clean_pptx_file(input_path, output_path, action, use_spacy,audit, remove_imm
                                     "IMAGE", "image_removed", "remove",
                                     notes = f"slide{slide_idx+1}")
 
-        prs.save(output_path)
+        with metrics.timer("save"):
+            prs.save(output_path)
         return True
     except Exception as e:
-        print(f"[FAIL] Error processing PPTX file {input_path}: {e}")
+        logger.error(f"[FAIL] Error processing PPTX file {input_path}: {e}")
         return False
 
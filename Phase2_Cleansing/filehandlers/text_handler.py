@@ -4,27 +4,34 @@
 
 from ..detectors import detect_pii_in_text
 from ..maskers import mask_text
+import metrics
 #from ..audit import write_audit_row
 #from Phase2_Cleansing.audit import AuditLogger
 # audit = AuditLogger("audit_log.csv")
 
 
 
-def clean_text_file(input_path, output_path, action, use_spacy, audit):
+def clean_text_file(input_path, output_path, action, use_spacy, audit, text_out=None, scan_only=False):
     try:
-        with open(input_path, "r",encoding="utf-8", errors="ignore") as f: ## skips invalid character instead of crashing
+        with metrics.timer("read"), open(input_path, "r",encoding="utf-8", errors="ignore") as f: ## skips invalid character instead of crashing
             text = f.read()
     except Exception: # returns false, if file doesn't exist
         return False
 
 # detects sensitive information
     detections = detect_pii_in_text(text, use_spacy=use_spacy)
+    if scan_only:  # triage: only the audit rows, nothing is masked or written
+        for d in detections:
+            audit.write_row(input_path, "", d.get("source"), d.get("type"), d.get("match"), "scan")
+        return True
 
 # texts are passed into mask_text and action is taken and cleaned result is stored in cleaned_text
     cleaned_text = mask_text(text, detections, action=action)
 
-    with open(output_path, "w", encoding="utf-8") as f: # opens in write mode
+    with metrics.timer("save"), open(output_path, "w", encoding="utf-8") as f: # opens in write mode
         f.write(cleaned_text) # and writes the sanitized text in it
+    if text_out is not None:  # caller wants the post-masking text (Phase 3 sidecar)
+        text_out.append(cleaned_text)
 
     for d in detections:  # loops through every detection found
         audit.write_row(   # calls to log it
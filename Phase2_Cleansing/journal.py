@@ -0,0 +1,100 @@
+'''Checkpoint journal for long Phase 2 / Phase 3 runs.
+
+Every finished file is appended as one JSON line to <output_dir>/<phase>_journal.jsonl together
+with everything needed to rebuild its result (status, audit rows, report row...) and the size and
+mtime of the file, so an input that changed since is processed again. With
+--resume the files already in the journal are not processed again, so a run that dies at file
+40,000 picks up where it stopped instead of starting over.
+
+Lines are written through a normal buffered file and fsynced in batches (every `batch` records
+or `interval` seconds, and on close), so a file costs one json.dumps + write. A crash loses at
+most the last unsynced batch, which is simply processed again; a torn last line is ignored.
+The first line records the run settings - a journal written with other settings is not reused.
+'''
+
+import os
+import json
+import time
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Journal:
+    def __init__(self, output_dir, phase, settings, resume=False, batch=64, interval=2.0):
+        self.path = os.path.join(output_dir, f"{phase}_journal.jsonl")
+        self.settings = settings
+        self.batch = batch
+        self.interval = interval
+        self.done = {}  # key -> record, from the previous run when resuming
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+        if resume:
+            self.done = self._load()
+        mode = "a" if self.done else "w"
+        self._file = open(self.path, mode, encoding="utf-8")
+        if mode == "w":
+            self._file.write(json.dumps({"settings": settings}) + "\n")
+            self.sync()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        done = {}
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        try:
+            header = json.loads(lines[0])
+        except (ValueError, IndexError):
+            header = {}
+        if header.get("settings") != self.settings:
+            print(f"[WARN] {self.path} was written with different settings, starting over")
+            return {}
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # empty or torn last line of a crashed run
+            done[record["key"]] = record
+        if lines[-1]:  # make sure new records don't get glued to a torn line
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n")
+        return done
+
+    def get(self, path):
+        """The previous run's record of path, None when it was not finished or the file changed since."""
+        record = self.done.get(path)
+        if record and record["stamp"] == file_stamp(path):
+            return record
+        return None
+
+    def write(self, path, **record):
+        record["key"] = path
+        record["stamp"] = file_stamp(path)
+        self._file.write(json.dumps(record) + "\n")
+        self._pending += 1
+        if self._pending >= self.batch or time.monotonic() - self._last_sync >= self.interval:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,9 +1,21 @@
 import os
+import time
+import logging
 import argparse  # to handle command_line arguments
 import csv  # to read phase 1 metadata CSVs
-
-from .utils import ensure_dir
+from collections import Counter
+
+from .utils import (ensure_dir, sidecar_path, write_text_sidecar, parse_shard, select_shard, file_sha256,
+                    job_messages)
+from .detectors import warm_up, set_engine
+from . import detectors
+from .cache import CleanseCache
+from .journal import Journal
+from . import ocr_cache, text_regions
+from .scheduler import SupervisedPool, estimate_cost, estimate_memory, order_by_cost, STATUS_DONE, STATUS_ERROR
 from Phase2_Cleansing.audit import AuditLogger  # make sure this is the latest version with save()
+import metrics
+from manifest import normalize_type, FileRecord, is_manifest, load as load_manifest, save as save_manifest
 
 
 
@@ -13,62 +25,53 @@ from .filehandlers.pdf_handler import clean_pdf_file
 from .filehandlers.excel_handler import clean_xlsx_file
 from .filehandlers.pptx_handler import clean_pptx_file
 from .filehandlers.doc_handler import clean_doc_file
-from .filehandlers.image_handler import clean_image_file
+from .filehandlers.image_handler import clean_image_file, warm_up_ocr
 
+logger = logging.getLogger("Phase2_Cleansing.main")  # also under python -m, where __name__ is __main__
 
 
 
 
-def normalize_type(file_type, filename):
-    ext = os.path.splitext(filename)[-1].lower().strip(".")  # get extension
 
-    if "/" in file_type:  # MIME type
-        if "pdf" in file_type: return "pdf"
-        if "word" in file_type or file_type.startswith("application/vnd.openxmlformats-officedocument.wordprocessingml"):
-            return "docx"
-        if "presentation" in file_type or file_type.startswith("application/vnd.openxmlformats-officedocument.presentationml"):
-            return "pptx"
-        if "spreadsheet" in file_type or file_type.startswith("application/vnd.openxmlformats-officedocument.spreadsheetml"):
-            return "xlsx"
-        if "image" in file_type:
-            return ext
-    return ext
+# every type route_file has a handler for, anything else is reported as 'unsupported' without dispatching it
+SUPPORTED_TYPES = ["txt", "csv", "log", "json", "pdf", "xlsx", "xls", "pptx", "docx", "png", "jpg", "jpeg"]
 
 
-def route_file(input_path, output_path, file_type, action, use_spacy, audit):
+def route_file(input_path, output_path, file_type, action, use_spacy, audit, text_out=None, scan_only=False):
 
 
     # Routes file to appropriate handler based on type - similar to a dispatcher
     try:
 
        file_type = file_type.lower()  # Normalize file extension like  PDF -> pdf
-       os.makedirs(os.path.dirname(output_path), exist_ok=True)  # ensure output folder exists
+       if not scan_only:  # a scan only detects, handlers write nothing
+           os.makedirs(os.path.dirname(output_path), exist_ok=True)  # ensure output folder exists
 
 
        # If extension matches ,  send file to the right handler.
        if file_type in ["txt", "csv", "log", "json"]:
-           return clean_text_file(input_path, output_path, action, use_spacy, audit)
+           return clean_text_file(input_path, output_path, action, use_spacy, audit, text_out=text_out, scan_only=scan_only)
 
        elif file_type == "pdf":
-           return clean_pdf_file(input_path, output_path, action, use_spacy, audit)
+           return clean_pdf_file(input_path, output_path, action, use_spacy, audit, text_out=text_out, scan_only=scan_only)
 
        elif file_type in ["xlsx", "xls"]:
-           return clean_xlsx_file(input_path, output_path, action, use_spacy, audit)
+           return clean_xlsx_file(input_path, output_path, action, use_spacy, audit, text_out=text_out, scan_only=scan_only)
 
        elif file_type == "pptx":
-           return clean_pptx_file(input_path, output_path, action, use_spacy, audit)
+           return clean_pptx_file(input_path, output_path, action, use_spacy, audit, text_out=text_out, scan_only=scan_only)
 
        elif file_type == "docx":
-           return clean_doc_file(input_path, output_path, action, use_spacy, audit)
+           return clean_doc_file(input_path, output_path, action, use_spacy, audit, text_out=text_out, scan_only=scan_only)
 
        elif file_type in ["png", "jpg", "jpeg"]:
-           return clean_image_file(input_path, output_path, action, use_spacy, audit)
+           return clean_image_file(input_path, output_path, action, use_spacy, audit, text_out=text_out, scan_only=scan_only)
 
        else:
-           print(f"[WARN] Unsupported file type: {file_type} ({input_path})")
+           logger.warning(f"[WARN] Unsupported file type: {file_type} ({input_path})")
            return False
     except Exception as  e:
-        print(f"[FAIL] {input_path} → {file_type}: {e}")
+        logger.error(f"[FAIL] {input_path} → {file_type}: {e}")
         return False
 
 #
@@ -152,27 +155,58 @@ def route_file(input_path, output_path, file_type, action, use_spacy, audit):
 # if __name__ == "__main__":
 #     main()
 
-def run_phase2(input_path, output_dir="cleansed_output", action="mask", use_spacy=False):
-    """Run Phase 2 cleansing and return structured results."""
-    ensure_dir(output_dir)
-    #audit = AuditLogger(os.path.join(output_dir, "audit_log.csv"))
-    audit_log_path = os.path.join(output_dir, "audit_log.csv")
-    audit = AuditLogger(audit_log_path)
-
-    cleansed_files = []
+PHASE1_COLUMNS = ["Filename", "Full Path", "File Type", "SHA256"]  # files_metadata.csv written by Phase 1
+
+
+def _jobs_from_rows(rows, output_dir, hashes):
+    jobs = []
+    for row in rows:
+        input_file = row.get("Full Path", row["Filename"])
+        file_type = normalize_type(row["File Type"], row["Filename"])
+        output_file = os.path.join(output_dir, os.path.basename(input_file))
+        jobs.append([os.path.basename(input_file), input_file, output_file, file_type])
+        if row.get("SHA256"):
+            hashes[input_file] = row["SHA256"]
+    return jobs
+
+
+def _jobs_from_records(records, output_dir, hashes):
+    # FileRecords (Phase 1 manifest): the type was normalized when the record was made
+    jobs = []
+    for record in records:
+        jobs.append([record.filename, record.path, os.path.join(output_dir, os.path.basename(record.path)),
+                     record.file_type])
+        if record.sha256:
+            hashes[record.path] = record.sha256
+    return jobs
+
+
+def collect_jobs(input_path, output_dir, records=None, shard=None, hashes=None):
+    """
+    Build the ordered list of files to cleanse.
+    Each job is [filename, input_file, output_file, file_type]; the order of this
+    list is the order rows appear in cleansed_files.csv.
+    records: Phase 1 rows already in memory (run_phase1()["results"] or dicts keyed like
+    files_metadata.csv, or FileRecords from the manifest), used instead of reading input_path.
+    shard: (index, count) keeps only this machine's slice of the files (by content hash).
+    hashes: optional dict, filled with input_file -> SHA256 where it is known.
+    """
+    jobs = []
+    hashes = {} if hashes is None else hashes
+
+    # Case 0: in-memory Phase 1 records/rows (pipeline_runner, manifest), no CSV round trip
+    if records is not None:
+        records = list(records)
+        if records and isinstance(records[0], FileRecord):
+            jobs = _jobs_from_records(records, output_dir, hashes)
+        else:
+            jobs = _jobs_from_rows((r if isinstance(r, dict) else dict(zip(PHASE1_COLUMNS, r)) for r in records),
+                                   output_dir, hashes)
 
     # Case 1: CSV input (from Phase 1)
-    if input_path.endswith(".csv"):
+    elif input_path.endswith(".csv"):
         with open(input_path, newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                input_file = row.get("Full Path", row["Filename"])
-                file_type = normalize_type(row["File Type"], row["Filename"])
-                output_file = os.path.join(output_dir, os.path.basename(input_file))
-               # os.makedirs(os.path.dirname(output_file), exist_ok=True)  #  ensure output folder exists
-                success = route_file(input_file, output_file, file_type, action, use_spacy, audit)
-                if success:
-                    cleansed_files.append([os.path.basename(input_file), output_file, file_type])
+            jobs = _jobs_from_rows(csv.DictReader(csvfile), output_dir, hashes)
 
     # Case 2: Folder input
     elif os.path.isdir(input_path):
@@ -181,36 +215,337 @@ def run_phase2(input_path, output_dir="cleansed_output", action="mask", use_spac
                 input_file = os.path.join(root, file)
                 ext = os.path.splitext(file)[-1].lower().strip(".")
                 output_file = os.path.join(output_dir, file)
-
-                #os.makedirs(os.path.dirname(output_file), exist_ok=True)  #  ensure output folder exists
-                success = route_file(input_file, output_file, ext, action, use_spacy, audit)
-                if success:
-                    cleansed_files.append([file, output_file, ext])
+                jobs.append([file, input_file, output_file, ext])
 
     # Case 3: Single file input
     else:
         file = os.path.basename(input_path)
         ext = os.path.splitext(file)[-1].lower().strip(".")
         output_file = os.path.join(output_dir, file)
-
-        #os.makedirs(os.path.dirname(output_file), exist_ok=True)  # ensure output folder exists
-        success = route_file(input_path, output_file, ext, action, use_spacy, audit)
-        if success:
-            cleansed_files.append([file, output_file, ext])
-
-    # Save cleansed metadata CSV
-    cleansed_csv = os.path.join(output_dir, "cleansed_files.csv")
-    with open(cleansed_csv, "w", newline="", encoding="utf-8") as f:
+        jobs.append([file, input_path, output_file, ext])
+
+    if shard:
+        jobs = select_shard(jobs, lambda job: job[1], shard, hashes)
+    return jobs
+
+
+def _init_worker(use_spacy, metrics_enabled=False, ocr_settings=(None,), ocr_prefilter=True,
+                 regex_settings=("re", 5.0)):
+    # runs once in every pool process, so spaCy and Tesseract are loaded per worker and not per file
+    metrics.enable(metrics_enabled)
+    set_engine(*regex_settings)
+    ocr_cache.configure(*ocr_settings)
+    text_regions.enable(ocr_prefilter)
+    warm_up(use_spacy)
+    warm_up_ocr()
+
+
+def cleanse_job(job, action, use_spacy, scan_only=False):
+    """
+    Cleanse a single job and return its outcome instead of printing it.
+    Returns a dict with success flag, the audit rows it produced and the failure reason (if any).
+    scan_only: only detect, the handlers write no cleansed file and no sidecar.
+    Safe to call both in-process and inside a pool worker.
+    """
+    filename, input_file, output_file, file_type = job
+    audit = AuditLogger()  # per-job logger, rows are merged by the caller in job order
+    text_out = None if scan_only else []
+    text_path = ""
+    start = time.perf_counter()
+    metrics.begin_file(input_file, "phase2")
+    # handlers log why a file failed, only what this thread logs belongs to the job (no stdout swap,
+    # other threads of the process - app.py, pipeline_daemon.py - keep printing as usual)
+    with job_messages() as messages:
+        try:
+            success = route_file(input_file, output_file, file_type, action, use_spacy, audit, text_out=text_out,
+                                 scan_only=scan_only)
+            if success and not scan_only:
+                text_path = sidecar_path(output_file)
+                write_text_sidecar(text_path, "\n".join(text_out))
+        except Exception as e:
+            success = False
+            messages.append(f"[FAIL] {input_file} → {file_type}: {e}")
+
+    error = ""
+    if not success:
+        lines = [line for line in messages if line.strip()]
+        error = lines[-1] if lines else f"[FAIL] Could not cleanse {input_file}"
+        text_path = ""
+
+    return {"success": bool(success), "rows": audit.rows, "error": error, "text_path": text_path,
+            "seconds": round(time.perf_counter() - start, 6), "metrics": metrics.end_file()}
+
+
+def _iter_outcomes(pending, action, use_spacy, workers, timeout=None, memory_limit=None, memory_budget=None,
+                   scan_only=False):
+    """
+    pending: list of (idx, job). Yields (idx, status, outcome) as files finish.
+    Serial runs without budgets stay in this process; everything else goes through the
+    SupervisedPool, which hands out the most expensive files first and enforces the budgets.
+    memory_budget caps the estimated memory of the files processed at the same time (a serial
+    run only ever has one file in flight, so it does not need the pool for that).
+    """
+    if workers <= 1 and not timeout and not memory_limit:
+        for idx, job in pending:
+            outcome = cleanse_job(job, action, use_spacy, scan_only)
+            yield idx, "ok" if outcome["success"] else "failed", outcome
+        return
+
+    if workers > 1:  # largest first, so the long files overlap with the many small ones
+        costs = [estimate_cost(job[1], job[3]) for idx, job in pending]
+        pending = [pending[i] for i in order_by_cost(costs)]
+
+    initargs = (use_spacy, metrics.ENABLED, ocr_cache.settings(), text_regions.ENABLED,
+                (detectors.ENGINE, detectors.SCAN_BUDGET_SECONDS))  # the parent's settings, workers don't share them
+    pool = SupervisedPool(workers, cleanse_job, initializer=_init_worker, initargs=initargs,
+                          timeout=timeout, memory_limit=memory_limit,
+                          memory_budget=memory_budget if workers > 1 else None)
+    memory_costs = {idx: estimate_memory(job[1], job[3]) for idx, job in pending} if memory_budget else None
+    for idx, status, payload in pool.run(((idx, (job, action, use_spacy, scan_only)) for idx, job in pending),
+                                         memory_costs):
+        if status == STATUS_DONE:
+            yield idx, "ok" if payload["success"] else "failed", payload
+        else:
+            yield idx, "failed" if status == STATUS_ERROR else status, {"success": False, "rows": [], "error": payload,
+                                                                        "text_path": ""}
+    if pool.admission:
+        print(f"[BUDGET] Peak estimated in-flight memory {pool.admission.peak / 1024 ** 2:.0f} MB "
+              f"of {memory_budget / 1024 ** 2:.0f} MB")
+    if pool.recycled:
+        print(f"[BUDGET] {pool.recycled} worker(s) recycled after their memory grew between files")
+
+
+def write_pii_summary(csv_path, summary):
+    """
+    pii_summary.csv of a scan-only run: one row per file with its total and a column per
+    detection type. summary: [filename, input_file, file_type, status, error, Counter of types].
+    Returns the rows written.
+    """
+    types = sorted(set().union(*(counts for *_, counts in summary)))
+    rows = [[filename, input_file, file_type, status, error, sum(counts.values())] + [counts[t] for t in types]
+            for filename, input_file, file_type, status, error, counts in summary]
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerow(["Filename", "Full Path", "File Type"])
-        writer.writerows(cleansed_files)
-
-    audit.save()
-
+        writer.writerow(["Filename", "Full Path", "File Type", "Status", "Details", "Detections"] + types)
+        writer.writerows(rows)
+    return rows
+
+
+def run_phase2(input_path, output_dir="cleansed_output", action="mask", use_spacy=False, workers=1,
+               cache_dir=None, cache_max_bytes=2 * 1024 ** 3,
+               timeout=None, memory_limit=None, max_file_bytes=None, records=None,
+               progress=None, memory_budget=None, shard=None, resume=False,
+               ocr_cache_path=None, ocr_cache_max_bytes=512 * 1024 ** 2, ocr_prefilter=True,
+               regex_engine="re", scan_budget=5.0, manifest_path=None, scan_only=False):
+    """
+    Run Phase 2 cleansing and return structured results.
+    workers > 1 cleanses files in a process pool; output ordering is the same as a serial run.
+    cache_dir enables the persistent cleansing cache (see cache.py): unchanged inputs cleansed
+    with the same settings are restored from it instead of being processed again.
+    timeout (seconds) and memory_limit (bytes) are per-file budgets, a file that exceeds one
+    is killed and reported with that status; files above max_file_bytes are skipped.
+    memory_budget (bytes) bounds the estimated RAM of all files in flight across the workers
+    (see scheduler.AdmissionController), dispatch waits until enough of it is free.
+    shard: "i/N" or (i, N) - only cleanse slice i of N by content hash (multi-node runs, the
+    per-shard outputs are combined with merge_shards.py).
+    ocr_cache_path: SQLite file of the OCR result cache (see ocr_cache.py), images OCR'd before
+    by either phase are not OCR'd again.
+    ocr_prefilter=False sends every image to Tesseract instead of skipping those without
+    text-like regions (see text_regions.py).
+    regex_engine: "re" or "re2" (google-re2, linear time); scan_budget: seconds one text may take
+    in the regex scan before its unscanned rest is redacted as UNSCANNED (None = no limit).
+    Finished files are recorded in phase2_journal.jsonl (see journal.py); resume=True skips the
+    files a previous run with the same settings already finished and restores their rows.
+    Every input gets a row in cleansed_files.csv with its Status and, when cleansed, the
+    path of its post-masking text sidecar (Text Path) that Phase 3 reads instead of re-extracting.
+    records: Phase 1 result rows to cleanse instead of reading input_path (see collect_jobs).
+    manifest_path: Phase 1 manifest.sqlite (see manifest.py) whose records are updated with each
+    file's status, cleansed output, sidecar and seconds; passing the manifest as input_path does both.
+    progress(done, total, filename) is called as files finish (filename None for the initial call).
+    scan_only=True is a detect-only triage run: the handlers scan the same text but mask, redact
+    and save nothing. Instead of cleansed_files.csv it writes pii_summary.csv (detections per
+    type for every file) next to audit_log.csv (no TXT/XLSX copies); the cleansing cache and the
+    manifest are not used.
+    """
+    ensure_dir(output_dir)
+    #audit = AuditLogger(os.path.join(output_dir, "audit_log.csv"))
+    audit_log_path = os.path.join(output_dir, "audit_log.csv")
+    audit = AuditLogger(audit_log_path)
+    cache = CleanseCache(cache_dir, cache_max_bytes) if cache_dir and not scan_only else None
+    if ocr_cache_path:
+        ocr_cache.configure(ocr_cache_path, ocr_cache_max_bytes)
+    text_regions.enable(ocr_prefilter)
+    set_engine(regex_engine, scan_budget)
+
+    if records is None and is_manifest(input_path):
+        manifest_path = manifest_path or input_path
+        records = load_manifest(input_path)
+    by_path = {r.path: r for r in records if isinstance(r, FileRecord)} if records is not None else {}
+
+    hashes = {}
+    jobs = collect_jobs(input_path, output_dir, records, parse_shard(shard) if isinstance(shard, str) else shard,
+                        hashes)
+    for job in jobs:
+        os.makedirs(os.path.dirname(job[2]) or ".", exist_ok=True)  # ensure output folder exists before workers write into it
+
+    statuses = [None] * len(jobs)
+    outcomes = [None] * len(jobs)
+
+    # files that are never dispatched: unsupported types and inputs above the size limit
+    for idx, (filename, input_file, output_file, file_type) in enumerate(jobs):
+        if input_file in by_path and by_path[input_file].status == "error":  # Phase 1 could not read it
+            statuses[idx] = "failed"
+            outcomes[idx] = {"success": False, "rows": [], "error": by_path[input_file].details, "text_path": ""}
+        elif file_type.lower() not in SUPPORTED_TYPES:
+            statuses[idx] = "unsupported"
+            outcomes[idx] = {"success": False, "rows": [], "error": f"Unsupported file type: {file_type}", "text_path": ""}
+        elif max_file_bytes and os.path.exists(input_file) and os.path.getsize(input_file) > max_file_bytes:
+            statuses[idx] = "skipped"
+            outcomes[idx] = {"success": False, "rows": [], "text_path": "",
+                             "error": f"{os.path.getsize(input_file) / 1024 ** 2:.0f} MB is above the "
+                                      f"{max_file_bytes / 1024 ** 2:.0f} MB limit"}
+
+    # cache lookups happen here in the parent, only the misses are sent to the workers
+    keys = [None] * len(jobs)
+    if cache:
+        for idx, (filename, input_file, output_file, file_type) in enumerate(jobs):
+            if statuses[idx]:
+                continue
+            try:
+                keys[idx] = cache.make_key(input_file, action, use_spacy)
+            except OSError:
+                continue  # unreadable input, let the handler report it
+            text_path = sidecar_path(output_file)
+            rows = cache.get(keys[idx], input_file, output_file, text_path)
+            if rows is None:
+                cache.detach(output_file)
+                cache.detach(text_path)
+            else:
+                statuses[idx] = "cached"
+                outcomes[idx] = {"success": True, "rows": rows, "error": "", "text_path": text_path}
+
+    # everything that changes what a file's result looks like: the engine/budget decide what gets
+    # redacted, the prefilter which image text is OCR'd (effective values, after the fallbacks above)
+    journal = Journal(output_dir, "phase2", {"action": action, "use_spacy": use_spacy, "scan_only": scan_only,
+                                             "regex_engine": detectors.ENGINE,
+                                             "scan_budget": detectors.SCAN_BUDGET_SECONDS,
+                                             "ocr_prefilter": text_regions.cache_config()},
+                      resume=resume)
+    if resume:
+        resumed = 0
+        for idx, (filename, input_file, output_file, file_type) in enumerate(jobs):
+            if statuses[idx]:
+                continue
+            record = journal.get(input_file)
+            outcome = record and record["outcome"]
+            # only files that were cleansed count as done: failed / timed out / killed ones are tried again
+            if outcome and outcome["success"] and (scan_only or (os.path.exists(output_file) and
+                                                   (not outcome["text_path"] or os.path.exists(outcome["text_path"])))):
+                statuses[idx] = record["status"]
+                outcomes[idx] = outcome
+                resumed += 1
+            else:
+                # not finished last time: whatever it left behind is not a cleansed file
+                for leftover in (output_file, sidecar_path(output_file)):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+        print(f"[INFO] Resuming: {resumed} file(s) already done according to {journal.path}")
+
+    pending = [(idx, job) for idx, job in enumerate(jobs) if statuses[idx] is None]
+    done = len(jobs) - len(pending)
+    if progress:
+        progress(done, len(jobs), None)
+    for idx, status, outcome in _iter_outcomes(pending, action, use_spacy, workers, timeout, memory_limit,
+                                               memory_budget, scan_only):
+        if scan_only and status == "ok":
+            status = "scanned"
+        statuses[idx] = status
+        outcomes[idx] = outcome
+        metrics.merge_file(outcome.pop("metrics", None))
+        output_file = jobs[idx][2]
+        done += 1
+        if progress:
+            progress(done, len(jobs), jobs[idx][0])
+        if status == "ok" and cache and keys[idx]:
+            cache.put(keys[idx], output_file, outcome["rows"], outcome["text_path"])
+        elif status in ("timeout", "memory", "crashed"):
+            for leftover in (output_file, sidecar_path(output_file)):
+                if os.path.exists(leftover):
+                    os.remove(leftover)  # whatever a killed worker left behind is not a cleansed file
+        journal.write(jobs[idx][1], status=status, outcome=outcome)
+    journal.close()
+
+    # merge in job order, so the CSV and audit log look the same however the work was scheduled
+    cleansed_files = []
+    summary = []
+    failures = []
+    for job, status, outcome in zip(jobs, statuses, outcomes):
+        metrics.count(f"phase2_files_{status}")
+        filename, input_file, output_file, file_type = job
+        audit.rows.extend(outcome["rows"])
+        if scan_only:
+            summary.append([filename, input_file, file_type, status, outcome["error"],
+                            Counter(row["detection_type"] for row in outcome["rows"])])
+        else:
+            if outcome["success"] and not hashes.get(input_file):
+                # Phase 3 shards a folder of cleansed files by these hashes of the originals
+                try:
+                    hashes[input_file] = file_sha256(input_file)
+                except OSError:
+                    pass
+            cleansed_files.append([filename, output_file, file_type, status, outcome["error"], outcome["text_path"],
+                                   hashes.get(input_file, "")])
+        if not outcome["success"]:
+            failures.append([filename, input_file, outcome["error"]])
+        record = None if scan_only else by_path.get(input_file)
+        if record:
+            record.status, record.details, record.text_path = status, outcome["error"], outcome["text_path"]
+            record.output_path = output_file if outcome["success"] else ""
+            if outcome.get("seconds") is not None:
+                record.timings = dict(record.timings or {}, phase2=outcome["seconds"])
+
+    if scan_only:
+        cleansed_csv = os.path.join(output_dir, "pii_summary.csv")
+        cleansed_files = write_pii_summary(cleansed_csv, summary)
+    else:
+        # Save cleansed metadata CSV
+        cleansed_csv = os.path.join(output_dir, "cleansed_files.csv")
+        with open(cleansed_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Filename", "Full Path", "File Type", "Status", "Details", "Text Path", "SHA256"])
+            writer.writerows(cleansed_files)
+
+    audit.save(csv_only=scan_only)
+    if manifest_path and by_path and not scan_only:
+        save_manifest(manifest_path, by_path.values())
+
+    cache_stats = None
+    if cache:
+        cache.save()
+        cache_stats = cache.stats()
+        print(f"[CACHE] {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es) "
+              f"→ hit rate {cache_stats['hit_rate']:.0%}, {cache_stats['entries']} entries "
+              f"({cache_stats['bytes'] / 1024 ** 2:.1f} MB)")
+    if ocr_cache_path:
+        ocr_stats = ocr_cache.stats()
+        print(f"[CACHE] OCR cache: {ocr_stats['entries']} entries ({ocr_stats['bytes'] / 1024 ** 2:.1f} MB)")
+
+    if scan_only:
+        with_pii = sum(1 for row in summary if row[-1])
+        print(f"[SCAN] {with_pii} of {len(jobs)} file(s) contain PII, {len(audit.rows)} detection(s) → {cleansed_csv}")
+    if failures:
+        counts = Counter(status for status in statuses if status not in ("ok", "cached", "scanned"))
+        reasons = ", ".join(f"{count} {status}" for status, count in counts.items())
+        print(f"[WARN] {len(failures)} of {len(jobs)} file(s) not {'scanned' if scan_only else 'cleansed'} "
+              f"({reasons}), see {cleansed_csv}")
     print(f"[DONE] Phase 2 complete. Audit log → {audit_log_path}")
 
     return {
         "results": cleansed_files,
+        "records": list(by_path.values()) if by_path else None,
+        "manifest_path": manifest_path,
+        "failures": failures,
+        "cache": cache_stats,
         "csv_path": cleansed_csv,
         "audit_log": audit_log_path,
         "output_dir": output_dir
@@ -219,14 +554,63 @@ def run_phase2(input_path, output_dir="cleansed_output", action="mask", use_spac
 
 def main():
     parser = argparse.ArgumentParser(description="Phase 2: File Cleansing and Analysis")
-    parser.add_argument("--input", "-i", required=True, help="Path to a file, folder, or Phase1 CSV")
+    parser.add_argument("--input", "-i", required=True,
+                        help="Path to a file, folder, Phase1 CSV or Phase1 manifest.sqlite (updated in place)")
     parser.add_argument("--output", "-o", default="cleansed_output", help="Output directory")
     parser.add_argument("--action", "-a", choices=["mask", "remove"], default="mask", help="PII handling mode")
     parser.add_argument("--use-spacy", action="store_true", help="Enable spaCy NER in addition to regex")
+    parser.add_argument("--scan-only", action="store_true",
+                        help="Triage: only detect PII and write pii_summary.csv + audit_log.csv, no cleansed files")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Number of worker processes (1 = cleanse serially in this process)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse cleansed outputs of unchanged files from this cache folder")
+    parser.add_argument("--cache-max-mb", type=int, default=2048,
+                        help="Size limit of the cleansing cache, least recently used entries are evicted")
+    parser.add_argument("--ocr-cache", default=None,
+                        help="SQLite file caching OCR results by image content, shared with Phase 3")
+    parser.add_argument("--ocr-cache-max-mb", type=int, default=512, help="Size limit of the OCR cache")
+    parser.add_argument("--no-ocr-prefilter", action="store_true",
+                        help="OCR every image, also those the text-region check finds no text in")
+    parser.add_argument("--regex-engine", choices=["re", "re2"], default="re",
+                        help="PII pattern engine, re2 (google-re2 package) matches in linear time")
+    parser.add_argument("--scan-budget", type=float, default=5.0,
+                        help="Seconds the PII scan of one text may take, the unscanned rest is then redacted")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Per-file wall-clock budget in seconds, slower files are killed and marked 'timeout'")
+    parser.add_argument("--max-memory-mb", type=int, default=None,
+                        help="Per-file memory budget, a worker going above it is killed and the file marked 'memory'")
+    parser.add_argument("--max-file-mb", type=int, default=None,
+                        help="Skip input files larger than this (marked 'skipped')")
+    parser.add_argument("--memory-budget-mb", type=int, default=None,
+                        help="RAM ceiling for all files in flight (estimated from type and size), "
+                             "workers wait for budget before taking the next file")
+    parser.add_argument("--shard", default=None, metavar="i/N",
+                        help="Only cleanse slice i of N (by content hash), for splitting a run across machines")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run in the same output folder, files it finished are not redone")
+    parser.add_argument("--metrics", default=None,
+                        help="Write per-stage timings/counters here (.prom = Prometheus text format, else JSON)")
+    parser.add_argument("--profile", default=None, help="Write a cProfile dump of this phase into this folder")
     args = parser.parse_args()
 
-    run_phase2(args.input, args.output, args.action, args.use_spacy)
+    metrics.enable(bool(args.metrics))
+    with metrics.profiled("phase2", args.profile):
+        result = run_phase2(args.input, args.output, args.action, args.use_spacy, workers=args.workers,
+                            cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024 ** 2,
+                            timeout=args.timeout,
+                            memory_limit=args.max_memory_mb * 1024 ** 2 if args.max_memory_mb else None,
+                            max_file_bytes=args.max_file_mb * 1024 ** 2 if args.max_file_mb else None,
+                            memory_budget=args.memory_budget_mb * 1024 ** 2 if args.memory_budget_mb else None,
+                            shard=args.shard, resume=args.resume, ocr_cache_path=args.ocr_cache,
+                            ocr_cache_max_bytes=args.ocr_cache_max_mb * 1024 ** 2,
+                            ocr_prefilter=not args.no_ocr_prefilter, regex_engine=args.regex_engine,
+                            scan_budget=args.scan_budget or None, scan_only=args.scan_only)
+    if args.metrics:
+        metrics.write(args.metrics)
+    for filename, input_file, error in result["failures"]:
+        print(f"[FAIL] {filename}: {error}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
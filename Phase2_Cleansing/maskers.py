@@ -2,11 +2,18 @@
 
 from typing import Tuple, Dict, List
 
+import metrics
+
 def mask_text(
         text : str,  # original text
         detections : List[dict], # output of detectors from [detect_pii_in_text] (with start, end, match from previous file)
         action : str = "mask"   # replace with remove to delete the text
 ) -> str: # returns a new string with masked PII
+    with metrics.timer("mask"):
+        return _mask_text(text, detections, action)
+
+
+def _mask_text(text, detections, action):
     out = []
     last_idx = 0  # # keeps track of where we last stopped copying
     for d in detections:
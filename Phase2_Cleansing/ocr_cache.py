@@ -0,0 +1,165 @@
+'''Persistent OCR result cache shared by Phase 2 (image_handler) and Phase 3 (extractors).
+
+The same screenshots and scanned forms come back batch after batch, and Tesseract is by far the
+slowest step for them. Results are stored in one SQLite file under a key built from the image
+bytes and the OCR settings (call, tesseract version, config), so an image that was OCR'd before
+- in any run, by any phase - is not OCR'd again:
+    image_to_data   -> the word boxes dict Phase 2 masks with
+    image_to_string -> the plain text Phase 3 classifies
+
+SQLite in WAL mode lets several pool workers read and write the same file; every process opens
+its own connection. The cache is size bounded, least recently used entries are evicted: the
+total size is kept in a meta row updated with every put, and a hit only writes its last_used
+time when the stored one is more than LAST_USED_RESOLUTION seconds old, so hits stay reads.
+
+    ocr_cache.configure("ocr_cache.sqlite", max_bytes=512 * 1024 ** 2)   # once per process
+    data = ocr_cache.cached(path, "data", lambda: pytesseract.image_to_data(img, output_type=...))
+'''
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import functools
+
+from .utils import file_sha256
+import metrics
+
+OCR_CACHE_FORMAT = 1  # bump when what is stored per entry changes
+LAST_USED_RESOLUTION = 60.0  # seconds, finer LRU order is not worth a write per hit
+
+_path = None
+_max_bytes = 512 * 1024 ** 2
+_conn = None
+_conn_pid = None
+
+
+def configure(path, max_bytes=512 * 1024 ** 2):
+    """Turns the cache on for this process (path None turns it off). Pool workers call it in their initializer."""
+    global _path, _max_bytes, _conn
+    if _conn is not None and path != _path:
+        _conn.close()
+        _conn = None
+    _path = path
+    _max_bytes = max_bytes
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+
+def settings():
+    """(path, max_bytes), to hand the configuration to worker processes."""
+    return _path, _max_bytes
+
+
+def _connect():
+    global _conn, _conn_pid
+    if _conn is not None and _conn_pid == os.getpid():
+        return _conn
+    # a connection inherited through fork must not be used, open a new one in this process
+    _conn = sqlite3.connect(_path, timeout=30, isolation_level=None)
+    _conn_pid = os.getpid()
+    _conn.execute("PRAGMA journal_mode=WAL")
+    _conn.execute("PRAGMA synchronous=NORMAL")
+    _conn.execute("CREATE TABLE IF NOT EXISTS ocr (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                  "bytes INTEGER NOT NULL, last_used REAL NOT NULL)")
+    _conn.execute("CREATE INDEX IF NOT EXISTS ocr_last_used ON ocr (last_used)")
+    _conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    if _conn.execute("SELECT 1 FROM meta WHERE name = 'bytes'").fetchone() is None:
+        # running total of the entry sizes, counted once for caches written before it was kept
+        _conn.execute("INSERT OR IGNORE INTO meta (name, value) SELECT 'bytes', COALESCE(SUM(bytes), 0) FROM ocr")
+    return _conn
+
+
+@functools.lru_cache(maxsize=None)
+def _tesseract_version():
+    try:
+        import pytesseract
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return ""
+
+
+def make_key(image_path, kind, config=""):
+    settings = f"{OCR_CACHE_FORMAT}|{kind}|{_tesseract_version()}|{config}"
+    return hashlib.sha256(f"{file_sha256(image_path)}|{settings}".encode()).hexdigest()
+
+
+def get(key):
+    conn = _connect()
+    row = conn.execute("SELECT value, last_used FROM ocr WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    now = time.time()
+    if now - row[1] > LAST_USED_RESOLUTION:
+        conn.execute("UPDATE ocr SET last_used = ? WHERE key = ?", (now, key))
+    return json.loads(row[0])
+
+
+def put(key, value):
+    conn = _connect()
+    blob = json.dumps(value)
+    conn.execute("BEGIN IMMEDIATE")  # entry and total change together, also with other processes writing
+    try:
+        old = conn.execute("SELECT bytes FROM ocr WHERE key = ?", (key,)).fetchone()
+        conn.execute("INSERT OR REPLACE INTO ocr (key, value, bytes, last_used) VALUES (?, ?, ?, ?)",
+                     (key, blob, len(blob), time.time()))
+        total = _add_bytes(conn, len(blob) - (old[0] if old else 0))
+        if total > _max_bytes:
+            _evict(conn, total)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _add_bytes(conn, delta):
+    conn.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'", (delta,))
+    return conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+
+def _evict(conn, total):
+    # drop least recently used entries until we are 10% below the limit, so we don't evict on every put
+    target = total - int(_max_bytes * 0.9)
+    freed = 0
+    stale = []
+    for key, size in conn.execute("SELECT key, bytes FROM ocr ORDER BY last_used"):
+        stale.append((key,))
+        freed += size
+        if freed >= target:
+            break
+    conn.executemany("DELETE FROM ocr WHERE key = ?", stale)
+    _add_bytes(conn, -freed)
+
+
+def cached(image_path, kind, run, config=""):
+    """run() (an OCR call) through the cache: returns the stored result for this image + settings,
+    or runs it and stores what it returns. Without configure() this is just run()."""
+    if not _path:
+        return run()
+    try:
+        key = make_key(image_path, kind, config)
+        value = get(key)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[WARN] OCR cache unavailable for {image_path}: {e}")
+        return run()
+    if value is not None:
+        metrics.count("ocr_cache_hits")
+        return value
+    metrics.count("ocr_cache_misses")
+    value = run()
+    try:
+        put(key, value)
+    except sqlite3.Error as e:
+        print(f"[WARN] Could not store OCR result of {image_path}: {e}")
+    return value
+
+
+def stats():
+    """Entries and bytes currently in the cache (None when it is off)."""
+    if not _path:
+        return None
+    conn = _connect()
+    entries = conn.execute("SELECT COUNT(*) FROM ocr").fetchone()[0]
+    size = conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+    return {"entries": entries, "bytes": size}
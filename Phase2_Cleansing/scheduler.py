@@ -0,0 +1,284 @@
+'''Size-aware scheduling for Phase 2.
+
+ProcessPoolExecutor cannot stop a single task, so one corrupt PDF or a 3 GB log could hold a
+worker (and the whole batch) forever. SupervisedPool runs its own worker processes, keeps track
+of what each one is doing, and kills + replaces a worker whose file runs past the wall-clock or
+memory budget. Work is handed out largest (most expensive) first so big files don't end up
+running alone at the end of the batch. With a memory budget a worker whose memory has grown
+by more than half of its headroom (what the allocator and caches keep after each file) is
+recycled between files, so the budget is not spent by earlier files and hit by an innocent one.
+
+AdmissionController keeps the estimated memory of the files being processed at the same time
+under a budget: a file is only dispatched once enough of the budget is free.
+'''
+
+import os
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+try:
+    import psutil  # optional, used for memory budgets on platforms without /proc
+    HAS_PSUTIL = True
+except Exception:
+    HAS_PSUTIL = False
+
+# rough cost per input byte for each handler - OCR is far slower per byte than plain text
+COST_WEIGHTS = {
+    "png": 40, "jpg": 40, "jpeg": 40,
+    "pdf": 8,
+    "docx": 4, "pptx": 4, "xlsx": 6, "xls": 6,
+    "txt": 1, "csv": 1, "log": 1, "json": 1,
+}
+
+# rough peak RAM per input byte - handlers load the whole file, images are decompressed to raw
+# pixels (plus OCR), Office files are unzipped and parsed into XML trees
+MEMORY_FACTORS = {
+    "png": 12, "jpg": 30, "jpeg": 30,
+    "pdf": 6,
+    "docx": 20, "pptx": 15, "xlsx": 50, "xls": 50,
+    "txt": 4, "csv": 4, "log": 4, "json": 4,
+}
+BASE_MEMORY = 16 * 1024 ** 2  # per-file overhead on top of the file itself
+
+# what a finished task can report back
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_MEMORY = "memory"
+STATUS_CRASHED = "crashed"
+
+
+def estimate_cost(input_file, file_type):
+    try:
+        size = os.path.getsize(input_file)
+    except OSError:
+        size = 0
+    return size * COST_WEIGHTS.get(file_type, 2)
+
+
+def estimate_memory(input_file, file_type):
+    try:
+        size = os.path.getsize(input_file)
+    except OSError:
+        size = 0
+    return BASE_MEMORY + size * MEMORY_FACTORS.get(file_type, 8)
+
+
+class AdmissionController:
+    """
+    Global in-flight memory budget. try_admit(cost) reserves cost bytes if they fit (a file larger
+    than the whole budget is still admitted when nothing else is running, so it can't block
+    forever), release(cost) gives them back when the file is done.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.in_flight = 0
+        self.running = 0
+        self.peak = 0
+        self.waits = 0  # dispatches held back because the budget was used up
+
+    def fits(self, cost):
+        return self.running == 0 or self.in_flight + cost <= self.budget
+
+    def try_admit(self, cost):
+        if not self.fits(cost):
+            return False
+        self.in_flight += cost
+        self.running += 1
+        self.peak = max(self.peak, self.in_flight)
+        return True
+
+    def release(self, cost):
+        self.in_flight -= cost
+        self.running -= 1
+
+    def pick(self, queue, costs):
+        """Position of the first queued (idx, ...) task whose cost fits, None if none does."""
+        for pos, task in enumerate(queue):
+            if self.fits(costs.get(task[0], 0)):
+                return pos
+        self.waits += 1
+        return None
+
+
+def order_by_cost(costs):
+    """Indexes of costs, most expensive first (ties keep their original order)."""
+    return sorted(range(len(costs)), key=lambda i: -costs[i])
+
+
+def rss_bytes(pid):
+    # resident memory of a worker process, None if it cannot be measured on this platform
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    if HAS_PSUTIL:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except Exception:
+            return None
+    return None
+
+
+def _worker_main(conn, func, initializer, initargs):
+    if initializer is not None:
+        initializer(*initargs)
+    conn.send(("ready", None))  # only now the parent starts the clock for this worker
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        idx, args = task
+        try:
+            conn.send((idx, (STATUS_DONE, func(*args))))
+        except BaseException as e:
+            conn.send((idx, (STATUS_ERROR, f"{type(e).__name__}: {e}")))
+
+
+class SupervisedPool:
+    def __init__(self, workers, func, initializer=None, initargs=(),
+                 timeout=None, memory_limit=None, poll_interval=0.5, memory_budget=None):
+        self.workers = max(1, workers)
+        self.func = func
+        self.initializer = initializer
+        self.initargs = initargs
+        self.timeout = timeout              # seconds per file, None = unlimited
+        self.memory_limit = memory_limit    # bytes of RSS per worker, None = unlimited
+        self.poll_interval = poll_interval
+        self.admission = AdmissionController(memory_budget) if memory_budget else None
+        self.ctx = multiprocessing.get_context()
+        self.slots = []
+        self.recycled = 0  # workers replaced between files because they had grown too large
+
+        if memory_limit and rss_bytes(os.getpid()) is None:
+            print("[WARN] Memory budget not supported on this platform (install psutil), it will be ignored")
+            self.memory_limit = None
+
+    def _spawn(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        proc = self.ctx.Process(target=_worker_main, daemon=True,
+                                args=(child_conn, self.func, self.initializer, self.initargs))
+        proc.start()
+        child_conn.close()
+        return {"proc": proc, "conn": parent_conn, "ready": False, "task": None, "started": None, "cost": 0,
+                "base_rss": None}
+
+    def _replace(self, slot):
+        # a killed or dead worker is swapped for a fresh one, the batch carries on
+        try:
+            slot["proc"].kill()
+            slot["proc"].join(5)
+        except Exception:
+            pass
+        slot["conn"].close()
+        self.slots[self.slots.index(slot)] = self._spawn()
+
+    def _finish(self, slot):
+        slot["task"] = None
+        if self.admission:
+            self.admission.release(slot["cost"])
+        slot["cost"] = 0
+
+    def _recycle_if_grown(self, slot):
+        # memory a file leaves behind stays with the worker; once the growth since start-up has
+        # used half the headroom under the limit, the next file gets a fresh worker
+        if not self.memory_limit or slot["base_rss"] is None:
+            return
+        rss = rss_bytes(slot["proc"].pid)
+        if rss and rss - slot["base_rss"] > (self.memory_limit - slot["base_rss"]) / 2:
+            self.recycled += 1
+            try:
+                slot["conn"].send(None)  # idle, let it exit on its own
+                slot["proc"].join(2)
+            except Exception:
+                pass
+            self._replace(slot)
+
+    def run(self, tasks, memory_costs=None):
+        """
+        tasks: iterable of (idx, args) in dispatch order.
+        memory_costs: {idx: estimated bytes}, used with memory_budget - a task is held back until
+        its estimate fits in the budget, smaller tasks further down the queue may go first.
+        Yields (idx, status, payload) as files finish; payload is func's return value for
+        STATUS_DONE and an error message for everything else.
+        """
+        queue = deque(tasks)
+        memory_costs = memory_costs or {}
+        self.slots = [self._spawn() for _ in range(min(self.workers, len(queue)) or 1)]
+        try:
+            while queue or any(slot["task"] for slot in self.slots):
+                for slot in self.slots:
+                    if slot["ready"] and slot["task"] is None and queue:
+                        if self.admission:
+                            pos = self.admission.pick(queue, memory_costs)
+                            if pos is None:
+                                break  # budget used up, wait for a running file to finish
+                            task = queue[pos]
+                            del queue[pos]
+                            slot["cost"] = memory_costs.get(task[0], 0)
+                            self.admission.try_admit(slot["cost"])
+                        else:
+                            task = queue.popleft()
+                        slot["task"] = task
+                        slot["started"] = time.monotonic()
+                        slot["conn"].send(slot["task"])
+
+                conns = [slot["conn"] for slot in self.slots]
+                for conn in wait(conns, timeout=self.poll_interval):
+                    slot = next(s for s in self.slots if s["conn"] is conn)
+                    try:
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        if slot["task"] is not None:
+                            idx = slot["task"][0]
+                            slot["proc"].join(1)  # collect the exit code for the report
+                            self._finish(slot)
+                            yield idx, STATUS_CRASHED, f"worker exited with code {slot['proc'].exitcode}"
+                        elif not slot["ready"]:
+                            raise RuntimeError("Phase 2 worker failed to start")
+                        self._replace(slot)
+                        continue
+                    if message[0] == "ready":
+                        slot["ready"] = True
+                        slot["base_rss"] = rss_bytes(slot["proc"].pid) if self.memory_limit else None
+                        continue
+                    idx, (status, payload) = message
+                    self._finish(slot)
+                    self._recycle_if_grown(slot)
+                    yield idx, status, payload
+
+                now = time.monotonic()
+                for slot in list(self.slots):
+                    if slot["task"] is None:
+                        continue
+                    idx = slot["task"][0]
+                    if self.timeout and now - slot["started"] > self.timeout:
+                        self._finish(slot)
+                        self._replace(slot)
+                        yield idx, STATUS_TIMEOUT, f"exceeded {self.timeout:g}s wall-clock budget"
+                    elif self.memory_limit:
+                        rss = rss_bytes(slot["proc"].pid)
+                        if rss and rss > self.memory_limit:
+                            self._finish(slot)
+                            self._replace(slot)
+                            yield idx, STATUS_MEMORY, (f"used {rss / 1024 ** 2:.0f} MB, budget is "
+                                                       f"{self.memory_limit / 1024 ** 2:.0f} MB")
+        finally:
+            for slot in self.slots:
+                try:
+                    slot["conn"].send(None)
+                except Exception:
+                    pass
+            for slot in self.slots:
+                slot["proc"].join(2)
+                if slot["proc"].is_alive():
+                    slot["proc"].kill()
+                slot["conn"].close()
+            self.slots = []
@@ -0,0 +1,129 @@
+'''Cheap text-presence prefilter in front of Tesseract.
+
+Photos, logos and blank thumbnails (the thumbnail.jpeg / image1.png media inside OOXML files)
+cost Tesseract hundreds of milliseconds each and give nothing back. Before OCR we look for
+text-like regions with OpenCV in a few milliseconds:
+    morphological gradient -> threshold -> horizontal close (joins letters into words)
+    -> contours whose size and fill look like words / lines of text - all of them, also those
+       nested in other contours (labels in table cells, form fields, boxes on a floor plan)
+No such region: OCR is skipped and the image has no text. Otherwise only the padded bounding
+box of the regions is sent to Tesseract (the whole image when they cover most of it), and the
+word boxes are shifted back to image coordinates.
+
+The detector errs on the side of OCR: anything word-shaped counts, so a false positive only
+costs the OCR call we would have made anyway. Disable it with enable(False) / --no-ocr-prefilter.
+Skipped / cropped / full images are counted in metrics (ocr_prefilter_*), the detection time
+is the "text_regions" stage; benchmarks/bench_ocr_prefilter.py reports skip rate and time saved.
+'''
+
+import metrics
+
+try:
+    import cv2
+    import numpy as np
+    HAS_CV2 = True
+except Exception:
+    HAS_CV2 = False
+
+try:
+    import pytesseract
+    HAS_TESSERACT = True
+except Exception:
+    HAS_TESSERACT = False
+
+ENABLED = True
+
+MAX_SIDE = 1200        # detection runs on a downscaled copy, text stays detectable at this size
+MIN_CONTRAST = 40      # gradient below this is noise / compression artefacts, not letter edges
+PADDING = 12           # pixels kept around the detected text so Tesseract sees whole glyphs
+FULL_IMAGE_SHARE = 0.8  # crop only pays off when the text covers less of the image than this
+
+DATA_KEYS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+             "left", "top", "width", "height", "conf", "text"]
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def find_text_regions(gray):
+    """Word/line sized boxes (x, y, w, h) in image coordinates where gray (2D uint8) looks like text."""
+    height, width = gray.shape[:2]
+    scale = min(1.0, MAX_SIDE / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    otsu, _ = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    _, edges = cv2.threshold(gradient, max(otsu, MIN_CONTRAST), 255, cv2.THRESH_BINARY)
+    words = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+    # RETR_LIST, not RETR_EXTERNAL: the outline of a bordered box would hide every word inside it,
+    # the size/fill filter below drops the borders themselves
+    contours, _ = cv2.findContours(words, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+    max_height = max(40, small.shape[0] // 4)  # taller than that is a shape or a photo, not a line of text
+    regions = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < 6 or w < 6 or h > max_height:
+            continue
+        fill = cv2.countNonZero(edges[y:y + h, x:x + w]) / float(w * h)
+        if 0.1 <= fill <= 0.9:  # letters are a mix of edges and background, solid blobs and hairlines are not
+            regions.append((int(x / scale), int(y / scale), int(w / scale) + 1, int(h / scale) + 1))
+    return regions
+
+
+def text_crop(gray):
+    """None when the image has no text, else the (x, y, w, h) part of it worth sending to OCR."""
+    with metrics.timer("text_regions"):
+        regions = find_text_regions(gray)
+    height, width = gray.shape[:2]
+    if not regions:
+        metrics.count("ocr_prefilter_skipped")
+        return None
+    x0 = max(0, min(x for x, y, w, h in regions) - PADDING)
+    y0 = max(0, min(y for x, y, w, h in regions) - PADDING)
+    x1 = min(width, max(x + w for x, y, w, h in regions) + PADDING)
+    y1 = min(height, max(y + h for x, y, w, h in regions) + PADDING)
+    if (x1 - x0) * (y1 - y0) >= FULL_IMAGE_SHARE * width * height:
+        metrics.count("ocr_prefilter_full")
+        return 0, 0, width, height
+    metrics.count("ocr_prefilter_cropped")
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _crop_for(pil_img):
+    # (x, y, w, h) to OCR or None; without OpenCV / with the prefilter off always the whole image
+    if not ENABLED or not HAS_CV2:
+        return (0, 0) + pil_img.size
+    return text_crop(np.asarray(pil_img.convert("L")))
+
+
+def image_to_data(pil_img):
+    """pytesseract.image_to_data(..., output_type=DICT) behind the prefilter, boxes in image coordinates."""
+    box = _crop_for(pil_img)
+    if box is None:
+        return {key: [] for key in DATA_KEYS}
+    x, y, w, h = box
+    if (w, h) == pil_img.size:
+        return pytesseract.image_to_data(pil_img, output_type=pytesseract.Output.DICT)
+    data = pytesseract.image_to_data(pil_img.crop((x, y, x + w, y + h)), output_type=pytesseract.Output.DICT)
+    data["left"] = [left + x for left in data["left"]]
+    data["top"] = [top + y for top in data["top"]]
+    return data
+
+
+def image_to_string(pil_img):
+    """pytesseract.image_to_string behind the prefilter ("" for images without text)."""
+    box = _crop_for(pil_img)
+    if box is None:
+        return ""
+    x, y, w, h = box
+    if (w, h) == pil_img.size:
+        return pytesseract.image_to_string(pil_img)
+    return pytesseract.image_to_string(pil_img.crop((x, y, x + w, y + h)))
+
+
+def cache_config():
+    """Part of the OCR cache key: results with and without the prefilter are kept apart."""
+    return "prefilter" if ENABLED and HAS_CV2 else ""
@@ -1,7 +1,97 @@
 # just a helper file to guarantee that output folder exists.
 
 import os
+import gzip
+import hashlib
+import logging
+import threading
+import contextlib
+
+from manifest import file_sha256  # the same content hash as Phase 1, cache.py / ocr_cache.py import it from here
 
 def ensure_dir(path):
     if not os.path.exists(path):
-        os.makedirs(path, exist_ok=True)
\ No newline at end of file
+        os.makedirs(path, exist_ok=True)
+
+# post-masking text of every cleansed file is kept next to it (gzip) so Phase 3 can read it
+# instead of extracting / OCR-ing the cleansed file again
+SIDECAR_DIR = "text_sidecars"
+
+def sidecar_path(output_file):
+    return os.path.join(os.path.dirname(output_file), SIDECAR_DIR, os.path.basename(output_file) + ".txt.gz")
+
+# deterministic sharding for multi-node runs: every machine gets "i/N" and keeps the files whose
+# content hash falls into slice i, so N machines cover the input exactly once
+def parse_shard(spec):
+    """'2/8' -> (2, 8); None/'' -> None."""
+    if not spec:
+        return None
+    try:
+        index, count = (int(part) for part in str(spec).split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got '{spec}'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be between 0 and N-1, got '{spec}'")
+    return index, count
+
+def shard_of(sha256_hex, count):
+    return int(sha256_hex[:16], 16) % count
+
+def select_shard(items, path_of, shard, hashes):
+    """
+    Keep the items (jobs/tasks) of shard (index, count). hashes maps path -> SHA256 (from the
+    Phase 1 manifest); missing ones are computed and added. Unreadable files are assigned by
+    their path, so exactly one shard still reports them.
+    """
+    index, count = shard
+    selected = []
+    for item in items:
+        path = path_of(item)
+        sha = hashes.get(path)
+        if not sha:
+            try:
+                sha = hashes[path] = file_sha256(path)
+            except OSError:
+                sha = hashlib.sha256(path.encode("utf-8")).hexdigest()
+        if shard_of(sha, count) == index:
+            selected.append(item)
+    return selected
+
+def write_text_sidecar(path, text):
+    ensure_dir(os.path.dirname(path))
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+
+
+# file handlers report why a file failed through the "Phase2_Cleansing" logger; while a thread runs
+# a job (cleanse_job) its messages are collected for that job only, other threads keep printing
+class _JobMessages(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.jobs = {}  # thread id -> messages of the job it is running
+
+    def emit(self, record):
+        messages = self.jobs.get(record.thread)
+        if messages is None:
+            print(self.format(record))
+        else:
+            messages.append(self.format(record))
+
+
+_job_messages = _JobMessages()
+logger = logging.getLogger("Phase2_Cleansing")
+logger.addHandler(_job_messages)
+logger.setLevel(logging.INFO)
+logger.propagate = False  # printed or collected here, not a second time by the root logger
+
+
+@contextlib.contextmanager
+def job_messages():
+    """Collects what Phase 2 logs in this thread while the block runs, as a list of lines."""
+    messages = []
+    ident = threading.get_ident()
+    _job_messages.jobs[ident] = messages
+    try:
+        yield messages
+    finally:
+        del _job_messages.jobs[ident]
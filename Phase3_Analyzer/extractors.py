@@ -5,87 +5,216 @@ the appropriate libraries.'''
 
 
 import os  # for file path handling
-import pytesseract  # pytesseract + PIL.Image - OCR text from images.
-from pdfminer.high_level import extract_text as pdf_extract_text  # extract text from pdfs
-from pptx import Presentation # read powerpoint slides
-import docx # reads docs file
-import openpyxl # for excel spreadsheets
-from PIL import Image
+import gzip  # Phase 2 text sidecars are gzip compressed
 
+from Phase2_Cleansing import ocr_cache  # OCR results shared with Phase 2 across runs
+from Phase2_Cleansing import text_regions  # skips OCR on images without text
 
+# every library is optional, a format whose libraries are all missing reports an extraction error
+try:
+    import pytesseract  # pytesseract + PIL.Image - OCR text from images.
+    from PIL import Image
+    HAS_TESSERACT = True
+except Exception:
+    HAS_TESSERACT = False
+
+try:
+    from pdfminer.high_level import extract_pages as pdf_extract_pages  # extract text from pdfs, one page at a time
+    from pdfminer.layout import LTTextContainer
+    HAS_PDFMINER = True
+except Exception:
+    HAS_PDFMINER = False
+
+try:
+    import fitz  # PyMuPDF, already used by Phase 2 for redaction
+    HAS_PYMUPDF = True
+except Exception:
+    HAS_PYMUPDF = False
+
+try:
+    from pptx import Presentation # read powerpoint slides
+    HAS_PPTX = True
+except Exception:
+    HAS_PPTX = False
+
+try:
+    import docx # reads docs file
+    HAS_DOCX = True
+except Exception:
+    HAS_DOCX = False
+
+try:
+    import openpyxl # for excel spreadsheets
+    HAS_OPENPYXL = True
+except Exception:
+    HAS_OPENPYXL = False
 
-# opens image with pillow.
-def extract_from_image(file_path):
-    try:
-        text = pytesseract.image_to_string(Image.open(file_path)) # Uses tesseract OCR to detect and extract text.
-        return text.strip() # .strip() removes leading whitespace
-    except Exception as e:
-        return f"[ERROR extracting image: {e}]"
 
-def extract_from_pptx(file_path):
-    try:
-        prs = Presentation(file_path) # loads a ppt file with Presentation() method
-        text = []
-        for slides in prs.slides:  # iterates thorugh slides and its shapes
-            for shape in slides.shapes:
-                if hasattr(shape, "text"):  # extract if it contains text
-                    text.append(shape.text)
-        return "\n".join(text)  # collects text into a list then joins into a single string.
-    except Exception as e:
-        return f"[ERROR extracting pptx: {e}]"
 
-def extract_from_pdf(file_path):
+def _ocr_text(file_path):
+    return ocr_cache.cached(file_path, "string", lambda: text_regions.image_to_string(Image.open(file_path)),
+                            config=text_regions.cache_config())
+
+
+# Phase 2 writes the post-masking text of each cleansed file as a gzip sidecar,
+# reading it is much cheaper than parsing / OCR-ing the cleansed file again
+def read_text_sidecar(sidecar_path):
     try:
-        return pdf_extract_text(file_path) # uses pdfminer.six's extract_text() to read all text from PDF
+        with gzip.open(sidecar_path, "rt", encoding="utf-8") as f:
+            return f.read()
     except Exception as e:
-        return f"[ERROR extracting pdf: {e}]"
+        return f"[ERROR reading text sidecar: {e}]"
+
 
-def extract_from_docx(file_path):
+# detects the extension and calls the correct extractors finction based on file type
+# (through the backend registry below, so the configured/fastest library is used)
+def extract_content(file_path, file_type, backends=None):
+    fmt = FORMATS.get(file_type.lower().strip("."))
+    if fmt is None:
+        return "[Unsupported file type]"
+    problems = []
+    for name, func in _backends(fmt, backends, problems):
+        try:
+            return "".join(func(file_path))
+        except Exception as e:
+            problems.append(f"{name}: {e}")  # what it read so far is dropped, the next backend starts over
+    return f"[ERROR extracting {fmt}: {'; '.join(problems)}]"
+
+
+# ---- streaming extraction + backend registry ----
+# Text is yielded page by page / row by row so the caller (interpreters.classify_stream)
+# can stop reading as soon as the file is classified.
+# Every format can have several backends; extract_content and iter_content try them in
+# preference order and fall back to the next one when a library is missing or fails on the file.
+# The functions below raise on errors, the callers turn that into an "[ERROR ...]" text/chunk.
+
+def iter_pdf_pymupdf(file_path):
+    doc = fitz.open(file_path)  # PyMuPDF, several times faster than pdfminer
     try:
-        doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs]) # extracts all paragraphs’ text and join them with newlines
-    except Exception as e:
-        return f"[ERROR extracting docx: {e}]"
+        for page in doc:
+            yield page.get_text("text")
+    finally:
+        doc.close()
 
-def extract_from_xlsx(file_path):
+def iter_from_pdf(file_path):
+    for page_layout in pdf_extract_pages(file_path):  # pdfminer lays out one page at a time
+        yield "".join(element.get_text() for element in page_layout if isinstance(element, LTTextContainer))
+
+def _iter_xlsx_rows(wb):
+    for ws in wb.worksheets:
+        for row in ws.iter_rows(values_only=True):
+            row_text = " ".join([str(cell) for cell in row if cell is not None])
+            if row_text.strip():
+                yield row_text + "\n"
+
+def iter_from_xlsx(file_path):
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)  # read-only mode streams rows from the zip
     try:
-        wb = openpyxl.load_workbook(file_path,data_only=True) # loads the excel file
-        text = []
-        for sheet in wb.sheetnames:  # reads all sheets - rows - cells
-            ws = wb[sheet]
-            for row in ws.iter_rows(values_only=True):
-                # converts each row into a space-separated string
-                row_text = " ".join([str(cell) for cell in row if cell is not None])
-                if row_text.strip():
-                    text.append(row_text)  # collects non-empty rows and joins into final text
-        return "\n".join(text)
-    except Exception as e:
-        return f"[ERROR extracting xlsx: {e}]"
+        yield from _iter_xlsx_rows(wb)
+    finally:
+        wb.close()
+
+def iter_xlsx_full(file_path):
+    wb = openpyxl.load_workbook(file_path, data_only=True)  # full workbook in memory, for files read-only mode can't parse
+    yield from _iter_xlsx_rows(wb)
+
+def iter_from_pptx(file_path):
+    prs = Presentation(file_path)
+    for slide in prs.slides:  # one chunk per slide
+        yield "\n".join(shape.text for shape in slide.shapes if hasattr(shape, "text")) + "\n"
 
-def extract_from_text(file_path):
+def iter_from_docx(file_path):
+    doc = docx.Document(file_path)
+    for para in doc.paragraphs:
+        yield para.text + "\n"
+
+def iter_from_image(file_path):
+    yield _ocr_text(file_path).strip()  # OCR has no natural pages, the image is one chunk
+
+def iter_from_text(file_path, chunk_size=1024 * 1024):
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk + f.readline()  # finish the current line so no keyword is cut in half
+
+def iter_text_sidecar(sidecar_path, chunk_size=1024 * 1024):
     try:
-        with open(file_path, "r",encoding="utf-8", errors="ignore") as f:
-            return f.read()   # reads full file content as string
+        with gzip.open(sidecar_path, "rt", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk + f.readline()
     except Exception as e:
-        return f"[ERROR extracting text: {e}]"
+        yield f"[ERROR reading text sidecar: {e}]"
 
 
-# detects the extension and calls the correct extractors finction based on file type
-def extract_content(file_path, file_type):
-    ext = file_type.lower().strip(".")
-    if ext in ["png", "jpg", "jpeg"]:
-        return extract_from_image(file_path)
-    elif ext == "pdf":
-        return extract_from_pdf(file_path)
-    elif ext == "pptx":
-        return extract_from_pptx(file_path)
-    elif ext == "docx":
-        return extract_from_docx(file_path)
-    elif ext in ["xlsx","xls"]:
-        return extract_from_xlsx(file_path)
-    elif ext in ["text", "csv", "log", "json"]:
-        return extract_from_text(file_path)
-    else:
-        return "[Unsupported file type]"
+# format -> backend name -> (chunk generator, library available)
+BACKENDS = {
+    "pdf": {"pymupdf": (iter_pdf_pymupdf, HAS_PYMUPDF), "pdfminer": (iter_from_pdf, HAS_PDFMINER)},
+    "xlsx": {"openpyxl_readonly": (iter_from_xlsx, HAS_OPENPYXL), "openpyxl": (iter_xlsx_full, HAS_OPENPYXL)},
+    "pptx": {"python-pptx": (iter_from_pptx, HAS_PPTX)},
+    "docx": {"python-docx": (iter_from_docx, HAS_DOCX)},
+    "image": {"tesseract": (iter_from_image, HAS_TESSERACT)},
+    "text": {"builtin": (iter_from_text, True)},
+}
+
+# preference order per format, the first available backend is used and the rest are fallbacks
+DEFAULT_BACKENDS = {
+    "pdf": ["pymupdf", "pdfminer"],
+    "xlsx": ["openpyxl_readonly", "openpyxl"],
+    "pptx": ["python-pptx"],
+    "docx": ["python-docx"],
+    "image": ["tesseract"],
+    "text": ["builtin"],
+}
+
+FORMATS = {"png": "image", "jpg": "image", "jpeg": "image", "pdf": "pdf", "pptx": "pptx", "docx": "docx",
+           "xlsx": "xlsx", "xls": "xlsx", "text": "text", "csv": "text", "log": "text", "json": "text"}
+
+
+def backend_chain(fmt, backends=None):
+    """Backends to try for a format: the configured one first (backends={"pdf": "pdfminer"}), then the defaults."""
+    chain = list(DEFAULT_BACKENDS.get(fmt, []))
+    preferred = (backends or {}).get(fmt)
+    if preferred:
+        if preferred not in BACKENDS.get(fmt, {}):
+            raise ValueError(f"Unknown {fmt} extractor backend '{preferred}', choose from {sorted(BACKENDS[fmt])}")
+        chain = [preferred] + [name for name in chain if name != preferred]
+    return chain
+
+
+def _backends(fmt, backends, problems):
+    # (name, chunk generator) of the installed backends for a format, in preference order
+    for name in backend_chain(fmt, backends):
+        func, available = BACKENDS[fmt][name]
+        if available:
+            yield name, func
+        else:
+            problems.append(f"{name} not installed")
+
 
+def iter_content(file_path, file_type, backends=None):
+    """Streaming counterpart of extract_content: yields chunks of text (pages, rows, slides...).
+    A backend failing before its first chunk is replaced by the next one; failing part way
+    through raises, the file is never passed on with the rest of its text missing."""
+    fmt = FORMATS.get(file_type.lower().strip("."))
+    if fmt is None:
+        yield "[Unsupported file type]"
+        return
 
+    problems = []
+    for name, func in _backends(fmt, backends, problems):
+        produced = False
+        try:
+            for chunk in func(file_path):
+                produced = True
+                yield chunk
+            return
+        except Exception as e:
+            if produced:  # part of the text is already out, a second backend would repeat it
+                raise RuntimeError(f"{name} failed part way through {os.path.basename(file_path)}: {e}") from e
+            problems.append(f"{name}: {e}")
+    yield f"[ERROR extracting {fmt}: {'; '.join(problems)}]"
@@ -1,50 +1,197 @@
 # Helps classify files (access logs, visitor logs, policies)
 # and extract security insights without heavy ML.
 # Based on text keywords, it categorizes the file and summarizes findings.
+#
+# The keyword rules live in rules.json. They are compiled into one regex alternation, so the
+# text is lowercased once and scanned once (instead of text.lower() per keyword), and keywords
+# only match whole words ("ids" no longer fires inside "kids").
 
-# rule-based interpretation of extracted text
-def interpret_content(text,file_type):
-    if not text or text.startswith("[ERROR]"): # ff extraction failed like empty text/error, it returns a message
-        return ("Could not extract content", "No findings available")
+import os
+import re
+import json
+from collections import Counter
 
-    file_type = file_type.lower()
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+
+def _keyword_regex(keyword):
+    # "failed password" -> failed\s+password, "card*" -> card\w*
+    words = keyword.lower().rstrip("*").split()
+    return r"\s+".join(re.escape(w) for w in words) + (r"\w*" if keyword.endswith("*") else "")
+
+
+class RuleEngine:
+    def __init__(self, rules):
+        self.rules = rules
+        self.exact = {}     # "policy" -> [(rule index, keyword)]
+        self.prefixes = []  # ("card", rule index, keyword), longest prefix first
+        for r_idx, rule in enumerate(rules):
+            for keyword in rule.get("any", []) + rule.get("all", []):
+                normalized = " ".join(keyword.lower().rstrip("*").split())
+                if keyword.endswith("*"):
+                    self.prefixes.append((normalized, r_idx, keyword))
+                else:
+                    self.exact.setdefault(normalized, []).append((r_idx, keyword))
+        self.prefixes.sort(key=lambda p: -len(p[0]))
+
+        # a plain alternation (no per-keyword groups) keeps the regex engine's fast path,
+        # the matched word is mapped back to its keyword(s) in _lookup
+        keywords = sorted({k for rule in rules for k in rule.get("any", []) + rule.get("all", [])},
+                          key=len, reverse=True)
+        self.pattern = (re.compile(r"(?<!\w)(?:" + "|".join(_keyword_regex(k) for k in keywords) + r")(?!\w)")
+                        if keywords else None)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["rules"])
+
+    def _lookup(self, matched):
+        word = " ".join(matched.split())
+        found = list(self.exact.get(word, []))
+        for prefix, r_idx, keyword in self.prefixes:
+            if word.startswith(prefix):
+                found.append((r_idx, keyword))
+        return found
+
+    def scan(self, text, hits=None):
+        """One pass over text. Returns {rule index: Counter(keyword -> hits)}, added to hits if given."""
+        hits = {} if hits is None else hits
+        if self.pattern is None or not text:
+            return hits
+        matched = Counter(self.pattern.findall(text.lower()))  # count first, resolve each distinct word once
+        for word, count in matched.items():
+            for r_idx, keyword in self._lookup(word):
+                hits.setdefault(r_idx, Counter())[keyword] += count
+        return hits
+
+    def decide(self, hits):
+        """Index of the first rule (in file order) whose keywords are satisfied, or None."""
+        for r_idx, rule in enumerate(self.rules):
+            found = hits.get(r_idx)
+            if not found:
+                continue
+            if all(found[k] for k in rule.get("all", [])) and (not rule.get("any") or any(found[k] for k in rule["any"])):
+                return r_idx
+        return None
+
+    def scores(self, hits):
+        # per-category keyword hit totals, reported next to the category (see format_scores)
+        return {self.rules[r_idx]["category"]: sum(found.values()) for r_idx, found in hits.items()}
+
+    def classify(self, text):
+        hits = self.scan(text)
+        r_idx = self.decide(hits)
+        return (self.rules[r_idx] if r_idx is not None else None), self.scores(hits)
+
+
+class IncrementalClassifier:
+    """
+    Classifies text fed in chunks. The first satisfied rule in file order wins, like classify(),
+    so a category only counts as decided early when the top rule in rules.json is satisfied:
+    any rule above a lower one may still be satisfied by text not read yet.
+    decide_hits (off by default) trades that exactness for speed: a satisfied rule with that
+    many keyword hits is taken too, even though a higher rule could still win later in the file.
+    """
+
+    def __init__(self, engine, decide_hits=None):
+        self.engine = engine
+        self.decide_hits = decide_hits
+        self.hits = {}
+        self.head = ""  # first characters seen, used for the generic snippet
+        self.error = None
+        self.bytes_read = 0
+        self.chunks_read = 0
 
-    if "card" in text.lower() and "reader" in text.lower():
-        return ("Access Card Reader",
-                "Tracks physical entry via ID cards with timestamps. Useful for monitoring movement, "
-                "but vulnerable to lost/stolen cards and tailgating risks.")
-
-    if "fingerprint" in text.lower() or "biometric" in text.lower():
-        return ("Biometric Attendance/Access System",
-                "Captures entries using fingerprint/biometric scans. Prevents proxy access, "
-                "but needs secure template storage and spoof detection.")
-
-    if "visitor" in text.lower() or "logbook" in text.lower():
-        return ("Visitors Logbook",
-                "Records guest entries manually or digitally. Prone to errors/falsification, "
-                "limited forensic use unless digitized with ID validation.")
-
-    if "policy" in text.lower() or "firewall" in text.lower() or "ids" in text.lower():
-        return ("Security Policy/Config File",
-                "Defines access, firewall, or IDS rules. Misconfigurations can expose systems; "
-                "needs regular audits and least-privilege enforcement.")
-
-    if "kernel" in text.lower() or "syslog" in text.lower() or "boot" in text.lower():
-        return ("System Log File",
-                "Captures OS and kernel events. Useful for detecting crashes or tampering, "
-                "requires monitoring for repeated errors or anomalies.")
-
-    if "failed password" in text.lower() or "authentication failure" in text.lower():
-        return ("Authentication Log",
-                "Tracks login attempts. Multiple failures suggest brute force; "
-                "suspicious geolocations may indicate account compromise.")
-
-    if "incident" in text.lower() or "breach" in text.lower():
-        return ("Incident Report",
-                "Documents security events and response actions. Reveals attack vectors and impact; "
-                "should guide updates to security controls.")
-
-    # Default - If none of the above rules matched then treat it as generic file.
+    def feed(self, chunk):
+        if not self.chunks_read and chunk.startswith("[ERROR"):
+            self.error = chunk
+        self.chunks_read += 1
+        self.bytes_read += len(chunk)
+        if len(self.head) < 100:
+            self.head += chunk[:100 - len(self.head)]
+        self.engine.scan(chunk, self.hits)
+
+    @property
+    def decided(self):
+        r_idx = self.engine.decide(self.hits)
+        if r_idx is None:
+            return False
+        return r_idx == 0 or bool(self.decide_hits and sum(self.hits[r_idx].values()) >= self.decide_hits)
+
+    def result(self, file_type):
+        if self.error or not self.head:
+            return ("Could not extract content", "No findings available")
+        r_idx = self.engine.decide(self.hits)
+        if r_idx is not None:
+            rule = self.engine.rules[r_idx]
+            return (rule["category"], rule["findings"])
+        return generic_result(self.head, file_type.lower())
+
+
+def classify_stream(chunks, file_type, engine=None, max_bytes=None, max_chunks=None, decide_hits=None):
+    """
+    Interpret text coming from a chunk iterator (extractors.iter_content) and stop pulling
+    chunks once the category is decided or the byte / chunk (page, row...) budget is used.
+    Without a budget and decide_hits the result is the same as interpret_content on the whole text.
+    Returns (description, findings, stats).
+    """
+    classifier = IncrementalClassifier(engine or get_engine(), decide_hits)
+    stopped = "eof"
+    try:
+        for chunk in chunks:
+            classifier.feed(chunk)
+            if classifier.error:
+                break
+            if classifier.decided:
+                stopped = "decided"
+                break
+            if (max_bytes and classifier.bytes_read >= max_bytes) or (max_chunks and classifier.chunks_read >= max_chunks):
+                stopped = "budget"
+                break
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()  # lets the extractor release its file handles right away
+    desc, findings = classifier.result(file_type)
+    stats = {"bytes": classifier.bytes_read, "chunks": classifier.chunks_read, "stopped": stopped,
+             "scores": {} if classifier.error else classifier.engine.scores(classifier.hits)}
+    return desc, findings, stats
+
+
+_ENGINES = {}  # rules file -> compiled engine, compiled once per process
+
+def get_engine(path=None):
+    """Compiled engine for a rules file (default rules.json)."""
+    path = os.path.abspath(path or DEFAULT_RULES_PATH)
+    if path not in _ENGINES:
+        _ENGINES[path] = RuleEngine.from_file(path)
+    return _ENGINES[path]
+
+
+def generic_result(text, file_type):
+    # Default - If none of the rules matched then treat it as generic file.
     snippet = text[:100].replace("\n", " ") # return first 100 characters as a preview
     return (f"Generic {file_type.upper()} File",
-            f"Extracted snippet: {snippet}...")
\ No newline at end of file
+            f"Extracted snippet: {snippet}...")
+
+
+def format_scores(scores, top=3):
+    """{category: keyword hits} -> "Visitors Logbook: 12, System Log File: 3" (the top categories by hits)."""
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top]
+    return ", ".join(f"{category}: {hits}" for category, hits in ranked)
+
+
+# rule-based interpretation of extracted text
+def interpret_content(text, file_type, engine=None, with_scores=False):
+    # with_scores=True adds the per-category keyword hits: (description, findings, scores)
+    if not text or text.startswith("[ERROR"): # if extraction failed like empty text/error, it returns a message
+        return ("Could not extract content", "No findings available") + (({},) if with_scores else ())
+
+    file_type = file_type.lower()
+    rule, scores = (engine or get_engine()).classify(text)
+    if rule is not None:
+        result = (rule["category"], rule["findings"])
+    else:
+        result = generic_result(text, file_type)
+    return result + ((scores,) if with_scores else ())
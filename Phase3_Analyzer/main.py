@@ -1,30 +1,20 @@
 import os
+import time
 import argparse # to make the script run from command line with arguments
 import csv
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED  # spreads extraction/OCR over several CPU cores
+from itertools import repeat
 
-from .extractors import extract_content
-from .interpreters import interpret_content
-from .report_generator import generate_report
-
-def normalize_ext(file_type, filename):
-    """
-    Normalize MIME types or raw extensions into a clean extension (pdf, xlsx, pptx, etc.)
-    """
-    ext = os.path.splitext(filename)[-1].lower().strip(".")  # fallback: file extension
-
-    if "/" in file_type:  # MIME type
-        if "pdf" in file_type:
-            return "pdf"
-        if "word" in file_type or file_type.startswith("application/vnd.openxmlformats-officedocument.wordprocessingml"):
-            return "docx"
-        if "presentation" in file_type or "ppt" in file_type:
-            return "pptx"
-        if "spreadsheet" in file_type or "excel" in file_type:
-            return "xlsx"
-        if "image" in file_type:
-            return ext
-
-    return ext or file_type
+from .extractors import extract_content, read_text_sidecar, iter_content, iter_text_sidecar, backend_chain
+from .interpreters import interpret_content, get_engine, classify_stream, format_scores
+from .report_generator import ReportWriter
+from .search_index import SearchIndex, is_indexed
+from Phase2_Cleansing.utils import sidecar_path, SIDECAR_DIR, parse_shard, select_shard, file_sha256
+from Phase2_Cleansing.journal import Journal
+from Phase2_Cleansing import ocr_cache, text_regions
+from Phase2_Cleansing.scheduler import AdmissionController, estimate_memory, BASE_MEMORY, MEMORY_FACTORS
+import metrics
+from manifest import normalize_type, FileRecord, is_manifest, load as load_manifest, save as save_manifest
 
 # def main():
 #     parser = argparse.ArgumentParser(description="Phase 3: File Analysis & Report Generation")
@@ -91,60 +81,371 @@ def normalize_ext(file_type, filename):
 #     main()
 
 
-def run_phase3(input_path, output_dir="phase3_output"):
+PHASE2_COLUMNS = ["Filename", "Full Path", "File Type", "Status", "Details", "Text Path", "SHA256"]  # cleansed_files.csv
+
+
+def _tasks_from_rows(rows, use_sidecars, hashes):
+    tasks = []
+    for row in rows:
+        if row.get("Status", "ok") not in ("ok", "cached"):  # Phase 2 rows for files that were not cleansed
+            continue
+        file_path = row.get("Full Path", row["Filename"])
+        file_type = normalize_type(row["File Type"], row["Filename"])
+        text_path = (row.get("Text Path") or "") if use_sidecars else ""  # written by Phase 2, saves a second extraction/OCR pass
+        tasks.append([os.path.basename(file_path), file_path, file_type, text_path])
+        if row.get("SHA256"):
+            hashes[file_path] = row["SHA256"]  # hash of the original input, so Phase 2 and 3 agree on the shard
+    return tasks
+
+
+def _original_hashes(folder):
+    # a Phase 2 output folder: cleansed output -> SHA256 of its original input, from cleansed_files.csv,
+    # so a folder is sharded like Phase 2 sharded its inputs (and not by the cleansed bytes)
+    csv_path = os.path.join(folder, "cleansed_files.csv")
+    if not os.path.exists(csv_path):
+        return {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return {os.path.abspath(row["Full Path"]): row["SHA256"] for row in csv.DictReader(f) if row.get("SHA256")}
+
+
+def _tasks_from_records(records, use_sidecars, hashes):
+    # FileRecords updated by Phase 2: analyze the cleansed output, type and sidecar as recorded
+    tasks = []
+    for record in records:
+        if record.status not in ("ok", "cached"):
+            continue
+        text_path = record.text_path if use_sidecars else ""
+        tasks.append([os.path.basename(record.output_path), record.output_path, record.file_type, text_path])
+        if record.sha256:
+            hashes[record.output_path] = record.sha256
+    return tasks
+
+
+def collect_tasks(input_path, use_sidecars=True, records=None, shard=None):
     """
-    Run Phase 3: Analyze cleansed files and generate reports.
-    Accepts:
-      - CSV metadata (Phase 1 output)
-      - Folder of cleansed files
-    Returns:
-      Dict with results, CSV path, TXT path.
+    Build the ordered list of files to analyze: [filename, file_path, file_type, text_path].
+    text_path is the Phase 2 sidecar ("" when there is none or use_sidecars is False).
+    records: Phase 2 rows already in memory (run_phase2()["results"] or dicts keyed like
+    cleansed_files.csv, or FileRecords from the manifest), used instead of reading input_path.
+    shard: (index, count) keeps only this machine's slice of the files (by content hash).
     """
-    os.makedirs(output_dir, exist_ok=True)
-    results = []
+    tasks = []
+    hashes = {}
+
+    # Case 0: in-memory Phase 2 records/rows (pipeline_runner, manifest), no CSV round trip
+    if records is not None:
+        records = list(records)
+        if records and isinstance(records[0], FileRecord):
+            tasks = _tasks_from_records(records, use_sidecars, hashes)
+        else:
+            tasks = _tasks_from_rows((r if isinstance(r, dict) else dict(zip(PHASE2_COLUMNS, r)) for r in records),
+                                     use_sidecars, hashes)
 
     # Case 1: CSV input
-    if input_path.endswith(".csv"):
+    elif input_path.endswith(".csv"):
         with open(input_path, newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                try:
-                    file_path = row.get("Full Path", row["Filename"])
-                    file_type = normalize_ext(row["File Type"], row["Filename"])
-                    text = extract_content(file_path, file_type)
-                    desc, findings = interpret_content(text, file_type)
-                    results.append([os.path.basename(file_path), f".{file_type}", desc, findings])
-                except Exception as e:
-                    print(f"[WARN] Skipping {row.get('Filename')} → {e}")
+            tasks = _tasks_from_rows(csv.DictReader(csvfile), use_sidecars, hashes)
 
     # Case 2: Folder input
     elif os.path.isdir(input_path):
-        for root, _, files in os.walk(input_path):
+        original = _original_hashes(input_path) if shard else {}
+        for root, dirs, files in os.walk(input_path):
+            if SIDECAR_DIR in dirs:
+                dirs.remove(SIDECAR_DIR)  # sidecars are read together with their file, not analyzed on their own
             for file in files:
-                try:
-                    file_path = os.path.join(root, file)
-                    ext = os.path.splitext(file)[-1].lower().strip(".")
-                    text = extract_content(file_path, ext)
-                    desc, findings = interpret_content(text, ext)
-                    results.append([file, f".{ext}", desc, findings])
-                except Exception as e:
-                    print(f"[WARN] Skipping {file} → {e}")
+                file_path = os.path.join(root, file)
+                ext = os.path.splitext(file)[-1].lower().strip(".")
+                tasks.append([file, file_path, ext, sidecar_path(file_path) if use_sidecars else ""])
+                if os.path.abspath(file_path) in original:
+                    hashes[file_path] = original[os.path.abspath(file_path)]
 
     else:
         raise FileNotFoundError(f"Input path not found: {input_path}")
 
-    # Generate reports
+    if shard:
+        tasks = select_shard(tasks, lambda task: task[1], shard, hashes)
+    return tasks
+
+
+def analyze_task(task, options=None):
+    """
+    Extract + interpret one file. Never raises: returns {"row": report row or None,
+    "error": [File Name, Stage, Error] or None} so problems end up in phase3_errors.csv.
+    options: rules_path, backends (extractor backend per format, see extractors.BACKENDS),
+    and stream / max_bytes / max_pages for early-exit streaming classification
+    (see interpreters.classify_stream).
+    Safe to call in-process and inside a pool worker.
+    """
+    options = options or {}
+    if options.get("metrics"):
+        metrics.enable()  # pool workers don't share the parent's flag
+    if options.get("ocr_cache") and ocr_cache.settings() != tuple(options["ocr_cache"]):
+        ocr_cache.configure(*options["ocr_cache"])
+    text_regions.enable(options.get("ocr_prefilter", True))
+    start = time.perf_counter()
+    metrics.begin_file(task[1], "phase3")
+    analyzed = _analyze(task, options)
+    analyzed["seconds"] = round(time.perf_counter() - start, 6)
+    analyzed["metrics"] = metrics.end_file()
+    return analyzed
+
+
+def _index_entry(file_path, options):
+    # {"sha256", "text"} for the search index, text None once this content is indexed; None without an index
+    if not options.get("index"):
+        return None
+    sha256 = file_sha256(file_path)
+    return {"sha256": sha256, "text": None if is_indexed(options["index"], sha256) else ""}
+
+
+def _analyze(task, options):
+    filename, file_path, file_type, text_path = task
+    engine = get_engine(options.get("rules_path"))
+    has_sidecar = bool(text_path) and os.path.exists(text_path)
+    stage = "extract"
+    try:
+        index = _index_entry(file_path, options)
+        if options.get("stream"):
+            source = (iter_text_sidecar(text_path) if has_sidecar
+                      else iter_content(file_path, file_type, options.get("backends")))
+            chunks, read = source, []
+            if index and index["text"] is not None:
+                chunks = _tee(source, read)  # classify_stream closes the tee, source stays open for the index
+            stage = "extract/interpret"
+            with metrics.timer("stream"):  # extraction and interpretation interleave chunk by chunk
+                desc, findings, stats = classify_stream(chunks, file_type, engine,
+                                                        max_bytes=options.get("max_bytes"),
+                                                        max_chunks=options.get("max_pages"),
+                                                        decide_hits=options.get("decide_hits"))
+            metrics.count(f"phase3_stream_{stats['stopped']}")
+            error = [filename, "extract", desc] if desc == "Could not extract content" else None
+            if index and index["text"] is not None:
+                if not error:
+                    read.extend(source)  # the index needs the whole text, not just what decided the category
+                source.close()
+                index["text"] = "".join(read)
+            return {"row": [filename, f".{file_type}", desc, findings, format_scores(stats["scores"])],
+                    "error": error, "index": None if error else index}
+
+        with metrics.timer("extract"):
+            if has_sidecar:
+                text = read_text_sidecar(text_path)
+            else:
+                text = extract_content(file_path, file_type, options.get("backends"))
+        metrics.count("phase3_sidecar_reads" if has_sidecar else "phase3_extractions")
+        error = None
+        if text.startswith("[ERROR"):  # extractors report failures inside the text
+            error = [filename, stage, text.strip("[]")]
+        stage = "interpret"
+        with metrics.timer("interpret"):
+            desc, findings, scores = interpret_content(text, file_type, engine=engine, with_scores=True)
+        if index and index["text"] is not None:
+            index["text"] = text
+        return {"row": [filename, f".{file_type}", desc, findings, format_scores(scores)], "error": error,
+                "index": None if error else index}
+    except Exception as e:
+        return {"row": None, "error": [filename, stage, f"{type(e).__name__}: {e}"]}
+
+
+def _tee(chunks, read):
+    for chunk in chunks:
+        read.append(chunk)
+        yield chunk
+
+
+def task_memory(task):
+    # a sidecar is just (decompressed) text, otherwise the extractor loads the whole file
+    filename, file_path, file_type, text_path = task
+    if text_path and os.path.exists(text_path):
+        return BASE_MEMORY + os.path.getsize(text_path) * 4 * MEMORY_FACTORS["txt"]  # ~4x gzip ratio of plain text
+    return estimate_memory(file_path, file_type)
+
+
+def _iter_admitted(tasks, workers, options, memory_budget):
+    # submit files only while their estimated memory fits the budget, yield results in input order
+    admission = AdmissionController(memory_budget)
+    costs = {i: task_memory(task) for i, task in enumerate(tasks)}
+    queue = [(i,) for i in range(len(tasks))]  # (idx,) like the SupervisedPool queue, see AdmissionController.pick
+    running = {}  # future -> task index
+    finished = {}
+    next_out = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while queue or running:
+                while queue and len(running) < workers:
+                    pos = admission.pick(queue, costs)
+                    if pos is None:
+                        break
+                    i = queue.pop(pos)[0]
+                    admission.try_admit(costs[i])
+                    running[pool.submit(analyze_task, tasks[i], options)] = i
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    admission.release(costs[i])
+                    finished[i] = future.result()
+                while next_out in finished:
+                    yield finished.pop(next_out)
+                    next_out += 1
+    finally:  # the caller may stop iterating right after the last result
+        print(f"[BUDGET] Peak estimated in-flight memory {admission.peak / 1024 ** 2:.0f} MB "
+              f"of {memory_budget / 1024 ** 2:.0f} MB")
+
+
+def _iter_analyzed(tasks, workers, options=None, memory_budget=None):
+    # yields analyze_task results in input order
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield analyze_task(task, options)
+        return
+
+    if memory_budget:
+        yield from _iter_admitted(tasks, workers, options, memory_budget)
+        return
+
+    chunksize = max(1, len(tasks) // (workers * 8))  # fewer round trips for many small files, still balanced
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(analyze_task, tasks, repeat(options), chunksize=chunksize)
+
+
+def run_phase3(input_path, output_dir="phase3_output", workers=1, use_sidecars=True, rules_path=None,
+               stream=False, max_bytes=None, max_pages=None, decide_hits=None, backends=None, keep_results=True,
+               page_size=100, records=None, progress=None, memory_budget=None, shard=None, resume=False,
+               ocr_cache_path=None, ocr_cache_max_bytes=512 * 1024 ** 2, ocr_prefilter=True, index_path=None,
+               manifest_path=None):
+    """
+    Run Phase 3: Analyze cleansed files and generate reports.
+    Accepts:
+      - CSV metadata (Phase 1 output)
+      - Folder of cleansed files
+      - Phase 1 manifest.sqlite after Phase 2 (see manifest.py)
+    workers > 1 extracts and interprets files in a process pool, results keep the input order.
+    use_sidecars=False ignores Phase 2 text sidecars and extracts every file again.
+    rules_path points to a classification rules file (default interpreters' rules.json).
+    stream=True extracts page by page / row by row and stops once the category is decided or
+    max_bytes / max_pages of text have been read. decide_hits also stops on a lower rule that is
+    satisfied with that many keyword hits, even though a higher rule could still win further on.
+    backends picks the extractor per format, e.g. {"pdf": "pdfminer"}; the others stay as fallbacks.
+    Rows are streamed to phase3_report.csv/.jsonl and a paginated phase3_report.txt (page_size rows
+    per page); keep_results=False skips collecting them in memory for very large runs.
+    records: Phase 2 result rows to analyze instead of reading input_path (see collect_tasks).
+    manifest_path: manifest whose records get each file's category, findings and seconds;
+    passing the manifest as input_path reads the files from it and updates it.
+    progress(done, total, filename) is called as files finish (filename None for the initial call).
+    memory_budget (bytes) bounds the estimated RAM of the files being analyzed at the same time
+    by the workers; a file is only submitted once its estimate fits.
+    shard: "i/N" or (i, N) - only analyze slice i of N by content hash (see merge_shards.py).
+    ocr_cache_path: SQLite OCR result cache shared with Phase 2 (see Phase2_Cleansing/ocr_cache.py).
+    ocr_prefilter=False OCRs every image, also those without text-like regions (see text_regions.py).
+    index_path: SQLite FTS5 index the extracted text, category and findings of every file are added
+    to (by content hash, files indexed in earlier runs are only refreshed), see search_index.py.
+    Finished files are recorded in phase3_journal.jsonl; resume=True takes the rows of the files
+    a previous run with the same settings finished from there instead of analyzing them again.
+    Returns:
+      Dict with results, errors, CSV/TXT/JSONL paths and per-category counts.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    errors = []
+    options = {"rules_path": rules_path, "stream": stream, "max_bytes": max_bytes, "max_pages": max_pages,
+               "decide_hits": decide_hits,
+               "backends": backends, "metrics": metrics.ENABLED,
+               "ocr_cache": (ocr_cache_path, ocr_cache_max_bytes) if ocr_cache_path else None,
+               "ocr_prefilter": ocr_prefilter, "index": index_path}
+    for fmt in (backends or {}):
+        backend_chain(fmt, backends)  # unknown backend names fail here, not once per file
+
+    if records is None and is_manifest(input_path):
+        manifest_path = manifest_path or input_path
+        records = load_manifest(input_path)
+    by_output = ({r.output_path: r for r in records if isinstance(r, FileRecord) and r.output_path}
+                 if records is not None else {})
+    tasks = collect_tasks(input_path, use_sidecars, records,
+                          parse_shard(shard) if isinstance(shard, str) else shard)
+    get_engine(rules_path)  # load/compile the rules up front, a broken rules file fails before any work is done
+
+    settings = {key: options[key] for key in ("rules_path", "stream", "max_bytes", "max_pages", "decide_hits",
+                                                   "backends")}
+    journal = Journal(output_dir, "phase3", dict(settings, use_sidecars=use_sidecars, index=bool(index_path),
+                                                 ocr_prefilter=ocr_prefilter),
+                      resume=resume)
+    finished = {task[1]: journal.get(task[1]) for task in tasks} if resume else {}
+    # only files analyzed without an error count as done, the others are tried again
+    finished = {path: record for path, record in finished.items() if record and not record["error"]}
+    if index_path:  # a crash can lose the last uncommitted index writes, analyze those files again
+        finished = {path: record for path, record in finished.items()
+                    if not record.get("sha256") or is_indexed(index_path, record["sha256"])}
+    todo = [task for task in tasks if not finished.get(task[1])]
+    if resume:
+        print(f"[INFO] Resuming: {len(tasks) - len(todo)} file(s) already done according to {journal.path}")
+    analyzed_todo = _iter_analyzed(todo, workers, options, memory_budget)
+
+    # Reports are written row by row as files finish
     output_csv = os.path.join(output_dir, "phase3_report.csv")
     output_txt = os.path.join(output_dir, "phase3_report.txt")
-    generate_report(results, output_csv, output_txt)
+    output_jsonl = os.path.join(output_dir, "phase3_report.jsonl")
+    index = SearchIndex(index_path, output_dir) if index_path else None
+    with ReportWriter(output_csv, output_txt, output_jsonl, page_size=page_size) as report:
+        if progress:
+            progress(0, len(tasks), None)
+        # the report is rewritten in task order, rows of resumed files come from the journal
+        for done, task in enumerate(tasks, 1):
+            analyzed = finished.get(task[1])
+            if not analyzed:
+                analyzed = next(analyzed_todo)
+                metrics.merge_file(analyzed["metrics"])
+                entry = analyzed.get("index")
+                if index and entry and analyzed["row"]:
+                    row = analyzed["row"]
+                    with metrics.timer("index"):
+                        index.add(entry["sha256"], row[0], row[1], row[2], row[3], task[1], entry["text"])
+                journal.write(task[1], row=analyzed["row"], error=analyzed["error"],
+                              sha256=entry["sha256"] if entry else None)
+            if progress:
+                progress(done, len(tasks), task[0])
+            record = by_output.get(task[1])
+            if record:
+                record.category, record.findings = analyzed["row"][2:4] if analyzed["row"] else ("", "")
+                if analyzed.get("seconds") is not None:
+                    record.timings = dict(record.timings or {}, phase3=analyzed["seconds"])
+            if analyzed["row"]:
+                row = analyzed["row"] + [task[1]]  # the path tells same-named files apart, e.g. in merge_shards.py
+                with metrics.timer("report"):
+                    report.write(row)
+                if keep_results:
+                    results.append(row)
+            if analyzed["error"]:
+                errors.append(analyzed["error"] + [task[1]])
+                metrics.count("phase3_errors")
+    journal.close()
+    if manifest_path and by_output:
+        save_manifest(manifest_path, by_output.values())
+    if index:
+        index.close()
+        print(f"[INDEX] {index.added} file(s) indexed, {index.updated} already indexed → {index_path}")
+    report.print_summary()
+
+    errors_csv = os.path.join(output_dir, "phase3_errors.csv")
+    with open(errors_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["File Name", "Stage", "Error", "Full Path"])
+        writer.writerows(errors)
+    if errors:
+        print(f"[WARN] {len(errors)} file(s) had extraction/interpretation errors → {errors_csv}")
 
     return {
         # "results": results,
         # "csv_path": output_csv,
         # "txt_path": output_txt,
         "results": results,
+        "errors": errors,
         "csv_path": output_csv,
         "txt_path": output_txt,
+        "jsonl_path": output_jsonl,
+        "categories": dict(report.counts),
+        "errors_path": errors_csv,
+        "records": list(by_output.values()) if by_output else None,
+        "manifest_path": manifest_path,
         "output_dir": output_dir
     }
 
@@ -155,14 +456,58 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Phase 3: File Analysis & Report Generation")
     parser.add_argument("--input", "-i", required=True,
-                        help="Path to cleansed_output folder or Phase1 metadata CSV")
+                        help="Path to cleansed_output folder, Phase2 cleansed_files.csv or the manifest.sqlite "
+                             "Phase 2 updated (updated in place)")
     parser.add_argument("--output", "-o", default="phase3_output",
                         help="Output folder for reports")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Number of worker processes (1 = analyze serially in this process)")
+    parser.add_argument("--rules", default=None, help="Classification rules file (default: rules.json)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Extract page by page and stop once a file's category is decided")
+    parser.add_argument("--max-bytes", type=int, default=None, help="Streaming: stop after this much text per file")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help="Streaming: stop after this many pages/rows/slides per file")
+    parser.add_argument("--decide-hits", type=int, default=None,
+                        help="Streaming: also stop once any satisfied category has this many keyword hits "
+                             "(faster, a higher category later in the file is missed)")
+    parser.add_argument("--backend", action="append", default=[], metavar="FORMAT=NAME",
+                        help="Extractor backend for a format, e.g. pdf=pdfminer or xlsx=openpyxl (repeatable)")
+    parser.add_argument("--ocr-cache", default=None,
+                        help="SQLite file caching OCR results by image content, shared with Phase 2")
+    parser.add_argument("--ocr-cache-max-mb", type=int, default=512, help="Size limit of the OCR cache")
+    parser.add_argument("--no-ocr-prefilter", action="store_true",
+                        help="OCR every image, also those the text-region check finds no text in")
+    parser.add_argument("--index", default=None,
+                        help="Add extracted text to this SQLite full-text index (search with python -m Phase3_Analyzer.search_index)")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per page in phase3_report.txt")
+    parser.add_argument("--memory-budget-mb", type=int, default=None,
+                        help="RAM ceiling for all files being analyzed at once (estimated from type and size)")
+    parser.add_argument("--shard", default=None, metavar="i/N",
+                        help="Only analyze slice i of N (by content hash), for splitting a run across machines")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run in the same output folder, files it finished are not redone")
+    parser.add_argument("--metrics", default=None,
+                        help="Write per-stage timings/counters here (.prom = Prometheus text format, else JSON)")
+    parser.add_argument("--profile", default=None, help="Write a cProfile dump of this phase into this folder")
     args = parser.parse_args()
 
-    result = run_phase3(args.input, args.output)
+    backends = dict(item.split("=", 1) for item in args.backend)
+    metrics.enable(bool(args.metrics))
+    with metrics.profiled("phase3", args.profile):
+        result = run_phase3(args.input, args.output, workers=args.workers, rules_path=args.rules,
+                            stream=args.stream, max_bytes=args.max_bytes, max_pages=args.max_pages,
+                            decide_hits=args.decide_hits, backends=backends, keep_results=False,
+                            page_size=args.page_size,
+                            memory_budget=args.memory_budget_mb * 1024 ** 2 if args.memory_budget_mb else None,
+                            shard=args.shard, resume=args.resume, ocr_cache_path=args.ocr_cache,
+                            ocr_cache_max_bytes=args.ocr_cache_max_mb * 1024 ** 2,
+                            ocr_prefilter=not args.no_ocr_prefilter, index_path=args.index)
+    if args.metrics:
+        metrics.write(args.metrics)
     print(f"[DONE] Phase 3 report saved → {args.output}")
     print("CSV:", result["csv_path"])
     print("TXT:", result["txt_path"])
+    print("JSONL:", result["jsonl_path"])
 
 
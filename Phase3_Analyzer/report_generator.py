@@ -1,20 +1,97 @@
 import csv
+import json
+from collections import Counter
 from tabulate import tabulate
 
-def generate_report(results, output_csv="phase3_report.csv", output_txt="phase3_report.txt"):
-    # results - list of tuples/lists, each row = one file’s analysis.
-    headers = ["File Name", "File Type", "File Description", "Key Findings"]
+HEADERS = ["File Name", "File Type", "File Description", "Key Findings", "Category Scores", "Full Path"]
+TABLE_COLUMNS = 5  # the TXT pages and the console leave out Full Path (it tells same-named files apart in CSV/JSONL)
+
+
+class ReportWriter:
+    """
+    Streams report rows to disk as they arrive instead of formatting one giant table at the end:
+      - CSV and JSONL get every row immediately
+      - TXT is paginated, one tabulate grid per page_size rows, then the per-category counts
+      - the console only gets a bounded summary (category counts + the first console_rows rows)
+    """
+
+    def __init__(self, output_csv="phase3_report.csv", output_txt="phase3_report.txt",
+                 output_jsonl="phase3_report.jsonl", page_size=100, console_rows=10):
+        self.output_csv = output_csv
+        self.output_txt = output_txt
+        self.output_jsonl = output_jsonl
+        self.page_size = page_size
+        self.console_rows = console_rows
+        self.counts = Counter()  # File Description -> files
+        self.total = 0
+        self.page = []
+        self.pages = 0
+        self.preview = []
+
+        self._csv_file = open(output_csv, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._csv_file)
+        self._csv.writerow(HEADERS)  # writing headers - column names
+        self._jsonl = open(output_jsonl, "w", encoding="utf-8") if output_jsonl else None
+        self._txt = open(output_txt, "w", encoding="utf-8")
+
+    def write(self, row):
+        row = list(row) + [""] * (len(HEADERS) - len(row))  # rows from before Category Scores / Full Path existed
+        self._csv.writerow(row)
+        if self._jsonl:
+            self._jsonl.write(json.dumps(dict(zip(HEADERS, row)), ensure_ascii=False) + "\n")
+        self.counts[row[2]] += 1
+        self.total += 1
+        if len(self.preview) < self.console_rows:
+            self.preview.append(row[:TABLE_COLUMNS])
+        self.page.append(row[:TABLE_COLUMNS])
+        if len(self.page) >= self.page_size:
+            self._flush_page()
 
-    # save csv
-    with open(output_csv,"w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)  # writing headers - column names
-        writer.writerows(results) # write all rows from results
+    def writerows(self, rows):
+        for row in rows:
+            self.write(row)
 
+    def _flush_page(self):
+        if not self.page:
+            return
+        self.pages += 1
+        first = self.total - len(self.page) + 1
+        self._txt.write(f"Page {self.pages} (files {first}-{self.total})\n")
+        self._txt.write(tabulate(self.page, headers=HEADERS[:TABLE_COLUMNS], tablefmt="grid") + "\n\n")
+        self.page = []
 
-    table = tabulate(results, headers=headers, tablefmt = "grid")
-    with open(output_txt, "w", encoding="utf-8") as f:
-        f.write(table)
+    def summary_table(self):
+        rows = [[category, count] for category, count in self.counts.most_common()]
+        rows.append(["Total", self.total])
+        return tabulate(rows, headers=["File Description", "Files"], tablefmt="grid")
 
-    print("\n[REPORT GENERATED") # print the same formatted table in the console for immediate viewing.
-    print(table)
\ No newline at end of file
+    def close(self):
+        if self._txt.closed:
+            return
+        self._flush_page()
+        self._txt.write("Summary by category\n")
+        self._txt.write(self.summary_table() + "\n")
+        for f in (self._csv_file, self._jsonl, self._txt):
+            if f:
+                f.close()
+
+    def print_summary(self):
+        print("\n[REPORT GENERATED]")
+        print(self.summary_table())
+        if self.preview:
+            shown = f"first {len(self.preview)} of {self.total}" if self.total > len(self.preview) else "all"
+            print(f"Files ({shown}, full report in {self.output_txt}):")
+            print(tabulate(self.preview, headers=HEADERS[:TABLE_COLUMNS], tablefmt="grid"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def generate_report(results, output_csv="phase3_report.csv", output_txt="phase3_report.txt", output_jsonl=None):
+    # results - list of tuples/lists, each row = one file’s analysis.
+    with ReportWriter(output_csv, output_txt, output_jsonl) as writer:
+        writer.writerows(results)
+    writer.print_summary()
@@ -0,0 +1,179 @@
+'''Full-text search over everything Phase 3 has analyzed, across runs.
+
+With run_phase3(index_path=...) / --index every analyzed file's extracted text, category and key
+findings go into a local SQLite FTS5 index, keyed by the SHA-256 of the analyzed file: a file
+seen in an earlier run is not indexed again (only its category, findings and location are
+refreshed), so re-runs over mostly unchanged evidence cost next to nothing. Workers only check
+whether a hash is known (read-only), the run's process does all the writing.
+
+    python -m Phase3_Analyzer.search_index --index search.sqlite "firewall AND \\"port 22\\""
+    python -m Phase3_Analyzer.search_index --index search.sqlite firewall --category "Network Logs"
+
+Queries use the FTS5 syntax (AND / OR / NOT, "phrases", prefix*); hits are ranked with bm25 and
+come with a snippet of the matching text.
+'''
+
+import os
+import time
+import sqlite3
+import argparse
+from tabulate import tabulate
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT UNIQUE NOT NULL,
+    file_name TEXT, file_type TEXT, category TEXT, findings TEXT,
+    path TEXT, first_seen REAL, last_seen REAL
+);
+CREATE TABLE IF NOT EXISTS locations (
+    sha256 TEXT NOT NULL, path TEXT NOT NULL, output_dir TEXT, seen REAL,
+    PRIMARY KEY (sha256, path)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(file_name, category, findings, content);
+"""
+
+_reader = None
+_reader_key = None
+
+
+def is_indexed(index_path, sha256):
+    """Read-only check used by the workers: is this content already in the index?"""
+    global _reader, _reader_key
+    if _reader is None or _reader_key != (index_path, os.getpid()):
+        if not os.path.exists(index_path):
+            return False
+        _reader = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True, timeout=30)
+        _reader_key = (index_path, os.getpid())
+    try:
+        return _reader.execute("SELECT 1 FROM documents WHERE sha256 = ?", (sha256,)).fetchone() is not None
+    except sqlite3.Error:
+        return False  # index being created right now, treat as new
+
+
+class SearchIndex:
+    def __init__(self, index_path, output_dir=None, commit_every=200):
+        self.index_path = index_path
+        self.output_dir = output_dir
+        self.commit_every = commit_every
+        self.added = 0
+        self.updated = 0
+        self._pending = 0
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self.conn = sqlite3.connect(index_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # workers keep reading while we write
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def add(self, sha256, file_name, file_type, category, findings, path, text=None):
+        """Index one analyzed file. text None: the content is already indexed, refresh the rest."""
+        now = time.time()
+        row = self.conn.execute("SELECT id FROM documents WHERE sha256 = ?", (sha256,)).fetchone()
+        if row is None:
+            if text is None:
+                return  # raced with another run's deletion, nothing to refresh
+            cur = self.conn.execute(
+                "INSERT INTO documents (sha256, file_name, file_type, category, findings, path, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (sha256, file_name, file_type, category, findings, path, now, now))
+            self.conn.execute("INSERT INTO documents_fts (rowid, file_name, category, findings, content) "
+                              "VALUES (?, ?, ?, ?, ?)", (cur.lastrowid, file_name, category, findings, text))
+            self.added += 1
+        else:
+            self.conn.execute("UPDATE documents SET file_name = ?, category = ?, findings = ?, path = ?, last_seen = ? "
+                              "WHERE id = ?", (file_name, category, findings, path, now, row[0]))
+            self.conn.execute("UPDATE documents_fts SET file_name = ?, category = ?, findings = ? WHERE rowid = ?",
+                              (file_name, category, findings, row[0]))
+            self.updated += 1
+        self.conn.execute("INSERT OR REPLACE INTO locations (sha256, path, output_dir, seen) VALUES (?, ?, ?, ?)",
+                          (sha256, path, self.output_dir, now))
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _quote_terms(query):
+    # plain words when the query is not valid FTS5 syntax (e.g. "port:22", "C:\\logs")
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search(index_path, query, limit=20, category=None):
+    """
+    Ranked hits for an FTS5 query across all indexed runs:
+    [{"file_name", "file_type", "category", "findings", "path", "last_seen", "score", "snippet", "locations"}]
+    """
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"No search index at {index_path}")
+    conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True, timeout=30)
+    sql = ("SELECT d.file_name, d.file_type, d.category, d.findings, d.path, d.last_seen, d.sha256, "
+           "bm25(documents_fts, 2.0, 1.0, 1.5, 1.0) AS score, "
+           "snippet(documents_fts, 3, '[', ']', '...', 12) "
+           "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+           "WHERE documents_fts MATCH ?" + (" AND d.category = ?" if category else "") +
+           " ORDER BY score LIMIT ?")
+    try:
+        params = (query, category, limit) if category else (query, limit)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            rows = conn.execute(sql, (_quote_terms(query),) + params[1:]).fetchall()
+        hits = []
+        for file_name, file_type, cat, findings, path, last_seen, sha256, score, snippet in rows:
+            locations = conn.execute("SELECT COUNT(*) FROM locations WHERE sha256 = ?", (sha256,)).fetchone()[0]
+            hits.append({"file_name": file_name, "file_type": file_type, "category": cat, "findings": findings,
+                         "path": path, "last_seen": last_seen, "score": -score, "snippet": snippet,
+                         "locations": locations})
+        return hits
+    finally:
+        conn.close()
+
+
+def stats(index_path):
+    conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+    try:
+        documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        locations = conn.execute("SELECT COUNT(*) FROM locations").fetchone()[0]
+        categories = conn.execute("SELECT category, COUNT(*) FROM documents GROUP BY category "
+                                  "ORDER BY COUNT(*) DESC").fetchall()
+    finally:
+        conn.close()
+    return {"documents": documents, "locations": locations, "categories": dict(categories)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the Phase 3 full-text index")
+    parser.add_argument("query", nargs="*", help='FTS5 query, e.g. firewall AND "port 22"')
+    parser.add_argument("--index", default="search_index.sqlite", help="Index file written by Phase 3 --index")
+    parser.add_argument("--limit", "-n", type=int, default=20)
+    parser.add_argument("--category", default=None, help="Only files of this File Description")
+    parser.add_argument("--stats", action="store_true", help="Show what the index contains")
+    args = parser.parse_args()
+
+    if args.stats or not args.query:
+        info = stats(args.index)
+        print(f"{info['documents']} documents ({info['locations']} locations) in {args.index}")
+        print(tabulate(info["categories"].items(), headers=["Category", "Documents"], tablefmt="grid"))
+        return
+
+    start = time.perf_counter()
+    hits = search(args.index, " ".join(args.query), args.limit, args.category)
+    elapsed = (time.perf_counter() - start) * 1000
+    rows = [[i, h["file_name"], h["category"], f"{h['score']:.2f}", h["snippet"].replace("\n", " "), h["path"]]
+            for i, h in enumerate(hits, 1)]
+    print(tabulate(rows, headers=["#", "File", "Category", "Score", "Snippet", "Path"], tablefmt="grid",
+                   maxcolwidths=[None, 30, 20, None, 60, 50]))
+    print(f"{len(hits)} hit(s) in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
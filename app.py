@@ -1,53 +1,175 @@
 import streamlit as st
 import os
+import queue
+import shutil
 import tempfile
+import threading
+from collections import OrderedDict
 
-from pipeline_runner import run_pipeline
-
-from Phase1_FileAnalyzer.file_analyzer import run_phase1
-from Phase2_Cleansing.main import run_phase2
-from Phase3_Analyzer.main import run_phase3
+from pipeline_runner import run_pipeline_inprocess
+from Phase1_FileAnalyzer.file_analyzer import is_archive, save_stream, stream_sha256
 
 st.set_page_config(page_title="Document Analyzer", layout="wide")
 
 st.title("📂 Document Analysis Pipeline")
 st.write("Upload a file or ZIP archive. The system will run **Phase 1 → Phase 2 → Phase 3** and generate reports.")
 
+# outputs are kept per upload hash, so a rerun (any widget click) never runs the pipeline again;
+# every server process works in its own folder, only folders of processes that are gone are cleaned
+WORK_ROOT = os.path.join(tempfile.gettempdir(), "optive_pipeline")
+WORK_DIR = os.path.join(WORK_ROOT, str(os.getpid()))
+MAX_JOBS = 20  # finished runs kept, the least recently viewed are deleted (outputs and all) first
+PHASE_LABELS = {"queued": "⏳ Waiting for earlier uploads", "phase1": "🔍 Phase 1: File Analyzer",
+                "phase2": "🧹 Phase 2: File Cleansing", "phase3": "📊 Phase 3: Analysis & Report Generation"}
+
+
+class PipelineJob:
+    """
+    One pipeline run, queued for the runner thread; the script only polls its progress.
+    A ZIP upload goes to Phase 1 as the upload buffer itself, which extracts its members from
+    there; other uploads are streamed to the work folder in chunks.
+    """
+
+    def __init__(self, digest, upload):
+        self.workdir = os.path.join(WORK_DIR, digest)
+        os.makedirs(self.workdir, exist_ok=True)
+        if is_archive(upload):
+            upload.seek(0)
+            self.source = upload
+        else:
+            self.source = save_stream(upload, os.path.join(self.workdir, os.path.basename(upload.name)))
+        self.phase = "queued"
+        self.done = 0
+        self.total = 0
+        self.current = None
+        self.result = None
+        self.error = None
+
+    def _progress(self, phase, done, total, filename):
+        self.phase, self.done, self.total, self.current = phase, done, total, filename
+
+    def run(self):
+        work = os.path.join(self.workdir, "work")
+        try:
+            self.result = run_pipeline_inprocess(self.source, work, progress=self._progress)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            # the raw upload and Phase 1's extracted copies are not needed once Phase 2 has written
+            # the cleansed files, only those and the reports are kept
+            if isinstance(self.source, str) and os.path.exists(self.source):
+                os.remove(self.source)
+            shutil.rmtree(os.path.join(work, "phase1_out", "extracted_files"), ignore_errors=True)
+            self.source = None  # the job stays registered, don't keep the upload buffer alive with it
+
+    @property
+    def finished(self):
+        return self.result is not None or self.error is not None
+
+
+def _run_jobs(jobs):
+    # one job at a time, like pipeline_daemon.py: the phases collect metrics per file process-wide,
+    # so two runs at once would mix their numbers
+    while True:
+        jobs.get().run()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def _clean_work_root():
+    # folders left by server processes that have exited; a live process's jobs may still be running
+    for name in os.listdir(WORK_ROOT) if os.path.isdir(WORK_ROOT) else []:
+        if not name.isdigit() or not _pid_alive(int(name)):
+            shutil.rmtree(os.path.join(WORK_ROOT, name), ignore_errors=True)
+
+
+@st.cache_resource
+def pipeline_jobs():
+    # shared by every session and rerun: upload hash -> PipelineJob, least recently viewed first
+    _clean_work_root()
+    registry = {"lock": threading.Lock(), "jobs": OrderedDict(), "queue": queue.Queue()}
+    threading.Thread(target=_run_jobs, args=(registry["queue"],), daemon=True).start()
+    return registry
+
+
+def _evict(jobs):
+    # finished runs beyond MAX_JOBS are forgotten, least recently viewed first, and their folders deleted
+    finished = [digest for digest, job in jobs.items() if job.finished]
+    for digest in finished[:max(0, len(jobs) - MAX_JOBS)]:
+        shutil.rmtree(jobs.pop(digest).workdir, ignore_errors=True)
+
+
+def get_job(upload):
+    digest = stream_sha256(upload)  # hashed from views of the upload buffer, no copy of it
+    registry = pipeline_jobs()
+    with registry["lock"]:
+        job = registry["jobs"].get(digest)
+        if job is None or job.error:  # failed runs are retried on the next upload
+            job = PipelineJob(digest, upload)
+            registry["jobs"][digest] = job
+            registry["queue"].put(job)
+        registry["jobs"].move_to_end(digest)
+        _evict(registry["jobs"])
+    return job
+
+
+@st.cache_data
+def read_file(path, mtime):
+    # mtime is part of the cache key, so a re-generated report is read again
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@st.fragment(run_every=0.5)
+def show_progress(job):
+    if job.finished:
+        st.rerun()  # the whole page, now with the results
+    label = PHASE_LABELS.get(job.phase, job.phase)
+    current = f" — {job.current}" if job.current else ""
+    st.info(f"{label}: {job.done}/{job.total} file(s){current}")
+    st.progress(job.done / job.total if job.total else 0.0)
+
+
 # Upload file
 uploaded_file = st.file_uploader("Upload file or ZIP", type=None)
 
 if uploaded_file:
-    # Save uploaded file to temp dir
-    with tempfile.TemporaryDirectory() as tmpdir:
-        input_path = os.path.join(tmpdir, uploaded_file.name)
-        with open(input_path, "wb") as f:
-            f.write(uploaded_file.read())
-
-        st.success(f"File uploaded: {uploaded_file.name}")
-
-        # --- Run Phase 1 ---
-        st.info("🔍 Running Phase 1: File Analyzer...")
-        phase1 = run_phase1(input_path, output_dir=os.path.join(tmpdir, "phase1_output"))
-        st.write("**Phase 1 Results:**")
-        st.dataframe(phase1["results"])
-
-        # --- Run Phase 2 ---
-        st.info("🧹 Running Phase 2: File Cleansing...")
-        phase2 = run_phase2(phase1["csv_path"], output_dir=os.path.join(tmpdir, "phase2_output"))
-        st.success("Phase 2 completed ✅")
-
-        # --- Run Phase 3 ---
-        st.info("📊 Running Phase 3: Analysis & Report Generation...")
-        phase3 = run_phase3(phase2["csv_path"], output_dir=os.path.join(tmpdir, "phase3_output"))
-        st.success("Phase 3 completed ✅")
-
-        # Show Phase 3 results in table
-        st.write("**Final Report (Phase 3):**")
-        st.dataframe(phase3["results"])
-
-        # --- Download buttons ---
-        with open(phase3["csv_path"], "rb") as f:
-            st.download_button("⬇️ Download CSV Report", f, file_name="phase3_report.csv")
-
-        with open(phase3["txt_path"], "rb") as f:
-            st.download_button("⬇️ Download TXT Report", f, file_name="phase3_report.txt")
+    job = get_job(uploaded_file)
+    st.success(f"File uploaded: {uploaded_file.name}")
+
+    if not job.finished:
+        # the pipeline runs on the runner thread, only this fragment reruns until it is done
+        show_progress(job)
+        st.stop()
+
+    if job.error:
+        st.error(f"Pipeline failed: {job.error}")
+        st.stop()
+
+    phase1, phase2, phase3 = job.result["phase1"], job.result["phase2"], job.result["phase3"]
+    st.write("**Phase 1 Results:**")
+    st.dataframe(phase1["results"])
+    st.success("Phase 2 completed ✅")
+    if phase2["failures"]:
+        st.warning(f"{len(phase2['failures'])} file(s) could not be cleansed")
+    st.success("Phase 3 completed ✅")
+
+    # Show Phase 3 results in table
+    st.write("**Final Report (Phase 3):**")
+    st.dataframe(phase3["results"])
+
+    # --- Download buttons ---
+    st.download_button("⬇️ Download CSV Report",
+                       read_file(phase3["csv_path"], os.path.getmtime(phase3["csv_path"])),
+                       file_name="phase3_report.csv")
+    st.download_button("⬇️ Download TXT Report",
+                       read_file(phase3["txt_path"], os.path.getmtime(phase3["txt_path"])),
+                       file_name="phase3_report.txt")
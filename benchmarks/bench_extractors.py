@@ -0,0 +1,89 @@
+'''Compares Phase 3 extractor backends (see Phase3_Analyzer/extractors.BACKENDS) on the same corpus.
+Every backend runs in its own fresh process so peak memory is not polluted by the others.
+
+    python -m benchmarks.bench_extractors --input cleansed_output
+'''
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from collections import defaultdict
+from tabulate import tabulate
+
+from Phase3_Analyzer.extractors import BACKENDS, FORMATS, iter_content
+
+try:
+    import resource  # peak RSS of the measuring process (not available on Windows)
+    HAS_RESOURCE = True
+except Exception:
+    HAS_RESOURCE = False
+
+
+def peak_rss_mb():
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def _measure(fmt, backend, files, queue):
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    chars = errors = 0
+    for path in files:
+        for chunk in iter_content(path, fmt if fmt != "image" else "png", {fmt: backend}):
+            if chunk.startswith("[ERROR"):
+                errors += 1
+            chars += len(chunk)
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    queue.put((seconds, chars, errors, peak, baseline))
+
+
+def collect_files(input_path):
+    by_format = defaultdict(list)
+    for root, _, files in os.walk(input_path):
+        for file in files:
+            fmt = FORMATS.get(os.path.splitext(file)[-1].lower().strip("."))
+            if fmt:
+                by_format[fmt].append(os.path.join(root, file))
+    return by_format
+
+
+def bench(input_path, formats=None):
+    ctx = multiprocessing.get_context("spawn")  # clean interpreter per backend
+    rows = []
+    for fmt, files in sorted(collect_files(input_path).items()):
+        if formats and fmt not in formats:
+            continue
+        size_mb = sum(os.path.getsize(f) for f in files) / 1024 ** 2
+        for backend, (_, available) in BACKENDS[fmt].items():
+            if not available:
+                rows.append([fmt, backend, len(files), round(size_mb, 2), "not installed", "", "", ""])
+                continue
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_measure, args=(fmt, backend, files, queue))
+            proc.start()
+            seconds, chars, errors, peak, baseline = queue.get()
+            proc.join()
+            rows.append([fmt, backend, len(files), round(size_mb, 2), round(seconds, 3),
+                         round(size_mb / seconds, 2) if seconds else "",
+                         f"{peak:.0f} (+{peak - baseline:.0f})" if peak is not None else "n/a", errors])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase 3 extractor backend comparison")
+    parser.add_argument("--input", "-i", required=True, help="Folder with the corpus to extract")
+    parser.add_argument("--formats", nargs="*", help="Only these formats (pdf, xlsx, image, ...)")
+    args = parser.parse_args()
+
+    rows = bench(args.input, args.formats)
+    print(tabulate(rows, headers=["Format", "Backend", "Files", "MB", "Seconds", "MB/sec",
+                                  "Peak RSS MB (+extraction)", "Errors"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
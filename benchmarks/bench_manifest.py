@@ -0,0 +1,129 @@
+'''Memory per record and access times of the manifest (manifest.py) against the CSV hand-off.
+
+Builds n synthetic file records and measures (tracemalloc) what one costs as a csv.DictReader
+row, a list row and a FileRecord - in total and for the container alone, the field strings are
+most of it; then times writing the manifest, random lookups by path and by hash, and loading
+all records against re-reading and re-normalizing the same rows from CSV.
+
+    python -m benchmarks.bench_manifest --records 100000
+'''
+
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from tabulate import tabulate
+
+from manifest import FileRecord, Manifest, normalize_type, load
+
+MIMES = [("pdf", "application/pdf"), ("docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+         ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"), ("png", "image/png"),
+         ("log", "text/plain"), ("txt", "text/plain")]
+COLUMNS = ["Filename", "Full Path", "File Type", "SHA256", "Size", "Status", "Text Path"]
+
+
+def make_rows(n, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        ext, mime = rng.choice(MIMES)
+        name = f"evidence_{i:07d}.{ext}"
+        rows.append([name, f"/data/case/extracted/{i % 97}/{name}", mime, "%064x" % rng.getrandbits(256),
+                     str(rng.randint(1000, 10 ** 7)), "ok", f"/data/case/cleansed/.text/{name}.txt.gz"])
+    return rows
+
+
+def bytes_per_item(build, n):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del items
+    return size / n
+
+
+def _record(row):
+    return FileRecord(row[1], row[0], row[3], int(row[4]), row[2], status=row[5], text_path=row[6])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite manifest against the CSV hand-off")
+    parser.add_argument("--records", "-n", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.records)
+    n = len(rows)
+
+    # every form is built from freshly parsed CSV lines, like a phase would see them, so each one
+    # pays for its own field strings
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "files.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(rows)
+
+        def read_csv():
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader)
+                return list(reader)
+
+        memory = [["csv.DictReader row", bytes_per_item(lambda: [dict(zip(COLUMNS, r)) for r in read_csv()], n),
+                   sys.getsizeof(dict(zip(COLUMNS, rows[0])))],
+                  ["list row", bytes_per_item(read_csv, n), sys.getsizeof(list(rows[0]))],
+                  ["FileRecord (__slots__)", bytes_per_item(lambda: [_record(r) for r in read_csv()], n),
+                   sys.getsizeof(_record(rows[0]))]]
+
+        timings = []
+        start = time.perf_counter()
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            parsed = [(row, normalize_type(row["File Type"], row["Filename"])) for row in csv.DictReader(f)]
+        timings.append(["CSV: parse + normalize all", time.perf_counter() - start])
+
+        manifest_path = os.path.join(tmp, "manifest.sqlite")
+        records = [_record(r) for r in rows]
+        start = time.perf_counter()
+        with Manifest(manifest_path, new=True) as manifest:
+            manifest.put(records)
+        timings.append(["manifest: write all", time.perf_counter() - start])
+
+        start = time.perf_counter()
+        loaded = load(manifest_path)
+        timings.append(["manifest: load all", time.perf_counter() - start])
+
+        rng = random.Random(7)
+        sample = [rng.choice(rows) for _ in range(args.lookups)]
+        with Manifest(manifest_path) as manifest:
+            start = time.perf_counter()
+            found = sum(manifest.get(row[1]) is not None for row in sample)
+            by_path = (time.perf_counter() - start) / args.lookups
+            start = time.perf_counter()
+            found += sum(bool(manifest.by_sha256(row[3])) for row in sample)
+            by_hash = (time.perf_counter() - start) / args.lookups
+
+        manifest_mb = os.path.getsize(manifest_path) / 1024 ** 2
+        csv_mb = os.path.getsize(csv_path) / 1024 ** 2
+
+    print(tabulate([[name, round(size), container] for name, size, container in memory],
+                   headers=["Form", "Bytes/record", "Container bytes"], tablefmt="grid"))
+    print(tabulate([[name, round(seconds, 3)] for name, seconds in timings] +
+                   [["manifest: lookup by path", f"{by_path * 1e6:.1f} µs"],
+                    ["manifest: lookup by SHA256", f"{by_hash * 1e6:.1f} µs"]],
+                   headers=["Operation", "Seconds"], tablefmt="grid"))
+    print(f"{n} records: CSV {csv_mb:.1f} MB, manifest {manifest_mb:.1f} MB")
+    if len(loaded) != n or len(parsed) != n or found != 2 * args.lookups:
+        print("[FAIL] Records missing from the manifest")
+    else:
+        print("[DONE] All records found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+'''Skip rate and time saved by the OCR text-region prefilter (Phase2_Cleansing/text_regions.py).
+
+For every image: the prefilter decision (skip / crop / full) and its cost, then - when Tesseract
+is installed - OCR of the whole image against OCR behind the prefilter, and whether the words
+found are the same. Without --input a seeded mix of text images, blank thumbnails, photo-like
+images and logos is generated.
+
+    python -m benchmarks.bench_ocr_prefilter --input phase1_output/extracted
+'''
+
+import os
+import time
+import random
+import argparse
+import tempfile
+from tabulate import tabulate
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from Phase2_Cleansing import text_regions
+from benchmarks.corpus import write_png, _units, _font
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def generate_images(output_dir, per_kind=5, seed=7):
+    """text / blank / photo / logo images, per_kind of each."""
+    rng = random.Random(seed)
+    nprng = np.random.default_rng(seed)
+    for n in range(per_kind):
+        units, _ = _units(rng, rng.randint(2, 12), 0.3)
+        write_png(os.path.join(output_dir, f"text_{n}.png"), units)
+
+        shade = rng.randint(200, 255)
+        Image.new("RGB", (rng.randint(200, 800), rng.randint(150, 600)), (shade,) * 3).save(
+            os.path.join(output_dir, f"blank_{n}.jpeg"))
+
+        noise = (nprng.random((480, 640, 3)) * 255).astype(np.uint8)
+        Image.fromarray(noise).filter(ImageFilter.GaussianBlur(8)).save(os.path.join(output_dir, f"photo_{n}.jpeg"))
+
+        logo = Image.new("RGB", (400, 400), "white")
+        draw = ImageDraw.Draw(logo)
+        color = tuple(rng.randint(0, 200) for _ in range(3))
+        draw.ellipse((60, 60, 340, 340), fill=color)
+        draw.rectangle((150, 150, 250, 250), fill="white")
+        logo.save(os.path.join(output_dir, f"logo_{n}.png"))
+
+
+def _ocr_seconds(run):
+    start = time.perf_counter()
+    words = set(run().split())
+    return time.perf_counter() - start, words
+
+
+def bench(input_dir, ocr=True):
+    rows = []
+    totals = {"images": 0, "skip": 0, "crop": 0, "full": 0, "prefilter": 0.0, "ocr_full": 0.0, "ocr_filtered": 0.0}
+    for name in sorted(os.listdir(input_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        img = Image.open(os.path.join(input_dir, name)).convert("RGB")
+        start = time.perf_counter()
+        box = text_regions.text_crop(np.asarray(img.convert("L")))
+        prefilter = time.perf_counter() - start
+        decision = "skip" if box is None else ("full" if box[2:] == img.size else "crop")
+        totals["images"] += 1
+        totals[decision] += 1
+        totals["prefilter"] += prefilter
+
+        row = [name, f"{img.size[0]}x{img.size[1]}", decision, round(prefilter * 1000, 1)]
+        if ocr:
+            text_regions.enable(False)
+            full_seconds, full_words = _ocr_seconds(lambda: text_regions.image_to_string(img))
+            text_regions.enable(True)
+            filtered_seconds, filtered_words = _ocr_seconds(lambda: text_regions.image_to_string(img))
+            totals["ocr_full"] += full_seconds
+            totals["ocr_filtered"] += filtered_seconds + prefilter
+            row += [round(full_seconds * 1000), round((filtered_seconds + prefilter) * 1000),
+                    len(full_words - filtered_words)]
+        rows.append(row)
+    return rows, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OCR text-region prefilter")
+    parser.add_argument("--input", "-i", default=None, help="Folder of images (default: generated sample)")
+    parser.add_argument("--per-kind", type=int, default=5, help="Generated images per kind (text/blank/photo/logo)")
+    parser.add_argument("--no-ocr", action="store_true", help="Only time the prefilter, don't run Tesseract")
+    args = parser.parse_args()
+
+    ocr = not args.no_ocr and text_regions.HAS_TESSERACT
+    if ocr:
+        try:
+            text_regions.pytesseract.get_tesseract_version()
+        except Exception:
+            print("[WARN] Tesseract is not installed, only the prefilter is timed")
+            ocr = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = args.input
+        if not input_dir:
+            generate_images(tmp, args.per_kind)
+            input_dir = tmp
+        rows, totals = bench(input_dir, ocr)
+
+    headers = ["Image", "Size", "Prefilter", "Prefilter ms"]
+    if ocr:
+        headers += ["OCR ms (full)", "OCR ms (prefiltered)", "Words lost"]
+    print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+    n = totals["images"] or 1
+    print(f"Skipped {totals['skip']} of {totals['images']} image(s) ({totals['skip'] / n:.0%}), "
+          f"cropped {totals['crop']}, full {totals['full']}; prefilter cost {totals['prefilter'] * 1000:.0f} ms total "
+          f"({totals['prefilter'] * 1000 / n:.1f} ms/image)")
+    if ocr:
+        saved = totals["ocr_full"] - totals["ocr_filtered"]
+        print(f"OCR time {totals['ocr_full']:.2f}s → {totals['ocr_filtered']:.2f}s with the prefilter "
+              f"(saved {saved:.2f}s, {saved / totals['ocr_full']:.0%})" if totals["ocr_full"] else "")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+'''Scaling benchmark for Phase 2: runs run_phase2 on the same input with 1, 2, 4 and 8 workers
+and prints wall-clock time, throughput and speedup over the serial run.
+
+    python -m benchmarks.bench_phase2_workers --input phase1_output/files_metadata.csv
+'''
+
+import os
+import argparse
+import tempfile
+import time
+from tabulate import tabulate
+
+from Phase2_Cleansing.main import run_phase2
+
+
+def bench(input_path, workers_list, repeat=1, action="mask", use_spacy=False):
+    rows = []
+    baseline = None
+    for workers in workers_list:
+        timings = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmpdir:  # fresh output dir so every run does the full work
+                start = time.perf_counter()
+                result = run_phase2(input_path, os.path.join(tmpdir, "out"), action, use_spacy, workers=workers)
+                timings.append(time.perf_counter() - start)
+        best = min(timings)
+        if baseline is None:
+            baseline = best
+        n_files = len(result["results"])  # one row per input file, whatever its status
+        rows.append([workers, n_files, round(best, 3), round(n_files / best, 2) if best else 0,
+                     round(baseline / best, 2) if best else 0])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase 2 worker scaling benchmark")
+    parser.add_argument("--input", "-i", required=True, help="Phase1 CSV, folder or file to cleanse")
+    parser.add_argument("--workers", "-w", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", "-r", type=int, default=1, help="Runs per setting (best time is reported)")
+    parser.add_argument("--use-spacy", action="store_true")
+    args = parser.parse_args()
+
+    rows = bench(args.input, args.workers, args.repeat, use_spacy=args.use_spacy)
+    print(tabulate(rows, headers=["Workers", "Files", "Seconds", "Files/sec", "Speedup"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
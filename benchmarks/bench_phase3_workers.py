@@ -0,0 +1,55 @@
+'''Throughput benchmark for Phase 3: runs run_phase3 on the same corpus with 1, 2, 4 and 8 workers
+and reports files/sec and MB/sec. Point it at a mixed image/PDF corpus (a folder or a Phase 2
+cleansed_files.csv); --reextract ignores Phase 2 text sidecars so OCR/PDF parsing is measured.
+
+    python -m benchmarks.bench_phase3_workers --input cleansed_output --reextract
+'''
+
+import os
+import argparse
+import tempfile
+import time
+from collections import Counter
+from tabulate import tabulate
+
+from Phase3_Analyzer.main import run_phase3, collect_tasks
+
+
+def bench(input_path, workers_list, repeat=1, use_sidecars=True):
+    tasks = collect_tasks(input_path, use_sidecars)
+    total_mb = sum(os.path.getsize(t[1]) for t in tasks if os.path.exists(t[1])) / 1024 ** 2
+    mix = Counter(t[2] for t in tasks)
+    print("Corpus: " + ", ".join(f"{count} {ftype}" for ftype, count in mix.most_common())
+          + f" ({total_mb:.1f} MB)")
+
+    rows = []
+    baseline = None
+    for workers in workers_list:
+        timings = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                start = time.perf_counter()
+                run_phase3(input_path, tmpdir, workers=workers, use_sidecars=use_sidecars)
+                timings.append(time.perf_counter() - start)
+        best = min(timings)
+        if baseline is None:
+            baseline = best
+        rows.append([workers, len(tasks), round(best, 3), round(len(tasks) / best, 2) if best else 0,
+                     round(total_mb / best, 2) if best else 0, round(baseline / best, 2) if best else 0])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase 3 worker throughput benchmark")
+    parser.add_argument("--input", "-i", required=True, help="Cleansed folder or Phase 2 cleansed_files.csv")
+    parser.add_argument("--workers", "-w", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", "-r", type=int, default=1, help="Runs per setting (best time is reported)")
+    parser.add_argument("--reextract", action="store_true", help="Ignore Phase 2 text sidecars")
+    args = parser.parse_args()
+
+    rows = bench(args.input, args.workers, args.repeat, use_sidecars=not args.reextract)
+    print(tabulate(rows, headers=["Workers", "Files", "Seconds", "Files/sec", "MB/sec", "Speedup"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
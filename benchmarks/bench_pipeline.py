@@ -0,0 +1,84 @@
+'''Compares the two pipeline_runner engines end to end: in-process (one interpreter, rows handed
+over in memory) against subprocess (one interpreter per phase, CSV hand-off).
+Each run happens in a fresh process and reports wall-clock time and peak RSS, for the subprocess
+engine that is the largest phase process.
+
+    python -m benchmarks.bench_pipeline --input "phase1_output/extracted_files/Analysis Files"
+'''
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from tabulate import tabulate
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except Exception:
+    HAS_RESOURCE = False
+
+
+def _peak_mb(who):
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def _measure(engine, input_path, use_spacy, workers, queue):
+    import contextlib
+    import io
+    import logging
+
+    with tempfile.TemporaryDirectory() as tmpdir, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        from pipeline_runner import run_pipeline  # imported inside the timer, model/library loading is part of the cost
+        logging.disable(logging.INFO)
+        run_pipeline(input_path, os.path.join(tmpdir, "work"), engine, use_spacy=use_spacy, workers=workers)
+        seconds = time.perf_counter() - start
+    peaks = [p for p in (_peak_mb(resource.RUSAGE_SELF), _peak_mb(resource.RUSAGE_CHILDREN))
+             if p is not None] if HAS_RESOURCE else []
+    queue.put((seconds, max(peaks) if peaks else None))
+
+
+def bench(input_path, engines, repeat=1, use_spacy=False, workers=1):
+    ctx = multiprocessing.get_context("spawn")  # every run starts cold, like a CLI invocation
+    rows = []
+    baseline = None
+    for engine in engines:
+        timings, peaks = [], []
+        for _ in range(repeat):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_measure, args=(engine, input_path, use_spacy, workers, queue))
+            proc.start()
+            seconds, peak = queue.get()
+            proc.join()
+            timings.append(seconds)
+            peaks.append(peak)
+        best = min(timings)
+        if baseline is None:
+            baseline = best
+        peak = max((p for p in peaks if p is not None), default=None)
+        rows.append([engine, round(best, 3), f"{peak:.0f}" if peak is not None else "n/a",
+                     round(baseline / best, 2) if best else 0])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process vs subprocess pipeline benchmark")
+    parser.add_argument("--input", "-i", required=True, help="File, ZIP archive or folder to run the pipeline on")
+    parser.add_argument("--engines", nargs="+", default=["subprocess", "inprocess"])
+    parser.add_argument("--repeat", "-r", type=int, default=1, help="Runs per engine (best time is reported)")
+    parser.add_argument("--workers", "-w", type=int, default=1)
+    parser.add_argument("--use-spacy", action="store_true")
+    args = parser.parse_args()
+
+    rows = bench(args.input, args.engines, args.repeat, args.use_spacy, args.workers)
+    print(tabulate(rows, headers=["Engine", "Seconds", "Peak RSS MB", "Speedup"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
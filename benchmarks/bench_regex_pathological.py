@@ -0,0 +1,109 @@
+'''Pathological inputs for the Phase 2 PII patterns.
+
+Long digit/space runs, capitalised or hyphenated text, whitespace after "District", tokens
+without "@"... are scanned with the pre-rewrite patterns (legacy), the current patterns on the
+stdlib engine and - when google-re2 is installed - the re2 engine. Each measurement runs in its
+own process with a timeout, so a legacy pattern that stalls shows up as "> Ns" instead of hanging
+the suite. All engines must report the same matches.
+
+    python -m benchmarks.bench_regex_pathological --sizes 1000 10000 100000 --timeout 20
+'''
+
+import re
+import time
+import argparse
+import multiprocessing
+from tabulate import tabulate
+
+from Phase2_Cleansing import detectors
+
+# the patterns before they were made backtracking-safe, for comparison
+LEGACY_PATTERNS = {
+    "Email": re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"),
+    "FULL_NAME": re.compile(r"\b([A-Z][a-z]+[\s\-]){1,2}[A-Z][a-z]+\b"),
+    "NAME_WITH_TITLE": re.compile(r"\b(Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.)\s([A-Z][a-z]+[\s\-]){1,2}[A-Z][a-z]+\b"),
+    "Phone": re.compile(r"\b(\+?\d{1,3}[-.\s]?)?(\(?\d{2,4}\)?[-.\s]?)?\d{6,12}\b"),
+    "IP": re.compile(r"\b(?:(?:25[0-5]|2[0-4]\d|[01]?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d?\d)\b"),
+    "CREDIT_CARD": re.compile(r"\b(?:\d[ -]*?){13,16}\b"),
+    "SSN_US": re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
+    "URL": re.compile(r"https?://[^\s]+"),
+    "AADHAR_CARD": re.compile(r"\b\d{4}\s?\d{4}\s?\d{4}\b"),
+    "PAN_CARD": re.compile(r"\b[A-Z]{5}[0-9]{4}[A-Z]\b"),
+    "INDIAN_DISTRICT": re.compile(r"\b(?:District|Dist|Zilla)\s+[A-Za-z\s]+\b", re.IGNORECASE),
+    "INDIAN_PINCODE": re.compile(r"\b\d{6}\b"),
+}
+
+# name -> text of about n characters
+CASES = {
+    "digit run": lambda n: "7" * n,
+    "digits and spaces": lambda n: "1 " * (n // 2),
+    "digit/dash/space mix": lambda n: "1 - " * (n // 4) + "x",
+    "dotted digits": lambda n: "1." * (n // 2),
+    "capitalised words": lambda n: "Aaaa " * (n // 5),
+    "hyphenated capitals": lambda n: "Aaaa-" * (n // 5) + " a@b.co",
+    "District + spaces": lambda n: "District" + " " * n,
+    "repeated dist": lambda n: "dist " * (n // 5) + "5",
+    "token without @": lambda n: "a" * n + " x@y.z",
+    "log line": lambda n: ("2024-01-01 host app[123]: user=Aaaa-Bbbb id=1234-5678 " * (n // 56 + 1))[:n],
+}
+
+
+def _run(engine, text, queue):
+    if engine == "legacy":
+        start = time.perf_counter()
+        found = sorted((name, m.start(), m.end()) for name, p in LEGACY_PATTERNS.items() for m in p.finditer(text))
+    else:
+        detectors.set_engine(engine, budget_seconds=None)  # measure the full scan, not the budget
+        start = time.perf_counter()
+        found = sorted((name, m.start(), m.end()) for name, m in detectors._scan(text))
+    queue.put((time.perf_counter() - start, found))
+
+
+def measure(engine, text, timeout):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(engine, text, queue))
+    proc.start()
+    try:
+        return queue.get(timeout=timeout)
+    except Exception:
+        return None, None  # stalled
+    finally:
+        proc.kill()
+        proc.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pathological-input benchmark for the PII patterns")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--timeout", type=float, default=20.0, help="Seconds before a measurement counts as stalled")
+    parser.add_argument("--cases", nargs="*", choices=sorted(CASES))
+    args = parser.parse_args()
+
+    engines = ["legacy", "re"] + (["re2"] if detectors.HAS_RE2 else [])
+    rows, mismatches = [], 0
+    for case in args.cases or CASES:
+        for size in args.sizes:
+            text = CASES[case](size)
+            row = [case, len(text)]
+            reference = None
+            for engine in engines:
+                seconds, found = measure(engine, text, args.timeout)
+                row.append(f"> {args.timeout:g}" if seconds is None else f"{seconds:.3f}")
+                if found is not None:
+                    if reference is None:
+                        reference = found
+                    elif found != reference:
+                        mismatches += 1
+                        row[-1] += " (differs)"
+            rows.append(row)
+
+    print(tabulate(rows, headers=["Input", "Chars"] + [f"{e} (s)" for e in engines], tablefmt="grid"))
+    if not detectors.HAS_RE2:
+        print("[INFO] google-re2 is not installed, re2 engine not measured")
+    print("[DONE] All engines found the same matches" if not mismatches
+          else f"[WARN] {mismatches} measurement(s) found different matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+'''Full cleanse against the detect-only triage scan (run_phase2(scan_only=True) / --scan-only).
+
+Runs both on the same input - the synthetic corpus unless --input is given - per file format
+and in total, and checks the scan logged the same detections as the cleanse (the cleanse's
+picture removals aside).
+
+    python -m benchmarks.bench_scan_only --files 10 --units 2000
+'''
+
+import os
+import csv
+import time
+import argparse
+import tempfile
+import contextlib
+from collections import defaultdict
+from tabulate import tabulate
+
+from Phase2_Cleansing.main import run_phase2
+from benchmarks.corpus import generate_corpus
+
+
+def _detections(audit_rows):
+    return sorted((r["input_file"], r["detection_type"], r["original_snippet"], r["notes"])
+                  for r in audit_rows if r["detector"] != "image_removal")
+
+
+def _run(input_path, output_dir, scan_only, workers):
+    # returns seconds, bytes written, detections
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        result = run_phase2(input_path, output_dir, workers=workers, scan_only=scan_only)
+        seconds = time.perf_counter() - start
+    written = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(output_dir) for f in files)
+    with open(result["audit_log"], newline="", encoding="utf-8") as f:
+        return seconds, written, _detections(csv.DictReader(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scan-only triage mode of Phase 2")
+    parser.add_argument("--input", "-i", default=None, help="Folder/Phase1 CSV (default: generated corpus)")
+    parser.add_argument("--files", type=int, default=5, help="Generated files per format")
+    parser.add_argument("--units", type=int, default=1000, help="Generated paragraphs / rows / lines per file")
+    parser.add_argument("--workers", "-w", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = args.input
+        if not input_path:
+            generate_corpus(os.path.join(tmp, "corpus"), args.files, args.units)
+            input_path = os.path.join(tmp, "corpus", "files")
+
+        by_format = defaultdict(list)
+        for name in sorted(os.listdir(input_path)) if os.path.isdir(input_path) else []:
+            by_format[os.path.splitext(name)[1].lower().strip(".")].append(name)
+
+        rows, same = [], True
+        for fmt, names in sorted(by_format.items()) + [("all", None)]:
+            source = input_path
+            if names is not None:  # one format at a time, through a folder of links
+                source = os.path.join(tmp, "by_format", fmt)
+                os.makedirs(source, exist_ok=True)
+                for name in names:
+                    os.symlink(os.path.join(input_path, name), os.path.join(source, name))
+            full = _run(source, os.path.join(tmp, "out", fmt, "cleanse"), False, args.workers)
+            scan = _run(source, os.path.join(tmp, "out", fmt, "scan"), True, args.workers)
+            same = same and full[2] == scan[2]
+            rows.append([fmt, len(names) if names is not None else sum(map(len, by_format.values())),
+                         round(full[0], 2), round(scan[0], 2), f"{full[0] / scan[0]:.1f}x" if scan[0] else "-",
+                         round(full[1] / 1024 ** 2, 1), round(scan[1] / 1024 ** 2, 1), len(scan[2])])
+
+    print(tabulate(rows, headers=["Format", "Files", "Cleanse (s)", "Scan (s)", "Speedup", "Cleanse MB written",
+                                  "Scan MB written", "Detections"], tablefmt="grid"))
+    print("[DONE] The scan found the same detections as the cleanse" if same
+          else "[FAIL] The scan and the cleanse found different detections")
+
+
+if __name__ == "__main__":
+    main()
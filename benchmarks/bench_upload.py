@@ -0,0 +1,114 @@
+'''Peak RSS and disk writes of taking an upload into the pipeline (app.py), before and after
+chunked streaming.
+
+A ZIP of --size-mb of incompressible members is held in a BytesIO, like Streamlit holds an
+upload, and handed to Phase 1's traversal the old ways (the whole upload as bytes - getvalue()
+or read() - hashed and written to disk, then extracted from there) and the new way (hashed from views of the buffer,
+members extracted straight from it). A plain (non-ZIP) upload is compared the same way, saved
+in one write against chunk by chunk. Every measurement runs in a fresh process; RSS is the peak
+above the process's peak once the upload buffer exists.
+
+    python -m benchmarks.bench_upload --size-mb 512
+'''
+
+import io
+import os
+import sys
+import time
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import multiprocessing
+from tabulate import tabulate
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+from Phase1_FileAnalyzer.file_analyzer import process_input, is_archive, save_stream, stream_sha256
+
+MEMBER_BYTES = 8 * 1024 * 1024
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def make_zip(path, size_mb):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as z:
+        for n in range(max(1, size_mb * 1024 * 1024 // MEMBER_BYTES)):
+            z.writestr(f"evidence/blob_{n:04d}.bin", os.urandom(MEMBER_BYTES))
+
+
+def _disk_bytes(folder):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(folder) for f in files)
+
+
+def _take(mode, upload_path, workdir, queue):
+    with open(upload_path, "rb") as f:
+        upload = io.BytesIO(f.read())  # shares the bytes object, one copy like Streamlit's buffer
+    upload.name = os.path.basename(upload_path)
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode in ("getvalue", "read"):
+        data = upload.getvalue() if mode == "getvalue" else upload.read()
+        hashlib.sha256(data).hexdigest()
+        source = os.path.join(workdir, upload.name)
+        with open(source, "wb") as f:
+            f.write(data)
+        if is_archive(source):
+            process_input(source, workdir)
+    else:
+        stream_sha256(upload)
+        if is_archive(upload):
+            process_input(upload, workdir)
+        else:
+            save_stream(upload, os.path.join(workdir, upload.name))
+    seconds = time.perf_counter() - start
+    queue.put((seconds, _peak_rss_mb() - baseline, _disk_bytes(workdir)))
+
+
+def measure(mode, upload_path):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    with tempfile.TemporaryDirectory() as workdir:
+        proc = ctx.Process(target=_take, args=(mode, upload_path, workdir, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark taking an upload into the pipeline")
+    parser.add_argument("--size-mb", type=int, default=256)
+    args = parser.parse_args()
+    if not HAS_RESOURCE:
+        print("[FAIL] Peak RSS needs the resource module (not available on Windows)")
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "upload.zip")
+        make_zip(zip_path, args.size_mb)
+        plain_path = os.path.join(tmp, "upload.bin")
+        with open(plain_path, "wb") as f:
+            for _ in range(max(1, args.size_mb * 1024 * 1024 // MEMBER_BYTES)):
+                f.write(os.urandom(MEMBER_BYTES))
+        for label, path in (("ZIP", zip_path), ("plain file", plain_path)):
+            for mode, method in (("getvalue", "whole upload, getvalue()"), ("read", "whole upload, read()"),
+                                 ("chunked", "chunked / from buffer")):
+                seconds, rss, disk = measure(mode, path)
+                rows.append([label, method, round(seconds, 2), round(rss), round(disk / 1024 ** 2)])
+
+    print(tabulate(rows, headers=["Upload", "Method", "Seconds", "Extra peak RSS (MB)", "Written to disk (MB)"],
+                   tablefmt="grid"))
+    print(f"Upload size {args.size_mb} MB")
+
+
+if __name__ == "__main__":
+    main()
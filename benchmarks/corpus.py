@@ -0,0 +1,197 @@
+'''Seeded synthetic corpus with known PII for benchmarks.
+
+Writes docx, xlsx, pptx, pdf, png and log files whose text is filler plus PII values planted at
+known units (paragraph / row / slide / line). manifest.json lists every planted value, so a run
+can report how much of it Phase 2 found. The same seed and settings always give the same corpus.
+
+    python -m benchmarks.corpus --output bench_corpus --files 5 --units 200 --seed 42
+'''
+
+import os
+import json
+import random
+import argparse
+
+try:
+    import docx
+    HAS_DOCX = True
+except Exception:
+    HAS_DOCX = False
+
+try:
+    import openpyxl
+    HAS_OPENPYXL = True
+except Exception:
+    HAS_OPENPYXL = False
+
+try:
+    from pptx import Presentation
+    from pptx.util import Inches
+    HAS_PPTX = True
+except Exception:
+    HAS_PPTX = False
+
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except Exception:
+    HAS_PYMUPDF = False
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    HAS_PIL = True
+except Exception:
+    HAS_PIL = False
+
+FORMATS = ["docx", "xlsx", "pptx", "pdf", "png", "log"]
+AVAILABLE = {"docx": HAS_DOCX, "xlsx": HAS_OPENPYXL, "pptx": HAS_PPTX, "pdf": HAS_PYMUPDF,
+             "png": HAS_PIL, "log": True}
+
+# lowercase filler so it does not trip the name patterns by itself
+WORDS = ("access badge entry door report server system update policy review audit staff shift "
+         "window network backup storage ticket request office floor device camera alarm log").split()
+FONT_PATHS = ["/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "DejaVuSans.ttf", "arial.ttf"]
+
+
+def _digits(rng, n):
+    return "".join(str(rng.randint(0, 9)) for _ in range(n))
+
+
+# one generator per planted PII type, named like the Phase 2 detector that should find it
+PII_GENERATORS = {
+    "Email": lambda rng: f"{rng.choice(WORDS)}.{rng.choice(WORDS)}{rng.randint(1, 999)}@example.com",
+    "Phone": lambda rng: "9" + _digits(rng, 9),
+    "SSN_US": lambda rng: f"{_digits(rng, 3)}-{_digits(rng, 2)}-{_digits(rng, 4)}",
+    "IP": lambda rng: ".".join(str(rng.randint(1, 254)) for _ in range(4)),
+    "CREDIT_CARD": lambda rng: " ".join(_digits(rng, 4) for _ in range(4)),
+    "PAN_CARD": lambda rng: "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ") for _ in range(5))
+                            + _digits(rng, 4) + rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ"),
+}
+
+
+def _units(rng, n, pii_rate):
+    """n text units; each carries a planted PII value with probability pii_rate."""
+    units, planted = [], []
+    for i in range(n):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+        if rng.random() < pii_rate:
+            pii_type = rng.choice(sorted(PII_GENERATORS))
+            value = PII_GENERATORS[pii_type](rng)
+            words.insert(rng.randint(0, len(words)), value)
+            planted.append({"type": pii_type, "value": value, "unit": i})
+        units.append(" ".join(words))
+    return units, planted
+
+
+def _font(size):
+    for path in FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, size)
+        except Exception:
+            continue
+    return ImageFont.load_default()
+
+
+def write_docx(path, units):
+    document = docx.Document()
+    for text in units:
+        document.add_paragraph(text)
+    document.save(path)
+
+
+def write_xlsx(path, units):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["id", "notes"])
+    for i, text in enumerate(units):
+        ws.append([i, text])
+    wb.save(path)
+
+
+def write_pptx(path, units):
+    prs = Presentation()
+    for text in units:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank layout
+        slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1)).text_frame.text = text
+    prs.save(path)
+
+
+def write_pdf(path, units, lines_per_page=40):
+    doc = fitz.open()
+    for start in range(0, len(units), lines_per_page):
+        page = doc.new_page()
+        for row, text in enumerate(units[start:start + lines_per_page]):
+            page.insert_text((36, 48 + row * 18), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def write_png(path, units, font_size=20):
+    font = _font(font_size)
+    line_height = int(font_size * 1.6)
+    img = Image.new("RGB", (1400, 40 + line_height * len(units)), "white")
+    draw = ImageDraw.Draw(img)
+    for row, text in enumerate(units):
+        draw.text((20, 20 + row * line_height), text, fill="black", font=font)
+    img.save(path)
+
+
+def write_log(path, units):
+    with open(path, "w", encoding="utf-8") as f:
+        for i, text in enumerate(units):
+            f.write(f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d} host app[{1000 + i}]: {text}\n")
+
+
+WRITERS = {"docx": write_docx, "xlsx": write_xlsx, "pptx": write_pptx, "pdf": write_pdf,
+           "png": write_png, "log": write_log}
+# images are OCR'd, so they get fewer (larger) lines than the text formats
+UNIT_SCALE = {"png": 0.1, "pptx": 0.25}
+
+
+def generate_corpus(output_dir, files=3, units=100, seed=42, pii_rate=0.3, formats=None):
+    """
+    Write the corpus into output_dir/files and output_dir/manifest.json and return the manifest:
+    {"seed", "files_per_format", "units", "pii_rate", "files": {filename: {"format", "bytes", "pii": [...]}}}.
+    """
+    files_dir = os.path.join(output_dir, "files")  # manifest.json stays outside, it is not part of the corpus
+    os.makedirs(files_dir, exist_ok=True)
+    rng = random.Random(seed)
+    manifest = {"seed": seed, "files_per_format": files, "units": units, "pii_rate": pii_rate, "files": {}}
+    for fmt in formats or FORMATS:
+        if not AVAILABLE.get(fmt):
+            print(f"[WARN] Skipping {fmt} files, the library to write them is not installed")
+            continue
+        for n in range(files):
+            filename = f"synthetic_{fmt}_{n:03d}.{fmt}"
+            path = os.path.join(files_dir, filename)
+            text_units, planted = _units(rng, max(1, int(units * UNIT_SCALE.get(fmt, 1))), pii_rate)
+            WRITERS[fmt](path, text_units)
+            manifest["files"][filename] = {"format": fmt, "bytes": os.path.getsize(path), "pii": planted}
+
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def load_manifest(corpus_dir):
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PII corpus")
+    parser.add_argument("--output", "-o", default="bench_corpus")
+    parser.add_argument("--files", type=int, default=3, help="Files per format")
+    parser.add_argument("--units", type=int, default=100, help="Paragraphs / rows / lines per file")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--pii-rate", type=float, default=0.3, help="Share of units carrying a PII value")
+    parser.add_argument("--formats", nargs="*", choices=FORMATS)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(args.output, args.files, args.units, args.seed, args.pii_rate, args.formats)
+    planted = sum(len(entry["pii"]) for entry in manifest["files"].values())
+    print(f"[DONE] {len(manifest['files'])} files with {planted} planted PII values → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+'''Benchmark runner over the synthetic corpus (benchmarks/corpus.py).
+
+Times run_phase1 on the whole corpus, then run_phase2 and run_phase3 per handler (file format),
+each stage in a fresh process, and reports files/sec, MB/sec, peak RSS and - for Phase 2 - the
+recall of the planted PII (a planted value counts as found when an audit row of its file matched it).
+Every run is appended to a JSON history so numbers can be compared across commits.
+
+    python -m benchmarks.run_benchmarks --corpus bench_corpus --generate --files 3 --units 200
+'''
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import multiprocessing
+from collections import defaultdict
+from datetime import datetime, timezone
+from tabulate import tabulate
+
+from benchmarks.corpus import generate_corpus, load_manifest, FORMATS
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except Exception:
+    HAS_RESOURCE = False
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = os.path.join(ROOT, "benchmarks", "history.json")
+
+
+def _peak_rss_mb():
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def _stage(phase, args, kwargs, queue):
+    import io
+    import contextlib
+    if phase == "phase1":
+        from Phase1_FileAnalyzer.file_analyzer import run_phase1 as run
+    elif phase == "phase2":
+        from Phase2_Cleansing.main import run_phase2 as run
+    else:
+        from Phase3_Analyzer.main import run_phase3 as run
+    with contextlib.redirect_stdout(io.StringIO()):  # phase output is not part of the report
+        start = time.perf_counter()
+        result = run(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    queue.put((seconds, _peak_rss_mb(), result["results"], result["csv_path"]))
+
+
+def run_stage(phase, *args, **kwargs):
+    # fresh interpreter per stage, so peak RSS belongs to that stage alone
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_stage, args=(phase, args, kwargs, queue))
+    proc.start()
+    outcome = queue.get()
+    proc.join()
+    return outcome
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def planted_recall(manifest, filenames, audit_csv):
+    """Share of the planted PII values of filenames that show up in an audit row of their file."""
+    snippets = defaultdict(list)
+    if os.path.exists(audit_csv):
+        with open(audit_csv, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                snippets[os.path.basename(row["input_file"])].append(row["original_snippet"])
+    planted = found = 0
+    for filename in filenames:
+        for pii in manifest["files"].get(filename, {}).get("pii", []):
+            planted += 1
+            found += any(pii["value"] in snippet for snippet in snippets[filename])
+    return found / planted if planted else None
+
+
+def _row(stage, fmt, files, size, seconds, peak, recall=None):
+    mb = size / 1024 ** 2
+    return {"stage": stage, "format": fmt, "files": files, "mb": round(mb, 3), "seconds": round(seconds, 3),
+            "files_per_sec": round(files / seconds, 2) if seconds else None,
+            "mb_per_sec": round(mb / seconds, 3) if seconds else None,
+            "peak_rss_mb": round(peak, 1) if peak is not None else None,
+            "recall": round(recall, 4) if recall is not None else None}
+
+
+def run_benchmarks(corpus_dir, work_dir, action="mask", use_spacy=False):
+    from Phase2_Cleansing.main import normalize_type
+
+    manifest = load_manifest(corpus_dir)
+    files_dir = os.path.join(corpus_dir, "files")
+    sizes = {name: entry["bytes"] for name, entry in manifest["files"].items()}
+    stages = []
+
+    seconds, peak, phase1_rows, phase1_csv = run_stage("phase1", files_dir, os.path.join(work_dir, "phase1"))
+    stages.append(_row("phase1", "all", len(phase1_rows), sum(sizes.values()), seconds, peak))
+
+    by_format = defaultdict(list)
+    for row in phase1_rows:
+        by_format[normalize_type(row[2], row[0])].append(row)
+
+    for fmt in sorted(by_format):
+        rows = by_format[fmt]
+        names = [row[0] for row in rows]
+        size = sum(sizes.get(name, 0) for name in names)
+        out2 = os.path.join(work_dir, "phase2", fmt)
+        seconds, peak, phase2_rows, phase2_csv = run_stage("phase2", phase1_csv, out2, action, use_spacy,
+                                                           records=rows)
+        recall = planted_recall(manifest, names, os.path.join(out2, "audit_log.csv"))
+        stages.append(_row("phase2", fmt, len(rows), size, seconds, peak, recall))
+
+        seconds, peak, phase3_rows, _ = run_stage("phase3", phase2_csv, os.path.join(work_dir, "phase3", fmt))
+        stages.append(_row("phase3", fmt, len(phase3_rows), size, seconds, peak))
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {k: manifest.get(k) for k in ("seed", "files_per_format", "units", "pii_rate")},
+        "action": action,
+        "use_spacy": use_spacy,
+        "stages": stages,
+    }
+
+
+def append_history(path, run):
+    history = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            history = json.load(f)
+    previous = next((r for r in reversed(history)
+                     if r["corpus"] == run["corpus"] and r.get("use_spacy") == run["use_spacy"]), None)
+    history.append(run)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+    return previous
+
+
+def main():
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Phase 1-3 benchmarks on a synthetic PII corpus")
+    parser.add_argument("--corpus", "-c", default="bench_corpus", help="Corpus folder (see benchmarks.corpus)")
+    parser.add_argument("--generate", action="store_true", help="(Re)generate the corpus first")
+    parser.add_argument("--files", type=int, default=3, help="With --generate: files per format")
+    parser.add_argument("--units", type=int, default=100, help="With --generate: paragraphs / rows / lines per file")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--formats", nargs="*", choices=FORMATS)
+    parser.add_argument("--use-spacy", action="store_true")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file every run is appended to")
+    args = parser.parse_args()
+
+    if args.generate or not os.path.exists(os.path.join(args.corpus, "manifest.json")):
+        generate_corpus(args.corpus, args.files, args.units, args.seed, formats=args.formats)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        run = run_benchmarks(args.corpus, work_dir, use_spacy=args.use_spacy)
+    previous = append_history(args.history, run)
+
+    baseline = {(s["stage"], s["format"]): s for s in previous["stages"]} if previous else {}
+    rows = []
+    for s in run["stages"]:
+        before = baseline.get((s["stage"], s["format"]))
+        change = (f"{(s['seconds'] - before['seconds']) / before['seconds']:+.0%}"
+                  if before and before["seconds"] else "")
+        rows.append([s["stage"], s["format"], s["files"], s["mb"], s["seconds"], s["files_per_sec"],
+                     s["mb_per_sec"], s["peak_rss_mb"], "" if s["recall"] is None else f"{s['recall']:.1%}", change])
+    print(tabulate(rows, headers=["Stage", "Format", "Files", "MB", "Seconds", "Files/sec", "MB/sec",
+                                  "Peak RSS MB", "PII recall", "Time vs last"], tablefmt="grid"))
+    if previous:
+        print(f"Compared with run {previous['timestamp']} (commit {previous['commit']})")
+    print(f"[DONE] Run recorded in {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+'''Typed per-file records shared by the three phases, persisted as an indexed SQLite manifest.
+
+Phase 1 writes one FileRecord per input into <phase1 output>/manifest.sqlite: path, content
+hash, size, MIME type and the normalized type (pdf, docx, png...) - MIME normalization happens
+once, here, instead of again in every phase. Phase 2 and Phase 3 take the manifest as --input
+and update the same records in place (status, cleansed output, sidecar, category, findings,
+per-phase seconds), so nothing is re-parsed from CSV between phases. The CSV/TXT reports are
+still written as before.
+
+    python -m Phase1_FileAnalyzer.file_analyzer -i evidence.zip -o phase1_output
+    python -m Phase2_Cleansing.main -i phase1_output/manifest.sqlite -o cleansed_output
+    python -m Phase3_Analyzer.main -i phase1_output/manifest.sqlite -o phase3_output
+
+Records are looked up by path (or content hash) without reading the rest of the manifest, and
+iterate in the order Phase 1 found the files.
+'''
+
+import os
+import json
+import sqlite3
+import hashlib
+
+MANIFEST_NAME = "manifest.sqlite"
+
+FIELDS = ("path", "filename", "sha256", "size", "mime", "file_type", "status", "details",
+          "output_path", "text_path", "category", "findings", "timings")
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """
+    Content hash of a file (FileRecord.sha256), read in chunks so large files are never loaded
+    fully into memory. The one implementation every phase uses: sharding (--shard i/N), merging
+    shard results and the cache keys must all agree on it.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def normalize_type(file_type, filename):
+    """
+    MIME type (or raw extension) -> the type the handlers dispatch on: pdf, docx, pptx, xlsx,
+    or the file extension (png, txt, log...). Falls back to file_type when there is no extension.
+    """
+    ext = os.path.splitext(filename)[-1].lower().strip(".")  # get extension
+
+    if "/" in file_type:  # MIME type
+        if "pdf" in file_type: return "pdf"
+        if "word" in file_type or file_type.startswith("application/vnd.openxmlformats-officedocument.wordprocessingml"):
+            return "docx"
+        if "presentation" in file_type or file_type.startswith("application/vnd.openxmlformats-officedocument.presentationml"):
+            return "pptx"
+        if "spreadsheet" in file_type or file_type.startswith("application/vnd.openxmlformats-officedocument.spreadsheetml"):
+            return "xlsx"
+        if "image" in file_type:
+            return ext
+    return ext or file_type
+
+
+class FileRecord:
+    """
+    One input file as it moves through the phases. __slots__ instead of a per-instance dict
+    keeps a record at a fraction of the memory of a dict/list row (see benchmarks/bench_manifest.py).
+    timings: {"phase2": seconds, "phase3": seconds} of the work spent on this file.
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, path, filename=None, sha256="", size=None, mime="", file_type=None, status="",
+                 details="", output_path="", text_path="", category="", findings="", timings=None):
+        self.path = path
+        self.filename = filename or os.path.basename(path)
+        self.sha256 = sha256
+        self.size = size
+        self.mime = mime
+        self.file_type = normalize_type(mime, self.filename) if file_type is None else file_type
+        self.status = status
+        self.details = details
+        self.output_path = output_path
+        self.text_path = text_path
+        self.category = category
+        self.findings = findings
+        self.timings = timings
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __repr__(self):
+        return f"FileRecord({self.filename!r}, type={self.file_type!r}, status={self.status!r})"
+
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    filename TEXT, sha256 TEXT, size INTEGER, mime TEXT, file_type TEXT, status TEXT, details TEXT,
+    output_path TEXT, text_path TEXT, category TEXT, findings TEXT, timings TEXT
+);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+CREATE INDEX IF NOT EXISTS files_output_path ON files (output_path);
+"""
+
+_COLUMNS = ", ".join(FIELDS)
+_UPSERT = (f"INSERT INTO files ({_COLUMNS}) VALUES ({', '.join('?' * len(FIELDS))}) "
+           f"ON CONFLICT(path) DO UPDATE SET " + ", ".join(f"{f} = excluded.{f}" for f in FIELDS[1:]))
+
+
+def _row(record):
+    values = [getattr(record, field) for field in FIELDS]
+    values[-1] = json.dumps(record.timings) if record.timings else None
+    return values
+
+
+def _record(row):
+    record = FileRecord(*row[:-1])
+    record.timings = json.loads(row[-1]) if row[-1] else None
+    return record
+
+
+def is_manifest(path):
+    """Is this an existing manifest written by Phase 1 (and not some other file)?"""
+    if not (path.endswith(".sqlite") and os.path.isfile(path)):
+        return False
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'files'").fetchone() is not None
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+
+
+class Manifest:
+    """
+    The SQLite-backed record store. new=True starts an empty manifest (Phase 1), otherwise the
+    existing records are opened for reading and updating.
+    """
+
+    def __init__(self, path, new=False):
+        self.path = path
+        if new and os.path.exists(path):
+            os.remove(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+
+    def put(self, records):
+        """Insert or update (by path) records, in one transaction."""
+        with self.conn:
+            self.conn.executemany(_UPSERT, (_row(record) for record in records))
+
+    def get(self, path):
+        row = self.conn.execute(f"SELECT {_COLUMNS} FROM files WHERE path = ?", (path,)).fetchone()
+        return _record(row) if row else None
+
+    def by_sha256(self, sha256):
+        return [_record(row) for row in
+                self.conn.execute(f"SELECT {_COLUMNS} FROM files WHERE sha256 = ? ORDER BY id", (sha256,))]
+
+    def by_output_path(self, output_path):
+        row = self.conn.execute(f"SELECT {_COLUMNS} FROM files WHERE output_path = ?", (output_path,)).fetchone()
+        return _record(row) if row else None
+
+    def __iter__(self):
+        return (_record(row) for row in self.conn.execute(f"SELECT {_COLUMNS} FROM files ORDER BY id"))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load(path):
+    """All records of a manifest, in Phase 1 order."""
+    with Manifest(path) as manifest:
+        return list(manifest)
+
+
+def save(path, records):
+    """Write back updated records (matched by path)."""
+    with Manifest(path) as manifest:
+        manifest.put(records)
@@ -0,0 +1,157 @@
+# merge_shards.py
+#
+# Multi-node runs: every machine runs Phase 2 / Phase 3 with --shard i/N on the same Phase 1
+# files_metadata.csv (the SHA256 column decides which machine gets which file), then this
+# script combines the per-shard outputs into one result:
+#   cleansed_files.csv, audit_log.csv/.txt/.xlsx, phase3_report.csv/.txt/.jsonl, phase3_errors.csv
+# Rows are put back in manifest order, so the merged files look like a single-machine run.
+#
+#   python merge_shards.py merge --phase2 s0/cleansed s1/cleansed --phase3 s0/phase3 s1/phase3 \
+#       --manifest phase1_output/files_metadata.csv --output merged
+#
+#   # try it locally: N processes with separate output dirs, then the merge
+#   python merge_shards.py run-local --input phase1_output/files_metadata.csv --shards 4 --output shards
+import os
+import csv
+import sys
+import subprocess
+from collections import Counter
+
+from Phase2_Cleansing.audit import AuditLogger
+from Phase3_Analyzer.report_generator import ReportWriter, HEADERS as REPORT_HEADERS
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PHASE2_HEADERS = ["Filename", "Full Path", "File Type", "Status", "Details", "Text Path", "SHA256"]
+ERROR_HEADERS = ["File Name", "Stage", "Error", "Full Path"]
+
+
+def _read_csv(path):
+    if not os.path.exists(path):
+        print(f"[WARN] Missing shard output: {path}")
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def _write_csv(path, headers, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows([row.get(h, "") for h in headers] for row in rows)
+
+
+def manifest_order(manifest_path):
+    """(Filename, SHA256) and Full Path -> position in the Phase 1 manifest."""
+    order = {}
+    for pos, row in enumerate(_read_csv(manifest_path)):
+        order.setdefault((row["Filename"], row.get("SHA256", "")), pos)
+        order.setdefault(row.get("Full Path", ""), pos)
+    return order
+
+
+def merge(phase2_dirs, phase3_dirs, output_dir, manifest=None):
+    os.makedirs(output_dir, exist_ok=True)
+    order = manifest_order(manifest) if manifest else {}
+    last = len(order) + 1  # rows missing from the manifest go to the end, in shard order
+
+    # Phase 2: cleansed_files.csv
+    cleansed, owners = [], {}
+    for shard, phase2_dir in enumerate(phase2_dirs):
+        for row in _read_csv(os.path.join(phase2_dir, "cleansed_files.csv")):
+            key = (row["Filename"], row.get("SHA256", ""))
+            if key in owners and owners[key] != shard:
+                print(f"[WARN] {row['Filename']} was processed by shards {owners[key]} and {shard}")
+            owners[key] = shard
+            cleansed.append(row)
+    cleansed.sort(key=lambda row: order.get((row["Filename"], row.get("SHA256", "")), last))
+    cleansed_csv = os.path.join(output_dir, "cleansed_files.csv")
+    _write_csv(cleansed_csv, PHASE2_HEADERS, cleansed)
+    if manifest:
+        missing = len({k for k in order if isinstance(k, tuple)} - set(owners))
+        if missing:
+            print(f"[WARN] {missing} file(s) of the manifest are in no shard output")
+
+    # Phase 2: audit log, rows grouped by input file in manifest order
+    audit = AuditLogger(os.path.join(output_dir, "audit_log.csv"))
+    for phase2_dir in phase2_dirs:
+        audit.rows.extend(_read_csv(os.path.join(phase2_dir, "audit_log.csv")))
+    audit.rows.sort(key=lambda row: order.get(row["input_file"], last))
+    audit.save()
+
+    # Phase 3: report and errors, in the order of the merged cleansed files - by the path of the
+    # analyzed (cleansed) file, same-named files of different folders/shards stay apart; reports
+    # written before Phase 3 recorded the path fall back to the file name
+    file_order = {}
+    for pos, row in enumerate(cleansed):
+        file_order.setdefault(os.path.normpath(row["Full Path"]), pos)
+        file_order.setdefault(row["Filename"], pos)
+
+    def phase3_position(row):
+        key = os.path.normpath(row["Full Path"]) if row.get("Full Path") else row["File Name"]
+        return file_order.get(key, len(cleansed))
+
+    reports, errors = [], []
+    for phase3_dir in phase3_dirs:
+        reports.extend(_read_csv(os.path.join(phase3_dir, "phase3_report.csv")))
+        errors.extend(_read_csv(os.path.join(phase3_dir, "phase3_errors.csv")))
+    reports.sort(key=phase3_position)
+    errors.sort(key=phase3_position)
+
+    report_csv = os.path.join(output_dir, "phase3_report.csv")
+    with ReportWriter(report_csv, os.path.join(output_dir, "phase3_report.txt"),
+                      os.path.join(output_dir, "phase3_report.jsonl")) as report:
+        for row in reports:
+            report.write([row.get(h, "") for h in REPORT_HEADERS])
+    report.print_summary()
+    errors_csv = os.path.join(output_dir, "phase3_errors.csv")
+    _write_csv(errors_csv, ERROR_HEADERS, errors)
+
+    statuses = Counter(row["Status"] for row in cleansed)
+    print(f"[DONE] Merged {len(phase2_dirs)} shard(s): {len(cleansed)} files "
+          f"({', '.join(f'{n} {s}' for s, n in statuses.items())}), {len(reports)} report rows → {output_dir}")
+    return {"cleansed_csv": cleansed_csv, "audit_log": audit.csv_path, "report_csv": report_csv,
+            "errors_csv": errors_csv, "files": len(cleansed), "report_rows": len(reports)}
+
+
+def _run_all(commands):
+    procs = [subprocess.Popen([sys.executable, "-m"] + cmd, cwd=ROOT, stdout=subprocess.DEVNULL)
+             for cmd in commands]
+    failed = [cmd for cmd, proc in zip(commands, procs) if proc.wait() != 0]
+    if failed:
+        raise RuntimeError(f"{len(failed)} shard process(es) failed: {failed}")
+
+
+def run_local(manifest, shards, output_dir, action="mask"):
+    """Runs Phase 2 and Phase 3 as `shards` separate processes with their own output dirs, then merges."""
+    shard_dirs = [os.path.join(output_dir, f"shard_{i}") for i in range(shards)]
+    _run_all([["Phase2_Cleansing.main", "--input", manifest, "--output", os.path.join(d, "cleansed"),
+               "--action", action, "--shard", f"{i}/{shards}"] for i, d in enumerate(shard_dirs)])
+    _run_all([["Phase3_Analyzer.main", "--input", os.path.join(d, "cleansed", "cleansed_files.csv"),
+               "--output", os.path.join(d, "phase3")] for d in shard_dirs])
+    return merge([os.path.join(d, "cleansed") for d in shard_dirs], [os.path.join(d, "phase3") for d in shard_dirs],
+                 os.path.join(output_dir, "merged"), manifest)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Combine per-shard Phase 2/3 outputs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    merge_parser = sub.add_parser("merge", help="Merge existing shard outputs")
+    merge_parser.add_argument("--phase2", nargs="+", required=True, help="Phase 2 output folder of every shard")
+    merge_parser.add_argument("--phase3", nargs="*", default=[], help="Phase 3 output folder of every shard")
+    merge_parser.add_argument("--manifest", default=None, help="Phase 1 files_metadata.csv (restores its order)")
+    merge_parser.add_argument("--output", "-o", default="merged_output")
+
+    local_parser = sub.add_parser("run-local", help="Run N shards as local processes and merge them")
+    local_parser.add_argument("--input", "-i", required=True, help="Phase 1 files_metadata.csv")
+    local_parser.add_argument("--shards", "-n", type=int, default=2)
+    local_parser.add_argument("--action", "-a", choices=["mask", "remove"], default="mask")
+    local_parser.add_argument("--output", "-o", default="shards_output")
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        merge(args.phase2, args.phase3, args.output, args.manifest)
+    else:
+        run_local(args.input, args.shards, args.output, args.action)
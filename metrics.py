@@ -0,0 +1,195 @@
+'''Lightweight per-stage instrumentation shared by all phases.
+
+    with metrics.timer("ocr"):
+        data = pytesseract.image_to_data(...)
+    metrics.count("detections", len(detections))
+
+Stages used by the pipeline: detect_type (Phase 1); read, detect_regex, detect_spacy, mask, ocr,
+text_regions, save, audit (Phase 2); extract, interpret, stream, index, report (Phase 3).
+
+Everything is off by default: timer() then returns a shared no-op context manager and count()
+returns after one flag check, so the instrumentation costs next to nothing unless enable() was
+called (--metrics on the CLIs). Time spent on a file is collected between begin_file() and
+end_file(); the driver folds it into the totals with merge_file(), which works the same whether
+the file was processed in this process or in a worker.
+'''
+
+import os
+import json
+import time
+import cProfile
+import contextlib
+from collections import Counter
+
+ENABLED = False
+
+_stages = {}          # stage -> [calls, total seconds, max seconds]
+_counters = Counter()
+_files = []           # finished per-file stats
+_current = None       # per-file stats of the file being processed in this process
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    global _current
+    _stages.clear()
+    _counters.clear()
+    _files.clear()
+    _current = None
+
+
+def _add(stage, calls, seconds, peak):
+    stat = _stages.get(stage)
+    if stat is None:
+        _stages[stage] = [calls, seconds, peak]
+    else:
+        stat[0] += calls
+        stat[1] += seconds
+        if peak > stat[2]:
+            stat[2] = peak
+
+
+def _record(stage, seconds):
+    # inside a file the time goes to that file's stats (added to the totals by merge_file),
+    # outside of one (report writing, audit save...) straight to the totals
+    if _current is None:
+        _add(stage, 1, seconds, seconds)
+        return
+    stat = _current["stages"].get(stage)
+    if stat is None:
+        _current["stages"][stage] = [1, seconds, seconds]
+    else:
+        stat[0] += 1
+        stat[1] += seconds
+        if seconds > stat[2]:
+            stat[2] = seconds
+
+
+class _Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def timer(stage):
+    return _Timer(stage) if ENABLED else _NOOP
+
+
+def count(name, n=1):
+    if not ENABLED:
+        return
+    if _current is None:
+        _counters[name] += n
+    else:
+        _current["counters"][name] = _current["counters"].get(name, 0) + n
+
+
+def begin_file(path, phase):
+    global _current
+    if ENABLED:
+        _current = {"file": path, "phase": phase, "stages": {}, "counters": {}, "start": time.perf_counter()}
+
+
+def end_file():
+    """Closes the current file and returns its stats (None when disabled), to be passed to merge_file."""
+    global _current
+    if not ENABLED or _current is None:
+        return None
+    stats, _current = _current, None
+    stats["seconds"] = time.perf_counter() - stats.pop("start")
+    return stats
+
+
+def merge_file(stats):
+    """Adds one file's stats (from end_file, in this process or a worker) to the totals."""
+    if not ENABLED or not stats:
+        return
+    for stage, (calls, seconds, peak) in stats["stages"].items():
+        _add(stage, calls, seconds, peak)
+    _counters.update(stats["counters"])
+    _files.append(stats)
+
+
+def snapshot():
+    return {
+        "stages": {stage: {"calls": calls, "seconds": round(total, 6), "max_seconds": round(peak, 6)}
+                   for stage, (calls, total, peak) in sorted(_stages.items())},
+        "counters": dict(_counters),
+        "files": [{**f, "seconds": round(f["seconds"], 6),
+                   "stages": {k: round(v[1], 6) for k, v in f["stages"].items()}} for f in _files],
+    }
+
+
+def to_prometheus(data=None):
+    data = data or snapshot()
+    lines = ["# HELP pipeline_stage_seconds_total Time spent per stage.",
+             "# TYPE pipeline_stage_seconds_total counter"]
+    lines += [f'pipeline_stage_seconds_total{{stage="{s}"}} {v["seconds"]}' for s, v in data["stages"].items()]
+    lines += ["# HELP pipeline_stage_calls_total Times each stage ran.",
+              "# TYPE pipeline_stage_calls_total counter"]
+    lines += [f'pipeline_stage_calls_total{{stage="{s}"}} {v["calls"]}' for s, v in data["stages"].items()]
+    lines += ["# HELP pipeline_stage_max_seconds Slowest single run of each stage.",
+              "# TYPE pipeline_stage_max_seconds gauge"]
+    lines += [f'pipeline_stage_max_seconds{{stage="{s}"}} {v["max_seconds"]}' for s, v in data["stages"].items()]
+    lines += ["# HELP pipeline_events_total Pipeline counters (files, detections, audit rows...).",
+              "# TYPE pipeline_events_total counter"]
+    lines += [f'pipeline_events_total{{name="{name}"}} {value}' for name, value in sorted(data["counters"].items())]
+    return "\n".join(lines) + "\n"
+
+
+def write(path):
+    """Writes the stats to path: Prometheus text format for .prom / .txt, JSON (with per-file stats) otherwise."""
+    data = snapshot()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(to_prometheus(data))
+        else:
+            json.dump(data, f, indent=1)
+    print(f"[DONE] Metrics saved → {path}")
+    return path
+
+
+@contextlib.contextmanager
+def profiled(name, profile_dir=None):
+    """cProfile around a block, dumped to profile_dir/<name>.prof (no-op without profile_dir).
+    Work done in worker processes is not included."""
+    if not profile_dir:
+        yield
+        return
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(profile_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        print(f"[DONE] Profile saved → {path} (view with: python -m pstats {path})")
@@ -0,0 +1,206 @@
+# pipeline_daemon.py
+#
+# Long-lived pipeline service for ingest that fires many small jobs. Starting a CLI run pays for
+# interpreter start-up, imports, spaCy model load and Tesseract/rules initialisation every time;
+# the daemon pays that once and then runs each job through pipeline_runner.run_pipeline_inprocess.
+#
+#   python pipeline_daemon.py --port 8765 --use-spacy
+#
+#   POST /jobs        {"input_path": "...", "action": "mask", "use_spacy": false, "workers": 1}
+#                     -> 202 {"id": "...", "status": "queued"}
+#   GET  /jobs/<id>   -> status, per-file progress, timings and output paths
+#   GET  /jobs        -> every job
+#   GET  /health      -> {"status": "ok", "queued": n}
+#
+# Jobs run one at a time in submission order (the phases collect metrics per file, which is
+# process-wide), each job can still use worker processes through "workers".
+# The server only binds to localhost and has no authentication.
+import os
+import json
+import time
+import uuid
+import queue
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pipeline_runner import run_pipeline_inprocess
+from Phase2_Cleansing.detectors import warm_up
+from Phase2_Cleansing.filehandlers.image_handler import warm_up_ocr
+from Phase3_Analyzer.interpreters import get_engine
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+ACTIONS = ("mask", "remove")
+
+
+class Job:
+    def __init__(self, input_path, action="mask", use_spacy=False, workers=1, work_dir="daemon_jobs"):
+        self.id = uuid.uuid4().hex[:12]
+        self.input_path = input_path
+        self.action = action
+        self.use_spacy = use_spacy
+        self.workers = workers
+        self.output_dir = os.path.join(work_dir, self.id)
+        self.status = "queued"
+        self.phase = None
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self.result = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    def progress(self, phase, done, total, filename):
+        self.phase, self.done, self.total = phase, done, total
+
+    def run(self):
+        self.status = "running"
+        self.started = time.time()
+        try:
+            result = run_pipeline_inprocess(self.input_path, self.output_dir, self.action, self.use_spacy,
+                                            workers=self.workers, progress=self.progress)
+            phase2, phase3 = result["phase2"], result["phase3"]
+            self.result = {
+                "files": len(result["phase1"]["results"]),
+                "not_cleansed": len(phase2["failures"]),
+                "analysis_errors": len(phase3["errors"]),
+                "categories": phase3["categories"],
+                "phase1_csv": result["phase1"]["csv_path"],
+                "phase2_csv": phase2["csv_path"],
+                "audit_log": phase2["audit_log"],
+                "report_csv": phase3["csv_path"],
+                "report_txt": phase3["txt_path"],
+                "report_jsonl": phase3["jsonl_path"],
+            }
+            self.status = "done"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.status = "failed"
+            logger.exception("Job %s failed", self.id)
+        self.finished = time.time()
+
+    def to_dict(self):
+        return {
+            "id": self.id, "status": self.status, "input_path": self.input_path, "action": self.action,
+            "use_spacy": self.use_spacy, "workers": self.workers, "output_dir": self.output_dir,
+            "progress": {"phase": self.phase, "done": self.done, "total": self.total},
+            "queued_seconds": round((self.started or time.time()) - self.submitted, 3),
+            "run_seconds": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            "error": self.error, "result": self.result,
+        }
+
+
+class PipelineDaemon:
+    def __init__(self, work_dir="daemon_jobs", use_spacy=False, max_jobs=1000):
+        self.work_dir = work_dir
+        self.max_jobs = max_jobs  # finished jobs kept for status queries, oldest are forgotten first
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.warm(use_spacy)
+        self.runner = threading.Thread(target=self._run_jobs, daemon=True)
+        self.runner.start()
+
+    def warm(self, use_spacy):
+        # load everything a job would otherwise load on its first file
+        start = time.perf_counter()
+        warm_up(use_spacy)
+        warm_up_ocr()
+        get_engine()
+        logger.info("Models loaded in %.2fs (spaCy: %s)", time.perf_counter() - start, use_spacy)
+
+    def submit(self, input_path, action="mask", use_spacy=False, workers=1):
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input path not found: {input_path}")
+        if action not in ACTIONS:
+            raise ValueError(f"action must be one of {', '.join(ACTIONS)}")
+        job = Job(input_path, action, bool(use_spacy), max(1, int(workers)), self.work_dir)
+        with self.lock:
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.status in ("done", "failed")]
+            for old in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+                del self.jobs[old.id]
+        self.queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _run_jobs(self):
+        while True:
+            job = self.queue.get()
+            job.run()
+            logger.info("Job %s %s in %.2fs", job.id, job.status, job.finished - job.started)
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    daemon = None  # set by serve()
+
+    def _send(self, code, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            return self._send(200, {"status": "ok", "queued": self.daemon.queue.qsize()})
+        if path == "/jobs":
+            with self.daemon.lock:
+                jobs = [job.to_dict() for job in self.daemon.jobs.values()]
+            return self._send(200, {"jobs": jobs})
+        if path.startswith("/jobs/"):
+            job = self.daemon.get(path.split("/")[-1])
+            if job is None:
+                return self._send(404, {"error": "job not found"})
+            return self._send(200, job.to_dict())
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = self.daemon.submit(request["input_path"], request.get("action", "mask"),
+                                     request.get("use_spacy", False), request.get("workers", 1))
+        except KeyError as e:
+            return self._send(400, {"error": f"missing field {e}"})
+        except (ValueError, TypeError, FileNotFoundError) as e:
+            return self._send(400, {"error": str(e)})
+        self._send(202, {"id": job.id, "status": job.status})
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(host="127.0.0.1", port=8765, work_dir="daemon_jobs", use_spacy=False):
+    DaemonHandler.daemon = PipelineDaemon(work_dir, use_spacy)
+    server = ThreadingHTTPServer((host, port), DaemonHandler)
+    logger.info("Pipeline daemon listening on http://%s:%d", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Warm pipeline daemon with a local job API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (keep it local, there is no auth)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--work-dir", default="daemon_jobs", help="Each job writes its outputs to WORK_DIR/<job id>")
+    parser.add_argument("--use-spacy", action="store_true", help="Load the spaCy model at start-up")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.work_dir, args.use_spacy)
@@ -1,102 +1,146 @@
 # pipeline_runner.py
+#
+# Runs Phase1 -> Phase2 -> Phase3 in this process: each phase hands its FileRecords to the next
+# one in memory (records=...) instead of the next phase re-parsing the CSV it just wrote, and
+# spaCy / Tesseract / the rules engine are loaded once. Every phase still writes its usual
+# artifacts (files_metadata.csv, cleansed_files.csv + audit log, phase3_report.*) and updates
+# phase1_out/manifest.sqlite (see manifest.py).
+# The phases run one after another over the whole batch, not file by file: Phase 2 and Phase 3
+# order their pools by file size / memory estimate over the batch, and each phase's artifacts
+# (CSV, audit log, report, manifest columns) are complete when the next phase starts.
+# The old one-interpreter-per-phase path is kept as engine="subprocess", chained through the manifest.
 import os
 import sys
 import subprocess
 import logging
 from typing import Tuple
 
+from Phase1_FileAnalyzer.file_analyzer import run_phase1
+from Phase2_Cleansing.main import run_phase2
+from Phase3_Analyzer.main import run_phase3
+import metrics
+from manifest import MANIFEST_NAME
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
+ENGINES = ("inprocess", "subprocess")
+
 
-def _run_subprocess(script_path: str, args: list):
-    cmd = [sys.executable, script_path] + args
+def _run_subprocess(module: str, args: list):
+    cmd = [sys.executable, "-m", module] + args  # phases use package imports, so run them as modules
     logger.info("Running subprocess: %s", " ".join(cmd))
     proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
     if proc.returncode != 0:
         logger.error("Subprocess failed: %s", proc.stderr)
-        raise RuntimeError(f"Script {script_path} exited with {proc.returncode}\nstdout:\n{proc.stdout}\nstderr:\n{proc.stderr}")
+        raise RuntimeError(f"Module {module} exited with {proc.returncode}\nstdout:\n{proc.stdout}\nstderr:\n{proc.stderr}")
     return proc.stdout
 
-# Try direct import wrappers first (recommended). If not available, fallback to subprocess.
-def run_phase1(input_dir: str, output_dir: str):
-    """
-    Run Phase1. Prefer direct function `analyze_files`, else call file_analyzer.py CLI.
-    """
-    try:
-        sys.path.insert(0, ROOT)
-        from Phase1_FileAnalyzer.file_analyzer import analyze_files  # type: ignore
-        logger.info("Using direct import analyze_files from Phase1_FileAnalyzer")
-        return analyze_files(input_dir, output_dir)
-    except Exception as e:
-        logger.info("Direct import for Phase1 failed (%s). Falling back to subprocess.", e)
-        script = os.path.join(ROOT, "Phase1_FileAnalyzer", "file_analyzer.py")
-        _run_subprocess(script, ["--input", input_dir, "--output", output_dir])
-        # assume outputs are in output_dir: return a path or None. For consistency return output_dir
-        return output_dir
-
-def run_phase2(input_dir: str, output_dir: str):
-    """
-    Run Phase2. Prefer direct function `cleanse_files`, else call Phase2_Cleansing/main.py CLI.
-    """
-    try:
-        sys.path.insert(0, ROOT)
-        from Phase2_Cleansing.main import cleanse_files  # type: ignore
-        logger.info("Using direct import cleanse_files from Phase2_Cleansing")
-        return cleanse_files(input_dir, output_dir)
-    except Exception as e:
-        logger.info("Direct import for Phase2 failed (%s). Falling back to subprocess.", e)
-        script = os.path.join(ROOT, "Phase2_Cleansing", "main.py")
-        _run_subprocess(script, ["--input", input_dir, "--output", output_dir])
-        return output_dir
-
-def run_phase3(input_dir: str, output_dir: str) -> Tuple[str, str]:
+
+def _dirs(working_dir: str):
+    os.makedirs(working_dir, exist_ok=True)
+    return (os.path.join(working_dir, "phase1_out"),
+            os.path.join(working_dir, "cleansed_output"),
+            os.path.join(working_dir, "phase3_out"))
+
+
+def run_pipeline_inprocess(input_path: str, working_dir: str, action="mask", use_spacy=False, workers=1,
+                           progress=None, profile_dir=None, **phase2_options) -> dict:
     """
-    Run Phase3. Prefer direct function `run_analysis` returning (csv_path, txt_path),
-    else call Phase3_Analyzer/main.py and return paths where we expect outputs.
+    Phase1 -> Phase2 -> Phase3 in this interpreter with in-memory hand-off between phases.
+    Phase at a time: every phase finishes the whole batch before the next one starts, the next
+    phase gets the previous one's records (no CSV re-parsing), not each file as it is done.
+    input_path may be an open ZIP file object (e.g. an upload buffer), see process_input.
+    phase2_options are passed to run_phase2 (cache_dir, timeout, memory_limit, ...).
+    progress(phase, done, total, filename) reports per-file progress, handy for UIs.
+    profile_dir: write a cProfile dump per phase (phase1.prof, phase2.prof, phase3.prof) there.
+    Returns {"phase1": ..., "phase2": ..., "phase3": ...} with each phase's result dict.
     """
-    try:
-        sys.path.insert(0, ROOT)
-        from Phase3_Analyzer.main import run_analysis  # type: ignore
-        logger.info("Using direct import run_analysis from Phase3_Analyzer")
-        return run_analysis(input_dir, output_dir)
-    except Exception as e:
-        logger.info("Direct import for Phase3 failed (%s). Falling back to subprocess.", e)
-        script = os.path.join(ROOT, "Phase3_Analyzer", "main.py")
-        _run_subprocess(script, ["--input", input_dir, "--output", output_dir])
-        # assume the script wrote 'phase3_report.csv' and 'phase3_report.txt' into output_dir
-        csv_path = os.path.join(output_dir, "phase3_report.csv")
-        txt_path = os.path.join(output_dir, "phase3_report.txt")
-        if not os.path.exists(csv_path) or not os.path.exists(txt_path):
-            raise FileNotFoundError(f"Expected output files not found in {output_dir}")
-        return csv_path, txt_path
-
-def run_pipeline(uploaded_dir: str, working_dir: str) -> Tuple[str, str]:
+    phase1_out, cleansing_out, phase3_out = _dirs(working_dir)
+
+    def report(phase):
+        if progress:
+            return lambda done, total, filename: progress(phase, done, total, filename)
+        return None
+
+    with metrics.profiled("phase1", profile_dir):
+        phase1 = run_phase1(input_path, phase1_out)
+    if progress:
+        progress("phase1", len(phase1["results"]), len(phase1["results"]), None)
+
+    with metrics.profiled("phase2", profile_dir):
+        phase2 = run_phase2(phase1["csv_path"], cleansing_out, action, use_spacy, workers=workers,
+                            records=phase1["records"], manifest_path=phase1["manifest_path"],
+                            progress=report("phase2"), **phase2_options)
+
+    with metrics.profiled("phase3", profile_dir):
+        phase3 = run_phase3(phase2["csv_path"], phase3_out, workers=workers, records=phase2["records"],
+                            manifest_path=phase1["manifest_path"], progress=report("phase3"))
+
+    return {"phase1": phase1, "phase2": phase2, "phase3": phase3}
+
+
+def run_pipeline_subprocess(input_path: str, working_dir: str, action="mask", use_spacy=False,
+                            workers=1) -> Tuple[str, str]:
+    """Each phase in a fresh interpreter, chained through the manifest on disk."""
+    phase1_out, cleansing_out, phase3_out = _dirs(working_dir)
+
+    _run_subprocess("Phase1_FileAnalyzer.file_analyzer", ["--input", input_path, "--output", phase1_out])
+
+    manifest_path = os.path.join(phase1_out, MANIFEST_NAME)
+    phase2_args = ["--input", manifest_path, "--output", cleansing_out,
+                   "--action", action, "--workers", str(workers)]
+    if use_spacy:
+        phase2_args.append("--use-spacy")
+    _run_subprocess("Phase2_Cleansing.main", phase2_args)
+
+    _run_subprocess("Phase3_Analyzer.main", ["--input", manifest_path,
+                                             "--output", phase3_out, "--workers", str(workers)])
+    csv_path = os.path.join(phase3_out, "phase3_report.csv")
+    txt_path = os.path.join(phase3_out, "phase3_report.txt")
+    if not os.path.exists(csv_path) or not os.path.exists(txt_path):
+        raise FileNotFoundError(f"Expected output files not found in {phase3_out}")
+    return csv_path, txt_path
+
+
+def run_pipeline(uploaded_dir: str, working_dir: str, engine="inprocess", **options) -> Tuple[str, str]:
     """
-    orchestrate Phase1 -> Phase2 -> Phase3 using directories.
-    uploaded_dir: directory that contains extracted uploaded files
+    orchestrate Phase1 -> Phase2 -> Phase3.
+    uploaded_dir: uploaded file, ZIP or directory with the extracted uploaded files
     working_dir: temp working directory where intermediate outputs are written
+    engine: "inprocess" (default) or "subprocess"
     Returns (report_csv_path, report_txt_path)
     """
-    os.makedirs(working_dir, exist_ok=True)
-    phase1_out = os.path.join(working_dir, "phase1_out")
-    cleansing_out = os.path.join(working_dir, "cleansed_output")
-    phase3_out = os.path.join(working_dir, "phase3_out")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown pipeline engine '{engine}', expected one of {', '.join(ENGINES)}")
+    if engine == "subprocess":
+        return run_pipeline_subprocess(uploaded_dir, working_dir, **options)
 
-    os.makedirs(phase1_out, exist_ok=True)
-    os.makedirs(cleansing_out, exist_ok=True)
-    os.makedirs(phase3_out, exist_ok=True)
+    phase3 = run_pipeline_inprocess(uploaded_dir, working_dir, **options)["phase3"]
+    return phase3["csv_path"], phase3["txt_path"]
 
-    # Phase 1: analyze (metadata + maybe extraction)
-    run_phase1(uploaded_dir, phase1_out)
 
-    # Phase 2: cleanse - input commonly is either uploaded_dir or phase1_out/extract folder.
-    # If your Phase1 extracts files into uploaded_dir or a specific folder, change this accordingly.
-    # We'll pass uploaded_dir as input to Phase2 by default; adjust if your pipeline expects a different path.
-    run_phase2(uploaded_dir, cleansing_out)
+if __name__ == "__main__":
+    import argparse
 
-    # Phase 3: analysis on cleansed output
-    csv_path, txt_path = run_phase3(cleansing_out, phase3_out)
+    parser = argparse.ArgumentParser(description="Run Phase 1 -> 2 -> 3 end to end")
+    parser.add_argument("--input", "-i", required=True, help="File, ZIP archive or folder to process")
+    parser.add_argument("--output", "-o", default="pipeline_output", help="Working folder for all phase outputs")
+    parser.add_argument("--engine", choices=ENGINES, default="inprocess")
+    parser.add_argument("--action", "-a", choices=["mask", "remove"], default="mask")
+    parser.add_argument("--use-spacy", action="store_true")
+    parser.add_argument("--workers", "-w", type=int, default=1)
+    parser.add_argument("--metrics", default=None,
+                        help="In-process engine: write per-stage timings/counters here (.prom or JSON)")
+    parser.add_argument("--profile", default=None, help="In-process engine: cProfile dump per phase into this folder")
+    args = parser.parse_args()
 
-    return csv_path, txt_path
+    options = {"action": args.action, "use_spacy": args.use_spacy, "workers": args.workers}
+    if args.engine == "inprocess":
+        metrics.enable(bool(args.metrics))
+        options["profile_dir"] = args.profile
+    csv_path, txt_path = run_pipeline(args.input, args.output, args.engine, **options)
+    if args.metrics and args.engine == "inprocess":
+        metrics.write(args.metrics)
+    print(f"[DONE] Pipeline complete → CSV: {csv_path}, TXT: {txt_path}")
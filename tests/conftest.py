@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# the phases import each other and the shared root modules (metrics, manifest) from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FONT_PATHS = ["/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "DejaVuSans.ttf", "arial.ttf"]
+
+
+@pytest.fixture
+def font():
+    """font(size) -> a TrueType font for drawing test images, PIL's default one if none is installed."""
+    ImageFont = pytest.importorskip("PIL.ImageFont")
+
+    def load(size):
+        for path in FONT_PATHS:
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError:
+                continue
+        return ImageFont.load_default()
+    return load
@@ -0,0 +1,23 @@
+from Phase2_Cleansing import detectors, text_regions
+from Phase2_Cleansing.cache import CleanseCache
+
+
+def test_key_follows_scan_and_prefilter_settings(tmp_path):
+    src = tmp_path / "notes.txt"
+    src.write_text("call 9876543210")
+    cache = CleanseCache(str(tmp_path / "cache"))
+    keys = set()
+    try:
+        for engine, budget, prefilter in (("re", 5.0, True), ("re", None, True), ("re", 5.0, False),
+                                          ("re2", 5.0, True)):
+            detectors.set_engine(engine, budget)
+            text_regions.enable(prefilter)
+            keys.add(cache.make_key(str(src), "mask", False))
+        detectors.set_engine("re", 5.0)
+        text_regions.enable(True)
+        assert cache.make_key(str(src), "mask", False) in keys
+    finally:
+        detectors.set_engine("re", 5.0)
+        text_regions.enable(True)
+    # without google-re2 / OpenCV those settings fall back to the defaults and share their key
+    assert len(keys) == 2 + detectors.HAS_RE2 + text_regions.HAS_CV2
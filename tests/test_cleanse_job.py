@@ -0,0 +1,27 @@
+import time
+import threading
+
+from Phase2_Cleansing import main as phase2
+
+
+def test_parallel_jobs_keep_their_own_failures(monkeypatch, capsys):
+    def failing_route(input_path, *args, **kwargs):
+        for _ in range(20):
+            phase2.logger.error(f"[FAIL] {input_path} → text: broken")
+            time.sleep(0.001)
+        return False
+
+    monkeypatch.setattr(phase2, "route_file", failing_route)
+    errors = {}
+
+    def run(name):
+        errors[name] = phase2.cleanse_job((name, name, name + ".out", "text"), "mask", False)["error"]
+
+    threads = [threading.Thread(target=run, args=(f"file_{n}.txt",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    print("[INFO] main thread still prints")
+    for thread in threads:
+        thread.join()
+    assert errors == {name: f"[FAIL] {name} → text: broken" for name in errors} and len(errors) == 4
+    assert "[INFO] main thread still prints" in capsys.readouterr().out
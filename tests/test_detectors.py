@@ -0,0 +1,97 @@
+import re
+import random
+
+import pytest
+
+from Phase2_Cleansing import detectors
+
+# the patterns before they were made backtracking-safe: the windowed scan must find exactly their matches
+LEGACY_EMAIL = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+LEGACY_FULL_NAME = re.compile(r"\b([A-Z][a-z]+[\s\-]){1,2}[A-Z][a-z]+\b")
+
+
+def _found(text, name):
+    return [(m.start(), m.end()) for n, m in detectors._scan(text) if n == name]
+
+
+@pytest.fixture(autouse=True)
+def stdlib_engine():
+    detectors.set_engine("re", budget_seconds=None)
+    yield
+    detectors.set_engine("re", budget_seconds=5.0)
+
+
+def test_email_run_across_window_boundary():
+    # the local part starts in the first window and runs past the old 512 character overlap
+    text = "x " * 2000 + "-" * 700 + "john.doe@example.com"
+    expected = [(m.start(), m.end()) for m in LEGACY_EMAIL.finditer(text)]
+    assert expected == [(4000, 4720)]
+    assert _found(text, "Email") == expected
+
+
+@pytest.mark.parametrize("offset", [0, 1, 2000, 4090, 4095, 4096, 4097, 8190])
+def test_long_matches_at_every_boundary(offset):
+    text = "." * offset + "Abc" + "d" * 5000 + " Smith and " + "a" * 6000 + "@example.com end"
+    assert _found(text, "FULL_NAME") == [(m.start(), m.end()) for m in LEGACY_FULL_NAME.finditer(text)]
+    assert _found(text, "Email") == [(m.start(), m.end()) for m in LEGACY_EMAIL.finditer(text)]
+
+
+def test_budget_overrun_redacts_the_rest(monkeypatch):
+    monkeypatch.setattr(detectors, "SCAN_BUDGET_SECONDS", 1e-9)
+    text = "mail a@b.co " + "x" * 3 * detectors.SCAN_WINDOW
+    detections = detectors._regex_detections(text)
+    unscanned = [d for d in detections if d["type"] == "UNSCANNED"]
+    assert len(unscanned) == 1 and unscanned[0]["end"] == len(text)
+
+
+class _Recording:
+    # a compiled pattern that records how much text every finditer call may read
+    def __init__(self, pattern, spans):
+        self.pattern, self.spans = pattern, spans
+
+    def finditer(self, text, pos=0, endpos=None):
+        self.spans.append(min(len(text), endpos or len(text)) - pos)
+        return self.pattern.finditer(text, pos, len(text) if endpos is None else endpos)
+
+
+def test_each_search_stays_near_its_window(monkeypatch):
+    # no IP until the very end: one search must not run through the whole text in a single call
+    spans = []
+    monkeypatch.setitem(detectors.RE_PATTERNS, "IP", _Recording(detectors.RE_PATTERNS["IP"], spans))
+    text = "word " * 200000 + "10.0.0.1"
+    assert [text[m.start():m.end()] for n, m in detectors._scan(text) if n == "IP"] == ["10.0.0.1"]
+    assert max(spans) <= 2 * detectors.SCAN_WINDOW
+
+
+def test_small_windows_find_the_same_matches(monkeypatch):
+    monkeypatch.setattr(detectors, "SCAN_WINDOW", 8)
+    tokens = ["1", "123456789", "1234 ", "5678-", " ", "-", "@", "a", "b.c", "_", "+", "John ", "Bob", "Mr. ",
+              "District abc ", "ABCDE", "255.", "http://", "x" * 20, "a@b.co", "\n", "\u0163"]
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 60)))
+        expected = sorted((name, m.span()) for name, p in detectors.RE_PATTERNS.items() for m in p.finditer(text))
+        assert sorted((name, m.span()) for name, m in detectors._scan(text)) == expected, text
+
+
+def _batch_texts(rng, count):
+    # matches right at the start and end of texts, empty texts, separators inside a text
+    pieces = ["john.doe@example.com", "9876543210", "John Smith", "Dr. Jane Roe", "http://x.org/a", "10.0.0.1",
+              "ABCDE1234F", "123-45-6789", "District Pune", "560001", "4111 1111 1111 1111", "",
+              "plain words", " ", "\n", "-", "\n\x00\n", "Aa"]
+    return ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 6))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("count", [1, 50, 2000])
+def test_batch_matches_text_by_text(count):
+    texts = _batch_texts(random.Random(count), count)
+    texts += ["", "a@b.co", "x" * (detectors.SCAN_WINDOW + 10) + " 9876543210"]
+    assert detectors.detect_pii_batch(texts) == [detectors.detect_pii_in_text(t) for t in texts]
+
+
+def test_batch_matches_text_by_text_over_budget(monkeypatch):
+    monkeypatch.setattr(detectors, "SCAN_BUDGET_SECONDS", 1e-9)
+    texts = _batch_texts(random.Random(7), 3000) + ["y" * 3 * detectors.SCAN_WINDOW + " a@b.co"]
+    expected = [detectors.detect_pii_in_text(t) for t in texts]
+    assert any(d["type"] == "UNSCANNED" for d in expected[-1])
+    assert detectors.detect_pii_batch(texts) == expected
@@ -0,0 +1,40 @@
+import pytest
+
+from Phase3_Analyzer import extractors
+
+
+def _flaky(file_path):
+    yield "first page\n"
+    raise ValueError("broken object stream")
+
+
+def _dead(file_path):
+    raise ValueError("not a text file")
+    yield  # a generator, like the real backends
+
+
+@pytest.fixture
+def text_file(tmp_path, monkeypatch):
+    path = tmp_path / "notes.log"
+    path.write_text("first page\nsecond page\n")
+    monkeypatch.setitem(extractors.BACKENDS, "text", dict(extractors.BACKENDS["text"], flaky=(_flaky, True),
+                                                          dead=(_dead, True)))
+    return str(path)
+
+
+def test_extract_content_restarts_on_the_next_backend(text_file, monkeypatch):
+    monkeypatch.setitem(extractors.DEFAULT_BACKENDS, "text", ["flaky", "builtin"])
+    assert extractors.extract_content(text_file, "log") == "first page\nsecond page\n"
+
+
+def test_iter_content_never_returns_truncated_text(text_file, monkeypatch):
+    monkeypatch.setitem(extractors.DEFAULT_BACKENDS, "text", ["flaky", "builtin"])
+    with pytest.raises(RuntimeError, match="part way"):
+        list(extractors.iter_content(text_file, "log"))
+
+
+def test_iter_content_falls_back_before_the_first_chunk(text_file, monkeypatch):
+    monkeypatch.setitem(extractors.DEFAULT_BACKENDS, "text", ["dead", "builtin"])
+    assert "".join(extractors.iter_content(text_file, "log")) == "first page\nsecond page\n"
+    monkeypatch.setitem(extractors.DEFAULT_BACKENDS, "text", ["dead"])
+    assert extractors.extract_content(text_file, "log").startswith("[ERROR extracting text: dead:")
@@ -0,0 +1,73 @@
+from Phase3_Analyzer.interpreters import classify_stream, interpret_content, get_engine
+
+
+def _chunks(text, size=64):
+    return iter([text[i:i + size] for i in range(0, len(text), size)])
+
+
+def test_stream_waits_for_higher_priority_rules():
+    # plenty of early hits for a lower rule (Visitors Logbook), a higher one (Biometric) only at the end
+    text = "visitor entry logbook page, visitor signed in. " * 20 + "\n" + "fingerprint scan enrolled\n"
+    expected = interpret_content(text, "txt")
+    assert expected[0] == "Biometric Attendance/Access System"
+    desc, findings, stats = classify_stream(_chunks(text), "txt")
+    assert (desc, findings) == expected
+    assert stats["stopped"] == "eof"
+
+
+def test_stream_stops_early_on_the_top_rule():
+    engine = get_engine()
+    top = engine.rules[0]["category"]
+    text = "card reader door 3 granted\n" + "visitor badge issued\n" * 200
+    assert interpret_content(text, "txt")[0] == top
+    desc, _, stats = classify_stream(_chunks(text), "txt", engine)
+    assert desc == top and stats["stopped"] == "decided" and stats["bytes"] < len(text)
+
+
+def test_stream_matches_interpret_content_on_mixed_texts():
+    engine = get_engine()
+    keywords = [k.rstrip("*") for rule in engine.rules for k in rule.get("any", []) + rule.get("all", [])]
+    for shift in range(len(keywords)):
+        words = keywords[shift:] + keywords[:shift]
+        text = " filler text ".join(w for w in words for _ in range(3))
+        assert classify_stream(_chunks(text, 40), "log", engine)[:2] == interpret_content(text, "log", engine)
+
+
+def test_scores_are_reported_with_the_category():
+    from Phase3_Analyzer.interpreters import format_scores
+
+    text = "visitor logbook visitor\n" + "fingerprint\n"
+    desc, _, scores = interpret_content(text, "txt", with_scores=True)
+    assert desc == "Biometric Attendance/Access System"
+    assert scores == {"Visitors Logbook": 3, "Biometric Attendance/Access System": 1}
+    assert format_scores(scores) == "Visitors Logbook: 3, Biometric Attendance/Access System: 1"
+    assert classify_stream(_chunks(text), "txt")[2]["scores"] == scores
+
+
+def test_decide_hits_stops_on_a_lower_rule():
+    engine = get_engine()
+    text = "visitor entry logbook page, visitor signed in. " * 200
+    desc = interpret_content(text, "txt", engine)[0]
+    assert desc != engine.rules[0]["category"]
+    assert classify_stream(_chunks(text), "txt", engine)[2]["stopped"] == "eof"
+    got, _, stats = classify_stream(_chunks(text), "txt", engine, decide_hits=5)
+    assert got == desc and stats["stopped"] == "decided" and stats["bytes"] < len(text)
+
+
+def test_decide_hits_reaches_the_stream_analysis(tmp_path, monkeypatch):
+    from Phase3_Analyzer import main as phase3
+
+    input_dir = tmp_path / "cleansed"
+    input_dir.mkdir()
+    (input_dir / "visitors.log").write_text("visitor entry logbook page, visitor signed in.\n" * 50000)
+    stops = []
+
+    def recording_classify(*args, **kwargs):
+        result = classify_stream(*args, **kwargs)
+        stops.append(result[2]["stopped"])
+        return result
+
+    monkeypatch.setattr(phase3, "classify_stream", recording_classify)
+    for decide_hits in (None, 5):
+        phase3.run_phase3(str(input_dir), str(tmp_path / f"out_{decide_hits}"), stream=True, decide_hits=decide_hits)
+    assert stops == ["eof", "decided"]
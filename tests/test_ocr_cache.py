@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+from Phase2_Cleansing import ocr_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    path = str(tmp_path / "ocr.sqlite")
+    ocr_cache.configure(path, max_bytes=1000)
+    yield path
+    ocr_cache.configure(None)
+
+
+def _sum_bytes(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM ocr").fetchone()[0]
+
+
+def test_running_total_follows_puts_replaces_and_evictions(cache):
+    for n in range(30):
+        ocr_cache.put(f"k{n}", "x" * 98)  # 100 bytes as JSON
+        assert ocr_cache.stats()["bytes"] == _sum_bytes(cache) <= 1000
+    ocr_cache.put("k29", "x" * 8)
+    assert ocr_cache.stats()["bytes"] == _sum_bytes(cache)
+    assert ocr_cache.get("k29") == "x" * 8 and ocr_cache.get("k0") is None
+
+
+def test_recent_hits_do_not_write(cache, monkeypatch):
+    ocr_cache.put("k", [1, 2])
+    with sqlite3.connect(cache) as conn:
+        stored = conn.execute("SELECT last_used FROM ocr").fetchone()[0]
+    assert ocr_cache.get("k") == [1, 2]
+    with sqlite3.connect(cache) as conn:
+        assert conn.execute("SELECT last_used FROM ocr").fetchone()[0] == stored
+    monkeypatch.setattr(ocr_cache.time, "time", lambda: stored + 2 * ocr_cache.LAST_USED_RESOLUTION)
+    assert ocr_cache.get("k") == [1, 2]
+    with sqlite3.connect(cache) as conn:
+        assert conn.execute("SELECT last_used FROM ocr").fetchone()[0] == stored + 2 * ocr_cache.LAST_USED_RESOLUTION
+
+
+def test_total_is_counted_for_older_caches(cache):
+    with sqlite3.connect(cache) as conn:
+        conn.execute("CREATE TABLE ocr (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                     "bytes INTEGER NOT NULL, last_used REAL NOT NULL)")
+        conn.execute("INSERT INTO ocr VALUES ('old', '\"abc\"', 5, 0)")
+    assert ocr_cache.stats() == {"entries": 1, "bytes": 5}
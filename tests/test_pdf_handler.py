@@ -0,0 +1,32 @@
+import pytest
+
+from Phase2_Cleansing import detectors
+from Phase2_Cleansing.filehandlers import pdf_handler
+
+fitz = pytest.importorskip("fitz")
+
+
+class Audit:
+    def __init__(self):
+        self.rows = []
+
+    def write_row(self, *row, **kwargs):
+        self.rows.append(row)
+
+
+def test_unscanned_page_is_redacted(tmp_path, monkeypatch):
+    src, out = str(tmp_path / "in.pdf"), str(tmp_path / "out.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "account holder john.doe@example.com " * 3)
+    doc.new_page().insert_text((72, 72), "nothing here")
+    doc.save(src)
+    # every long page goes over its scan budget
+    monkeypatch.setattr(detectors, "SCAN_WINDOW", 16)
+    monkeypatch.setattr(detectors, "SCAN_BUDGET_SECONDS", 1e-9)
+
+    audit = Audit()
+    assert pdf_handler.clean_pdf_file(src, out, "mask", False, audit)
+    assert [row[3] for row in audit.rows] == ["UNSCANNED"]
+    cleansed = fitz.open(out)
+    assert cleansed[0].get_text().strip() == ""
+    assert cleansed[1].get_text().strip() == "nothing here"  # short enough to be scanned in full
@@ -0,0 +1,74 @@
+import json
+
+from Phase2_Cleansing import main as phase2
+
+
+def _make_input(folder):
+    folder.mkdir()
+    (folder / "contacts.txt").write_text("Reach John Smith at john.smith@example.com or 9876543210\n")
+    (folder / "server.log").write_text("login from 10.0.0.12 by alice@example.org\n")
+    return str(folder)
+
+
+def _run(input_dir, output_dir, **kwargs):
+    return phase2.run_phase2(input_dir, output_dir, workers=1, resume=True, **kwargs)
+
+
+def test_resume_skips_done_files_and_retries_failed_ones(tmp_path, monkeypatch):
+    input_dir, output_dir = _make_input(tmp_path / "in"), str(tmp_path / "out")
+    route_file = phase2.route_file
+    calls = []
+
+    def failing_route(input_file, *args, **kwargs):
+        calls.append(input_file)
+        if input_file.endswith("server.log"):
+            raise RuntimeError("disk hiccup")
+        return route_file(input_file, *args, **kwargs)
+
+    monkeypatch.setattr(phase2, "route_file", failing_route)
+    first = _run(input_dir, output_dir)
+    assert sorted(row[3] for row in first["results"]) == ["failed", "ok"]
+
+    # second run: the cleansed file comes from the journal, the failed one is cleansed again
+    calls.clear()
+    monkeypatch.setattr(phase2, "route_file", lambda input_file, *a, **k: calls.append(input_file) or
+                        route_file(input_file, *a, **k))
+    second = _run(input_dir, output_dir)
+    assert [c.rsplit("/", 1)[-1] for c in calls] == ["server.log"]
+    assert sorted(row[3] for row in second["results"]) == ["ok", "ok"]
+    with open(second["audit_log"], encoding="utf-8") as f:
+        audit = f.read()
+    assert "john.smith@example.com" in audit and "alice@example.org" in audit
+
+    # third run: everything is done
+    calls.clear()
+    _run(input_dir, output_dir)
+    assert calls == []
+
+
+def test_resume_starts_over_when_scan_settings_change(tmp_path, monkeypatch):
+    input_dir, output_dir = _make_input(tmp_path / "in"), str(tmp_path / "out")
+    _run(input_dir, output_dir, scan_budget=5.0)
+    calls = []
+    route_file = phase2.route_file
+    monkeypatch.setattr(phase2, "route_file", lambda input_file, *a, **k: calls.append(input_file) or
+                        route_file(input_file, *a, **k))
+    _run(input_dir, output_dir, scan_budget=None)
+    assert len(calls) == 2
+    with open(tmp_path / "out" / "phase2_journal.jsonl", encoding="utf-8") as f:
+        assert json.loads(f.readline())["settings"]["scan_budget"] is None
+
+
+def test_phase3_resume_retries_files_with_errors(tmp_path, capsys):
+    from Phase3_Analyzer.main import run_phase3
+
+    input_dir = tmp_path / "cleansed"
+    input_dir.mkdir()
+    (input_dir / "notes.txt").write_text("Invoice total and payment due date\n")
+    (input_dir / "broken.pdf").write_bytes(b"%PDF-1.4 not really a pdf")
+    output_dir = str(tmp_path / "out")
+
+    run_phase3(str(input_dir), output_dir, resume=True)
+    capsys.readouterr()
+    run_phase3(str(input_dir), output_dir, resume=True)
+    assert "Resuming: 1 file(s) already done" in capsys.readouterr().out
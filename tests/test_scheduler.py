@@ -0,0 +1,22 @@
+import os
+import time
+
+from Phase2_Cleansing.scheduler import SupervisedPool, STATUS_DONE, rss_bytes
+
+_kept = []
+
+
+def _leak(mb):
+    # keeps what it allocated, like caches and the allocator keep memory between files
+    _kept.append(bytearray(os.urandom(1024)) * (mb * 1024))
+    time.sleep(0.3)  # long enough for the pool to look at the worker's memory
+    return os.getpid()
+
+
+def test_memory_kept_by_earlier_files_does_not_fail_later_ones():
+    limit = rss_bytes(os.getpid()) + 200 * 1024 ** 2
+    pool = SupervisedPool(1, _leak, memory_limit=limit, poll_interval=0.05)
+    results = list(pool.run((idx, (60,)) for idx in range(6)))
+    assert [status for _, status, _ in results] == [STATUS_DONE] * 6
+    assert pool.recycled >= 2
+    assert len({pid for _, _, pid in results}) > 1
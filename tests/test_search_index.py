@@ -0,0 +1,15 @@
+from Phase3_Analyzer.main import run_phase3
+from Phase3_Analyzer.search_index import search
+
+
+def test_streamed_file_is_indexed_past_the_early_stop(tmp_path):
+    input_dir = tmp_path / "cleansed"
+    input_dir.mkdir()
+    # decided by the top rule in the first chunk (1 MB), the last word is in the second one
+    text = "card reader door 3 granted\n" + "visitor badge issued at the front desk\n" * 40000 + "zanzibar\n"
+    (input_dir / "access.log").write_text(text)
+    index_path = str(tmp_path / "search.sqlite")
+
+    result = run_phase3(str(input_dir), str(tmp_path / "out"), stream=True, index_path=index_path)
+    assert not result["errors"]
+    assert [hit["file_name"] for hit in search(index_path, "zanzibar")] == ["access.log"]
@@ -0,0 +1,56 @@
+import os
+
+from manifest import file_sha256
+from Phase2_Cleansing.main import run_phase2
+from Phase2_Cleansing.utils import shard_of
+from Phase3_Analyzer.main import collect_tasks
+
+
+def test_phase3_folder_shards_follow_the_original_hashes(tmp_path):
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    names = [f"note_{n}.txt" for n in range(12)]
+    for n, name in enumerate(names):
+        (input_dir / name).write_text(f"ticket {n} raised by user{n}@example.com from 10.0.0.{n}\n")
+    output_dir = str(tmp_path / "cleansed")
+    run_phase2(str(input_dir), output_dir, workers=1)
+
+    for index in range(3):
+        expected = {name for name in names if shard_of(file_sha256(str(input_dir / name)), 3) == index}
+        tasks = collect_tasks(output_dir, shard=(index, 3))
+        assert {os.path.basename(task[1]) for task in tasks} & set(names) == expected
+
+
+def test_merge_keeps_same_named_files_apart(tmp_path):
+    from Phase1_FileAnalyzer.file_analyzer import run_phase1
+    from Phase3_Analyzer.main import run_phase3
+    from merge_shards import merge, _read_csv
+
+    # two notes.txt in different folders and shards, the report rows must follow their own files
+    first = next(t for t in (f"visitor logbook entry {n}\n" for n in range(1000)) if shard_of(_sha(t), 2) == 1)
+    second = next(t for t in (f"fingerprint enrolled {n}\n" for n in range(1000)) if shard_of(_sha(t), 2) == 0)
+    for folder, text in (("a", first), ("b", second)):
+        (tmp_path / "in" / folder).mkdir(parents=True)
+        (tmp_path / "in" / folder / "notes.txt").write_text(text)
+    manifest = run_phase1(str(tmp_path / "in"), str(tmp_path / "p1"))["csv_path"]
+    phase2_dirs, phase3_dirs = [], []
+    for index in range(2):
+        phase2_dirs.append(str(tmp_path / f"s{index}" / "cleansed"))
+        phase3_dirs.append(str(tmp_path / f"s{index}" / "phase3"))
+        run_phase2(manifest, phase2_dirs[-1], workers=1, shard=(index, 2))
+        run_phase3(os.path.join(phase2_dirs[-1], "cleansed_files.csv"), phase3_dirs[-1])
+
+    # the Phase 3 outputs of the shard holding the manifest's first file come last
+    if shard_of(_read_csv(manifest)[0]["SHA256"], 2) == 0:
+        phase3_dirs.reverse()
+    result = merge(phase2_dirs, phase3_dirs, str(tmp_path / "merged"), manifest)
+    cleansed = _read_csv(result["cleansed_csv"])
+    reports = _read_csv(result["report_csv"])
+    assert [row["Full Path"] for row in reports] == [row["Full Path"] for row in cleansed]
+    expected = {_sha(first): "Visitors Logbook", _sha(second): "Biometric Attendance/Access System"}
+    assert [row["File Description"] for row in reports] == [expected[row["SHA256"]] for row in cleansed]
+
+
+def _sha(text):
+    import hashlib
+    return hashlib.sha256(text.encode()).hexdigest()
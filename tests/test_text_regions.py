@@ -0,0 +1,37 @@
+import pytest
+
+from Phase2_Cleansing import text_regions
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+
+def _form(load_font):
+    # a form/floor-plan like page: text in bordered boxes at the top, an unboxed legend at the bottom
+    img = Image.new("L", (1000, 1000), 255)
+    draw = ImageDraw.Draw(img)
+    font = load_font(28)
+    draw.rectangle((40, 40, 960, 800), outline=0, width=8)  # outer frame
+    for left, top, label in ((60, 60, "Server Room"), (520, 60, "Account 4417"), (60, 420, "Badge-only Entry")):
+        draw.rectangle((left, top, left + 400, top + 320), outline=0, width=6)
+        draw.text((left + 60, top + 140), label, fill=0, font=font)
+    draw.text((60, 880), "RESTRICTED   SECURITY ZONE", fill=0, font=font)
+    return np.asarray(img)
+
+
+def _covers(box, x, y):
+    bx, by, bw, bh = box
+    return bx <= x < bx + bw and by <= y < by + bh
+
+
+def test_text_inside_borders_is_not_cropped_away(font):
+    box = text_regions.text_crop(_form(font))
+    assert box is not None
+    for x, y in ((130, 215), (590, 215), (130, 575), (130, 895)):  # inside each label and the legend
+        assert _covers(box, x, y)
+
+
+def test_blank_image_is_skipped():
+    assert text_regions.text_crop(np.full((400, 600), 250, dtype=np.uint8)) is None